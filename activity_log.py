@@ -0,0 +1,131 @@
+"""
+Activity Log Module
+Ring buffer log aktivitas dengan nomor urut, agregasi pesan berulang dan emit log_update per batch
+"""
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+
+class ActivityLog:
+    """Log aktivitas berukuran tetap (deque maxlen=size) yang aman dipanggil dari thread manapun.
+
+    add() hanya menambah entry ke ring buffer (O(1)); thread flush mengirim semua entry baru sebagai
+    satu event log_update {"items": [...lama -> baru], "seq", "missed"} setiap interval detik.
+    Entry dengan key yang sama dalam aggregate_window detik tidak dicatat satu per satu: yang pertama
+    tampil utuh, sisanya dihitung lalu diringkas jadi satu entry "<key> ×N in last 5s".
+    """
+    def __init__(self, emit: Callable[[str, Dict], None], size: int = 50, interval: float = 0.25,
+                 aggregate_window: float = 5.0):
+        self.emit = emit
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self._emitted = 0
+        # key -> [mulai jendela, jumlah yang diringkas, level]
+        self._aggregates: Dict[str, list] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {'added': 0, 'aggregated': 0, 'emitted': 0, 'batches': 0, 'missed': 0}
+        self.entries: deque = deque(maxlen=size)
+        self.configure(size, interval, aggregate_window)
+
+    def configure(self, size: int = 50, interval: float = 0.25, aggregate_window: float = 5.0):
+        """Terapkan config activity_log (ukuran buffer dipertahankan isinya)"""
+        size = max(1, int(size))
+        with self._lock:
+            if size != self.entries.maxlen:
+                self.entries = deque(self.entries, maxlen=size)
+        self.interval = max(0.01, float(interval))
+        self.aggregate_window = max(0.0, float(aggregate_window))
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Jalankan thread flush (aman dipanggil berulang dari beberapa thread)"""
+        if self.running:
+            return
+        with self._start_lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name='activity-log')
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Hentikan thread lalu kirim ringkasan dan entry yang tersisa"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush(force=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error emitting activity log: {e}")
+
+    def add(self, message: str, level: str = 'info', key: Optional[str] = None):
+        """Catat satu pesan; pesan dengan key yang masih dalam jendela agregasi hanya dihitung"""
+        now = time.time()
+        with self._lock:
+            self.counters['added'] += 1
+            if key is not None and self.aggregate_window > 0:
+                aggregate = self._aggregates.get(key)
+                if aggregate is not None and now - aggregate[0] < self.aggregate_window:
+                    aggregate[1] += 1
+                    aggregate[2] = level
+                    self.counters['aggregated'] += 1
+                    return
+                if aggregate is not None:
+                    self._summarize(key, aggregate, now)
+                self._aggregates[key] = [now, 0, level]
+            self._append(message, level, now)
+
+    def _append(self, message: str, level: str, now: float):
+        self.entries.append({'seq': next(self._seq), 'time': time.strftime('%H:%M:%S', time.localtime(now)),
+                             'message': message, 'level': level})
+
+    def _summarize(self, key: str, aggregate: list, now: float):
+        if aggregate[1]:
+            self._append(f"{key} ×{aggregate[1]} in last {self.aggregate_window:g}s", aggregate[2], now)
+
+    def _close_aggregates(self, now: float, force: bool = False):
+        for key, aggregate in list(self._aggregates.items()):
+            if force or now - aggregate[0] >= self.aggregate_window:
+                self._summarize(key, aggregate, now)
+                del self._aggregates[key]
+
+    def flush(self, force: bool = False):
+        """Kirim entry baru sejak flush terakhir sebagai satu log_update"""
+        with self._lock:
+            self._close_aggregates(time.time(), force)
+            if not self.entries or self.entries[-1]['seq'] <= self._emitted:
+                return
+            items = [entry for entry in self.entries if entry['seq'] > self._emitted]
+            # Entry yang sudah tergeser ring buffer sebelum sempat dikirim
+            missed = items[0]['seq'] - self._emitted - 1
+            self._emitted = items[-1]['seq']
+        self.counters['emitted'] += len(items)
+        self.counters['batches'] += 1
+        self.counters['missed'] += missed
+        self.emit('log_update', {'items': items, 'seq': items[-1]['seq'], 'missed': missed})
+
+    def snapshot(self) -> List[Dict]:
+        """Isi buffer, terbaru lebih dulu (bentuk activity_log lama di /api/status)"""
+        with self._lock:
+            return list(reversed(self.entries))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            aggregating = len(self._aggregates)
+            size = len(self.entries)
+        return {**self.counters, 'size': size, 'capacity': self.entries.maxlen,
+                'aggregating': aggregating, 'interval': self.interval,
+                'aggregate_window': self.aggregate_window}
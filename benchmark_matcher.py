@@ -0,0 +1,169 @@
+"""
+Benchmark Matcher
+Ukur biaya per komentar KeywordIndex vs matching per-pattern lama saat jumlah keyword bertambah
+
+Usage: python benchmark_matcher.py [jumlah_komentar]
+"""
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import quote
+
+from keyword_index import KeywordIndex, compile_keyword_pattern
+
+KEYWORD_COUNTS = [10, 100, 1000, 10000]
+
+
+def build_keywords(count: int):
+    """Keyword set seperti hasil generate_config.py"""
+    return {
+        f"keranjang {i}": {
+            'video_path': f"videos/product_{i}.mp4",
+            'response_text': f"Terima kasih! Produk {i} akan kami proses segera 🎉",
+        }
+        for i in range(1, count + 1)
+    }
+
+
+def build_comments(count: int, max_product: int, seed: int = 42):
+    """Komentar live sintetis, sebagian besar tidak match keyword apa pun"""
+    rng = random.Random(seed)
+    chatter = ["halo kak", "ready kak?", "😍😍😍", "bisa cod?", "ongkir ke bandung berapa",
+               "kak spill dong", "mantap", "izin nyimak"]
+    comments = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            comments.append(f"mau keranjang {rng.randint(1, max_product)} dong")
+        else:
+            comments.append(rng.choice(chatter))
+    return comments
+
+
+def per_comment_us(search, comments):
+    start = time.perf_counter()
+    for text in comments:
+        search(text)
+    return (time.perf_counter() - start) / len(comments) * 1e6
+
+
+def legacy_searcher(keywords):
+    patterns = [(k, compile_keyword_pattern(k, cfg)) for k, cfg in keywords.items()]
+    return lambda text: [k for k, p in patterns if p.search(text)]
+
+
+def main():
+    num_comments = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{'keywords':>9} {'index us/comment':>18} {'legacy us/comment':>19}")
+    for count in KEYWORD_COUNTS:
+        keywords = build_keywords(count)
+        comments = build_comments(num_comments, count)
+        index = KeywordIndex(keywords)
+        index_us = per_comment_us(index.search, comments)
+        # Baseline lama mahal sekali di 10k keyword; cukup sampel kecil
+        legacy_us = per_comment_us(legacy_searcher(keywords), comments[:max(20, 20000 // count)])
+        print(f"{count:>9} {index_us:>18.2f} {legacy_us:>19.2f}")
+    bench_edits(5000)
+    bench_dispatch(1000, num_comments)
+    bench_regex_prefilter(num_comments)
+
+
+def bench_edits(count: int, edits: int = 200):
+    """Biaya edit satu keyword: snapshot incremental vs rebuild penuh"""
+    keywords = build_keywords(count)
+    index = KeywordIndex(keywords)
+    start = time.perf_counter()
+    for i in range(edits):
+        index = index.with_keyword(f"promo {i}", {'video_path': f"videos/promo_{i}.mp4"})
+    incremental_us = (time.perf_counter() - start) / edits * 1e6
+    start = time.perf_counter()
+    for _ in range(5):
+        KeywordIndex(keywords)
+    rebuild_us = (time.perf_counter() - start) / 5 * 1e6
+    print(f"\nedit 1 keyword di {count} keyword: incremental {incremental_us:.1f} us, rebuild {rebuild_us:.1f} us")
+
+
+def dispatch_copies(index, text):
+    """Jalur lama: copy config per hit lalu hitung nama file dan URL per komentar"""
+    items = []
+    for rule in index.search(text):
+        cfg = rule.config.copy()
+        vp = cfg.get('video_path')
+        items.append((rule.keyword, Path(vp).name, f"/video-absolute?path={quote(vp)}"))
+    return items
+
+
+def dispatch_rules(index, text):
+    """Jalur baru: pakai field KeywordRule yang sudah di-resolve"""
+    return [(rule.keyword, rule.video_name, rule.video_url) for rule in index.search(text)]
+
+
+def measure_dispatch(dispatch, index, comments):
+    """Return (us/comment, p99 us, KiB dialokasikan per 1000 komentar)"""
+    for text in comments[:200]:
+        dispatch(index, text)  # isi cache slot sebelum diukur
+    samples = []
+    for text in comments:
+        start = time.perf_counter_ns()
+        dispatch(index, text)
+        samples.append(time.perf_counter_ns() - start)
+    samples.sort()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [dispatch(index, text) for text in comments]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    mean_us = sum(samples) / len(samples) / 1000
+    p99_us = samples[int(len(samples) * 0.99)] / 1000
+    return mean_us, p99_us, allocated / 1024 / len(comments) * 1000
+
+
+def bench_dispatch(count: int, num_comments: int):
+    """Biaya match + siapkan promo item: copy config per hit vs KeywordRule bersama"""
+    index = KeywordIndex(build_keywords(count))
+    comments = build_comments(num_comments, count)
+    print(f"\ndispatch ({count} keyword) {'us/comment':>11} {'p99 us':>8} {'KiB/1000 comments':>18}")
+    for name, dispatch in [("copy config", dispatch_copies), ("KeywordRule", dispatch_rules)]:
+        mean_us, p99_us, kib = measure_dispatch(dispatch, index, comments)
+        print(f"{name:>20} {mean_us:>11.2f} {p99_us:>8.2f} {kib:>18.1f}")
+
+
+def build_regex_keywords(count: int, seed: int = 7):
+    """Keyword is_regex per nama produk, mis. "\\b(?:kemeja|kmj)\\s*(xl|l|m)?\\b" """
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    keywords = {}
+    while len(keywords) < count:
+        name = ''.join(rng.choice(letters) for _ in range(rng.randint(5, 8)))
+        keywords[rf"\b(?:{name}|{name[::2]})\s*(xl|l|m)?\b"] = {'video_path': f"videos/{name}.mp4", 'is_regex': True}
+    return keywords
+
+
+def regex_product_name(pattern: str) -> str:
+    """Nama produk dari keyword build_regex_keywords, untuk membuat komentar yang match"""
+    return pattern[len(r"\b(?:"):pattern.index('|')]
+
+
+def bench_regex_prefilter(num_comments: int):
+    """Keyword regex: prefilter trigram vs evaluasi semua pattern, 90% komentar tidak match.
+
+    Angka prefilter termasuk normalisasi dan lookup keyword biasa (~5 us) yang tidak
+    dilakukan baseline.
+    """
+    rng = random.Random(7)
+    print(f"\n{'regex kw':>9} {'prefilter us/comment':>21} {'all patterns us/comment':>24}")
+    for count in [10, 100, 1000]:
+        keywords = build_regex_keywords(count)
+        names = [regex_product_name(pattern) for pattern in keywords]
+        comments = [f"mau {rng.choice(names)} xl dong" if rng.random() < 0.1 else text
+                    for text in build_comments(num_comments, count)]
+        index = KeywordIndex(keywords)
+        index_us = per_comment_us(index.search, comments)
+        legacy_us = per_comment_us(legacy_searcher(keywords), comments[:max(20, 20000 // count)])
+        print(f"{count:>9} {index_us:>21.2f} {legacy_us:>24.2f}")
+
+
+if __name__ == "__main__":
+    main()
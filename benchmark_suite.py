@@ -0,0 +1,262 @@
+"""
+Benchmark Suite
+Throughput, latency p50/p99 dan peak memory matcher untuk korpus chat sintetis atau rekaman
+(format comments_example.txt). Output JSON bisa dibandingkan antar versi dengan --compare.
+
+Usage:
+    python benchmark_suite.py
+    python benchmark_suite.py --lines 10000,100000,1000000 --match-ratio 0.1 --typo-ratio 0.05
+    python benchmark_suite.py --corpus comments_example.txt --rules 100,1000 --kinds plain
+    python benchmark_suite.py --json hasil.json --compare baseline.json
+"""
+import argparse
+import json
+import random
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmark_matcher import build_keywords, build_regex_keywords, regex_product_name
+from keyword_index import KeywordIndex
+
+try:
+    from comment_detector import CommentMatcher
+    MATCHER_IMPORT_ERROR = None
+except ImportError as e:
+    # Dependency detector (watchdog, socketio, ...) belum terpasang: ukur KeywordIndex saja
+    CommentMatcher = None
+    MATCHER_IMPORT_ERROR = e
+
+CHATTER = [
+    "halo kak", "hai kak salam kenal", "ready kak?", "izin nyimak", "mantap", "mantul kak",
+    "bisa cod?", "ongkir ke bandung berapa", "ongkir ke medan brp kak", "kak spill dong",
+    "spill yang ijo kak", "wkwkwk", "gas kak", "semangat kak", "bagi giveaway dong",
+    "harga berapa kak", "bahannya adem ga", "size chart dong", "ada warna hitam?", "kak sapa aku dong",
+    "baru join kak", "live sampe jam berapa", "checkout udah kak", "minimal belanja berapa",
+    "kak yang kemarin masih ada?", "promo apa hari ini", "kak jawab dong", "pengiriman dari mana",
+    "bisa retur ga kak", "garansi berapa lama", "kak suaranya putus putus", "up up", "hadir kak",
+]
+HIT_TEMPLATES = ["{kw}", "mau {kw} dong", "{kw} kak", "kak {kw} ready?", "{kw}!!", "checkout {kw}",
+                 "{kw} ukuran L ada?", "aku mau {kw} ya kak"]
+EMOJI = ["😍", "🔥", "🙏", "😂", "❤️", "👍", "🛒", "✨", "🤣", "😭"]
+
+# Baris file komentar, sama dengan FileCommentDetector.parse_comment_line
+_LINE = re.compile(r'\[(.+?)\]\s*(.+?):\s*(.+)')
+_SIMPLE_LINE = re.compile(r'(.+?):\s*(.+)')
+
+
+def build_rules(kind: str, count: int) -> Tuple[Dict, List[str]]:
+    """Return (comment_keywords, frasa yang match salah satu rule)"""
+    if kind == 'regex':
+        keywords = build_regex_keywords(count)
+        return keywords, [regex_product_name(pattern) for pattern in keywords]
+    keywords = build_keywords(count)
+    return keywords, list(keywords)
+
+
+def make_typo(word: str, rng: random.Random) -> str:
+    """Satu typo khas ketik cepat: huruf hilang, tertukar, dobel atau salah"""
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    op = rng.randrange(4)
+    if op == 0:
+        return word[:i] + word[i + 1:]
+    if op == 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if op == 2:
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + rng.choice("aiueonrst") + word[i + 1:]
+
+
+def synthetic_corpus(lines: int, phrases: List[str], match_ratio: float = 0.1, typo_ratio: float = 0.05,
+                     emoji_ratio: float = 0.2, users: int = 5000, seed: int = 42) -> List[Tuple[str, str]]:
+    """Chat live sintetis: (username, text), match_ratio baris menyebut salah satu phrases"""
+    rng = random.Random(seed)
+    usernames = [f"user{rng.randrange(10 ** 6)}_{i}" for i in range(users)]
+    corpus = []
+    for _ in range(lines):
+        if rng.random() < match_ratio:
+            text = rng.choice(HIT_TEMPLATES).format(kw=rng.choice(phrases))
+        else:
+            text = rng.choice(CHATTER)
+        if rng.random() < typo_ratio:
+            words = text.split()
+            i = rng.randrange(len(words))
+            words[i] = make_typo(words[i], rng)
+            text = ' '.join(words)
+        if rng.random() < emoji_ratio:
+            emoji = rng.choice(EMOJI) * rng.randint(1, 3)
+            text = f"{emoji} {text}" if rng.random() < 0.3 else f"{text} {emoji}"
+        if rng.random() < 0.05:
+            text = text.upper()
+        corpus.append((rng.choice(usernames), text))
+    return corpus
+
+
+def load_corpus(path: str) -> List[Tuple[str, str]]:
+    """Baca file format comments_example.txt: "[timestamp] username: comment" / "username: comment" """
+    corpus = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            match = _LINE.match(line)
+            if match:
+                corpus.append(match.groups()[1:])
+                continue
+            match = _SIMPLE_LINE.match(line)
+            if match:
+                corpus.append(match.groups())
+    return corpus
+
+
+def build_searcher(keywords: Dict, cache_size: int) -> Tuple[Callable, Callable[[], Optional[float]]]:
+    """Return (search(text), cache_hit_rate())"""
+    if CommentMatcher is not None:
+        matcher = CommentMatcher(keywords, cache_size=cache_size)
+        return matcher.find_rules, lambda: matcher.cache_stats()['hit_rate']
+    index = KeywordIndex(keywords)
+    return (lambda text: index.search(text.lower())), (lambda: None)
+
+
+def run_case(keywords: Dict, texts: List[str], cache_size: int, memory_lines: int) -> Dict:
+    """Ukur satu kombinasi rule x korpus"""
+    start = time.perf_counter()
+    search, hit_rate = build_searcher(keywords, cache_size)
+    build_ms = (time.perf_counter() - start) * 1000
+    samples = [0] * len(texts)
+    matched = 0
+    clock = time.perf_counter_ns
+    wall = time.perf_counter()
+    for i, text in enumerate(texts):
+        t0 = clock()
+        result = search(text)
+        samples[i] = clock() - t0
+        if result:
+            matched += 1
+    wall = time.perf_counter() - wall
+    samples.sort()
+    n = len(samples)
+
+    # Peak memory: build + match ulang di bawah tracemalloc (lebih lambat, jadi dibatasi)
+    tracemalloc.start()
+    search, _ = build_searcher(keywords, cache_size)
+    for text in texts[:memory_lines]:
+        search(text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'lines': n,
+        'build_ms': round(build_ms, 2),
+        'comments_per_sec': round(n / wall) if wall else 0,
+        'p50_us': round(samples[n // 2] / 1000, 2) if n else 0.0,
+        'p99_us': round(samples[min(n - 1, int(n * 0.99))] / 1000, 2) if n else 0.0,
+        'max_us': round(samples[-1] / 1000, 2) if n else 0.0,
+        'matched_ratio': round(matched / n, 4) if n else 0.0,
+        'cache_hit_rate': hit_rate(),
+        'peak_kib': round(peak / 1024, 1),
+        'memory_lines': min(n, memory_lines),
+    }
+
+
+def git_version() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results: List[Dict], baseline_path: str, tolerance: float) -> int:
+    """Bandingkan dengan hasil JSON versi lain; return jumlah regresi"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(r['corpus'], r['kind'], r['rules']): r for r in baseline.get('results', [])}
+    print(f"\nCompare vs {baseline_path} ({baseline.get('version') or '?'}), tolerance {tolerance:.0%}")
+    regressions = 0
+    for r in results:
+        old = previous.get((r['corpus'], r['kind'], r['rules']))
+        if old is None or not old['comments_per_sec']:
+            continue
+        ratio = r['comments_per_sec'] / old['comments_per_sec']
+        flag = ''
+        if ratio < 1 - tolerance:
+            regressions += 1
+            flag = '  << REGRESSION'
+        print(f"  {r['corpus']:>18} {r['kind']:>5} {r['rules']:>6}: {ratio:6.2f}x comments/sec, "
+              f"p99 {old['p99_us']:.1f} -> {r['p99_us']:.1f} us{flag}")
+    return regressions
+
+
+def parse_counts(value: str) -> List[int]:
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark matcher dengan korpus chat live")
+    parser.add_argument('--lines', type=parse_counts,
+                        help="ukuran korpus sintetis, mis. 10000,1000000 (default 10000 jika tanpa --corpus)")
+    parser.add_argument('--rules', type=parse_counts, default=[10, 100, 1000, 10000])
+    parser.add_argument('--kinds', default='plain,regex', help="plain, regex atau keduanya")
+    parser.add_argument('--corpus', action='append', default=[], help="file komentar (format comments_example.txt)")
+    parser.add_argument('--match-ratio', type=float, default=0.1)
+    parser.add_argument('--typo-ratio', type=float, default=0.05)
+    parser.add_argument('--emoji-ratio', type=float, default=0.2)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cache-size', type=int, default=1024, help="LRU CommentMatcher, 0 = tanpa cache")
+    parser.add_argument('--memory-lines', type=int, default=100000, help="baris yang diukur di bawah tracemalloc")
+    parser.add_argument('--json', help="tulis hasil ke file JSON")
+    parser.add_argument('--compare', help="file JSON hasil versi sebelumnya")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="penurunan comments/sec yang dianggap regresi")
+    args = parser.parse_args()
+
+    if MATCHER_IMPORT_ERROR is not None:
+        print(f"Note: comment_detector tidak bisa di-import ({MATCHER_IMPORT_ERROR}); memakai KeywordIndex langsung")
+    kinds = [k.strip() for k in args.kinds.split(',') if k.strip()]
+    synthetic_lines = args.lines if args.lines is not None else ([] if args.corpus else [10000])
+    recorded = [(Path(path).name, [text for _, text in load_corpus(path)]) for path in args.corpus]
+    results = []
+    print(f"{'corpus':>18} {'kind':>5} {'rules':>6} {'comments/s':>11} {'p50 us':>8} {'p99 us':>8} "
+          f"{'peak KiB':>10} {'matched':>8}")
+    for kind in kinds:
+        for count in args.rules:
+            keywords, phrases = build_rules(kind, count)
+            corpora = list(recorded)
+            for lines in synthetic_lines:
+                corpus = synthetic_corpus(lines, phrases, args.match_ratio, args.typo_ratio,
+                                          args.emoji_ratio, args.users, args.seed)
+                corpora.append((f"synthetic-{lines}", [text for _, text in corpus]))
+            for name, texts in corpora:
+                result = {'corpus': name, 'kind': kind, 'rules': count}
+                result.update(run_case(keywords, texts, args.cache_size, args.memory_lines))
+                results.append(result)
+                print(f"{name:>18} {kind:>5} {count:>6} {result['comments_per_sec']:>11} {result['p50_us']:>8.2f} "
+                      f"{result['p99_us']:>8.2f} {result['peak_kib']:>10.1f} {result['matched_ratio']:>8.2%}")
+
+    report = {
+        'version': git_version(),
+        'python': sys.version.split()[0],
+        'engine': 'CommentMatcher' if CommentMatcher is not None else 'KeywordIndex',
+        'timestamp': time.time(),
+        'settings': {k: v for k, v in vars(args).items() if k not in ('json', 'compare')},
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nHasil disimpan ke {args.json}")
+    if args.compare:
+        return 1 if compare(results, args.compare, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Comment Broadcast Module
+Gabungkan broadcast komentar ke player menjadi satu event 'comments' per jendela waktu
+"""
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+
+class CommentBroadcaster:
+    """Kumpulkan komentar per room live dan kirim batch setiap interval detik.
+
+    Setiap batch berisi maksimal max_batch komentar terbaru dari jendela itu; sisanya dihitung
+    di "dropped" (komentar hanya untuk tampilan, player cukup tahu ada berapa yang dilewati).
+    Client biasa bergabung ke room Socket.IO room_for(room) dan menerima satu emit per batch.
+    Client dengan cap (mis. HP di 4G) didaftarkan lewat subscribe() dan menerima sampel maksimal
+    cap komentar per batch, dikirim langsung ke sid-nya; cap 0 = tidak menerima komentar.
+    """
+    ROOM_PREFIX = 'comments'
+
+    def __init__(self, emit: Callable[[str, Dict, Optional[str]], None], interval: float = 0.15,
+                 max_batch: int = 50, client_cap: Optional[int] = None):
+        self.emit = emit
+        self._lock = threading.Lock()
+        self._pending: Dict[Optional[str], deque] = {}
+        self._added: Dict[Optional[str], int] = {}
+        # sid -> (room live, cap) untuk client yang dibatasi
+        self._capped: Dict[str, tuple] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {'comments': 0, 'batches': 0, 'emits': 0, 'dropped': 0, 'sampled_out': 0}
+        self.configure(interval, max_batch, client_cap)
+
+    def configure(self, interval: float = 0.15, max_batch: int = 50, client_cap: Optional[int] = None):
+        """Terapkan config comment_broadcast (dipanggil saat monitoring dimulai)"""
+        self.interval = max(0.01, float(interval))
+        self.max_batch = max(1, int(max_batch))
+        self.client_cap = int(client_cap) if client_cap is not None else None
+
+    @classmethod
+    def room_for(cls, room: Optional[str]) -> str:
+        """Room Socket.IO untuk client tanpa cap yang mengikuti room live ini"""
+        return f"{cls.ROOM_PREFIX}:{room}" if room else cls.ROOM_PREFIX
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='comment-broadcast')
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Hentikan thread lalu kirim sisa batch"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error broadcasting comments: {e}")
+
+    def add(self, item: Dict, room: Optional[str] = None):
+        """Antrikan satu komentar untuk dikirim di batch berikutnya (O(1), tanpa I/O)"""
+        with self._lock:
+            pending = self._pending.get(room)
+            if pending is None:
+                pending = self._pending[room] = deque(maxlen=self.max_batch)
+            pending.append(item)
+            self._added[room] = self._added.get(room, 0) + 1
+
+    def subscribe(self, sid: str, room: Optional[str], cap: Optional[int]) -> bool:
+        """Daftarkan client; True jika client harus join room_for(room) (tanpa cap)"""
+        if cap is None:
+            cap = self.client_cap
+        with self._lock:
+            if cap is None:
+                self._capped.pop(sid, None)
+                return True
+            self._capped[sid] = (room, max(0, int(cap)))
+        return False
+
+    def unsubscribe(self, sid: str):
+        with self._lock:
+            self._capped.pop(sid, None)
+
+    @staticmethod
+    def sample(items: List[Dict], cap: int) -> List[Dict]:
+        """Ambil cap item dengan jarak merata, urutan tetap dan item terbaru selalu ikut"""
+        n = len(items)
+        if n <= cap:
+            return items
+        if cap <= 0:
+            return []
+        step = n / cap
+        return [items[n - 1 - int(i * step)] for i in range(cap - 1, -1, -1)]
+
+    def flush(self):
+        """Kirim semua batch yang menunggu; dipanggil thread broadcaster setiap interval"""
+        with self._lock:
+            if not self._pending:
+                return
+            batches = [(room, list(items), self._added.get(room, 0))
+                       for room, items in self._pending.items() if items]
+            self._pending = {}
+            self._added = {}
+            capped = list(self._capped.items())
+        for room, items, added in batches:
+            dropped = added - len(items)
+            self.counters['comments'] += added
+            self.counters['dropped'] += dropped
+            self.counters['batches'] += 1
+            self.emit('comments', {'items': items, 'room': room, 'dropped': dropped}, self.room_for(room))
+            self.counters['emits'] += 1
+            for sid, (client_room, cap) in capped:
+                if client_room != room or cap == 0:
+                    continue
+                sampled = self.sample(items, cap)
+                self.counters['sampled_out'] += len(items) - len(sampled)
+                self.emit('comments', {'items': sampled, 'room': room,
+                                       'dropped': dropped + len(items) - len(sampled)}, sid)
+                self.counters['emits'] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = sum(len(items) for items in self._pending.values())
+            capped = len(self._capped)
+        return {**self.counters, 'pending': pending, 'capped_clients': capped,
+                'interval': self.interval, 'max_batch': self.max_batch, 'client_cap': self.client_cap}
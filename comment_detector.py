@@ -5,7 +5,8 @@ Mendeteksi komentar dari berbagai sumber (file, API, dll)
 import time
 import json
 import re
-from typing import Dict, List, Optional, Callable, Tuple
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Callable, Tuple
 from datetime import datetime
 from pathlib import Path
 from watchdog.observers import Observer
@@ -15,9 +16,15 @@ import os
 import subprocess
 import threading
 from queue import Queue, Empty
+from concurrent.futures import Future, ThreadPoolExecutor, wait as futures_wait
+from collections import OrderedDict, deque
 import socketio
 
-from tiktok_api import fetch_video_comments, TikTokAPIError
+from tiktok_api import fetch_video_comments, get_client, TikTokAPIError
+from dedup_store import DedupStore
+from journal import read_lines as read_journal_lines
+from poll_scheduler import AdaptivePollScheduler
+from keyword_index import KeywordIndex, KeywordRule, RegexProfiler, normalize_text
 
 try:
     from TikTokLive import TikTokLiveClient
@@ -27,22 +34,97 @@ except Exception:
 
 
 class Comment:
-    """Representasi data komentar"""
-    def __init__(self, username: str, text: str, timestamp: str = None):
+    """Representasi data komentar.
+
+    Record ringkas (__slots__): waktu terima monotonic (ns), text asli, text lowercase,
+    serta bentuk ternormalisasi dan string timestamp yang baru dihitung saat dibutuhkan.
+    """
+    __slots__ = ('username', 'raw_text', 'text', 'received_ns', 'dedup_ns', 'created_at', 'source_lag',
+                 'room', '_timestamp', '_normalized')
+
+    def __init__(self, username: str, text: str, timestamp: str = None, created_at: float = None):
         self.username = username
+        self.raw_text = text
         self.text = text.lower().strip()
-        self.timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.received_ns = time.monotonic_ns()
+        # Diisi CommentDetector._is_duplicate saat komentar lolos dedup
+        self.dedup_ns = None
+        # Epoch detik saat komentar dibuat di sumber (default: saat diterima)
+        now = time.time()
+        self.created_at = created_at if created_at is not None else now
+        # Detik dari timestamp sumber sampai diterima, hanya jika sumber memberi timestamp
+        self.source_lag = now - created_at if created_at is not None else None
+        # Nama room/akun live (MultiRoomDetector); None untuk satu sumber
+        self.room = None
+        self._timestamp = timestamp
+        self._normalized = None
+
+    @property
+    def timestamp(self) -> str:
+        """Timestamp untuk ditampilkan, diformat saat pertama kali diakses"""
+        if self._timestamp is None:
+            self._timestamp = datetime.fromtimestamp(self.created_at).strftime("%Y-%m-%d %H:%M:%S")
+        return self._timestamp
+
+    @property
+    def normalized(self) -> str:
+        """Text ternormalisasi (lihat normalize_text), dihitung sekali untuk matching & dedup"""
+        if self._normalized is None:
+            self._normalized = normalize_text(self.text)
+        return self._normalized
+
+    def dedup_key(self) -> str:
+        """Id fallback untuk dedup jika sumber tidak memberi id komentar"""
+        return f"{self.username}:{self.normalized}:{self._timestamp or int(self.created_at)}"
     
     def __str__(self):
         return f"[{self.timestamp}] {self.username}: {self.text}"
 
 
+def _epoch_seconds(value) -> Optional[float]:
+    """Timestamp event live (milidetik, kadang string) -> epoch detik; None jika tidak valid"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if value <= 0:
+        return None
+    return value / 1000.0 if value > 1e11 else value
+
+
 class CommentDetector:
-    """Base class untuk mendeteksi komentar"""
+    """Base class untuk mendeteksi komentar.
+
+    Detector "push" (push_source = True) menyerahkan komentar dari thread/socket sendiri lewat
+    _push(); detector "poll" mengimplementasikan get_new_comments(). Keduanya bisa dikonsumsi
+    sebagai async stream lewat stream() (lihat comment_pipeline.CommentPipeline).
+    """
+    # True jika komentar datang lewat _push() dari thread/socket milik detector
+    push_source = False
+    # True jika detector diawasi DetectorSupervisor (restart otomatis, lihat supervisor.py)
+    supervised = False
+
     def __init__(self, config: Dict):
         self.config = config
         self.callbacks: List[Callable] = []
-        self.processed_comments = set()
+        # Id komentar yang sudah diproses (TTL + batas memori, lihat dedup_settings)
+        self.processed_comments = DedupStore.from_config(config.get('dedup_settings'))
+        self.queue: "Queue[Comment]" = Queue()
+        # Dipasang stream() untuk membangunkan event loop dari thread sumber
+        self._waker: Optional[Callable[[], None]] = None
+        # Interval adaptif untuk detector berbasis poll (lihat poll_scheduler.py)
+        self.scheduler: Optional[AdaptivePollScheduler] = None
+        # time.monotonic() aktivitas terakhir sumber (komentar, heartbeat, connect)
+        self.last_activity: Optional[float] = None
+        # Dipasang DetectorSupervisor; dipanggil saat sumber tahu dirinya mati
+        self.on_failure: Optional[Callable[[], None]] = None
+
+    def _is_duplicate(self, comment: "Comment", comment_id: str) -> bool:
+        """Cek & tandai id di processed_comments; komentar baru diberi stempel dedup_ns"""
+        if self.processed_comments.seen(comment_id):
+            return True
+        comment.dedup_ns = time.monotonic_ns()
+        return False
     
     def add_callback(self, callback: Callable):
         """Tambah callback yang akan dipanggil saat ada komentar baru"""
@@ -66,27 +148,173 @@ class CommentDetector:
 
     def get_new_comments(self) -> List["Comment"]:
         """Return list komentar baru sejak panggilan terakhir"""
+        if self.push_source:
+            return self._drain_queue()
         raise NotImplementedError
 
-    def get_new_comments(self) -> List["Comment"]:
-    	"""Kembalikan list komentar baru sejak panggilan terakhir"""
-    	raise NotImplementedError
+    def wait_for_comments(self, timeout: float):
+        """Tunggu komentar baru sampai timeout detik (default: sleep biasa)"""
+        time.sleep(timeout)
+
+    def catching_up(self) -> bool:
+        """True jika poll berikutnya harus segera diambil (backlog dalam budget catch-up sumber)"""
+        return False
+
+    def poll_delay(self) -> float:
+        """Jeda sebelum poll berikutnya: interval scheduler adaptif, atau poll_interval/check_interval"""
+        if self.scheduler is not None:
+            return self.scheduler.interval
+        return float(getattr(self, 'poll_interval', None) or getattr(self, 'check_interval', 1.0))
+
+    def health(self) -> Optional[str]:
+        """Alasan jika sumber mati/putus/macet; None jika sehat (dipakai DetectorSupervisor)"""
+        return None
+
+    def _touch(self):
+        self.last_activity = time.monotonic()
+
+    def _failed(self):
+        """Beri tahu supervisor bahwa sumber mati tanpa menunggu liveness check berikutnya"""
+        on_failure = self.on_failure
+        if on_failure is not None:
+            on_failure()
+
+    def source_stats(self) -> Optional[Dict]:
+        """Metrik khusus sumber (cursor, lag, koneksi, ...) untuk /api/detector/stats"""
+        return None
+
+    def _push(self, comment: "Comment"):
+        """Serahkan komentar dari thread sumber dan bangunkan stream() yang sedang menunggu"""
+        self.last_activity = time.monotonic()
+        self.queue.put(comment)
+        waker = self._waker
+        if waker is not None:
+            try:
+                waker()
+            except RuntimeError:
+                # Event loop sudah ditutup; komentar tetap di queue untuk get_new_comments()
+                pass
+
+    def _push_many(self, comments: List["Comment"]):
+        """Seperti _push() untuk satu batch: stream() cukup dibangunkan sekali"""
+        if not comments:
+            return
+        self.last_activity = time.monotonic()
+        for comment in comments:
+            self.queue.put(comment)
+        waker = self._waker
+        if waker is not None:
+            try:
+                waker()
+            except RuntimeError:
+                pass
+
+    def _drain_queue(self, limit: Optional[int] = None) -> List["Comment"]:
+        out: List[Comment] = []
+        while limit is None or len(out) < limit:
+            try:
+                out.append(self.queue.get_nowait())
+            except Empty:
+                break
+        return out
+
+    async def stream(self, max_batch: int = 64) -> AsyncIterator[List["Comment"]]:
+        """Async iterator batch komentar (maks. max_batch) segera setelah tersedia.
+
+        Sumber push menunggu _push() lewat asyncio.Event yang di-set thread-safe. Sumber poll
+        dibungkus adapter: get_new_comments() dan wait_for_comments() jalan di executor, dengan
+        jeda poll_delay() setelah setiap poll (juga yang menghasilkan komentar) kecuali sumber
+        sedang catch-up.
+        """
+        loop = asyncio.get_running_loop()
+        if self.push_source:
+            wake = asyncio.Event()
+            self._waker = lambda: loop.call_soon_threadsafe(wake.set)
+            try:
+                while True:
+                    wake.clear()
+                    batch = self._drain_queue(max_batch)
+                    if batch:
+                        yield batch
+                    else:
+                        await wake.wait()
+            finally:
+                self._waker = None
+        while True:
+            try:
+                comments = await loop.run_in_executor(None, self.get_new_comments)
+            except Exception as e:
+                print(f"Error polling comments: {e}")
+                comments = []
+            for i in range(0, len(comments), max_batch):
+                yield comments[i:i + max_batch]
+            if not self.catching_up():
+                await loop.run_in_executor(None, self.wait_for_comments, self.poll_delay())
+
+
+class _TailEventHandler(FileSystemEventHandler):
+    """Bangunkan thread tail hanya untuk event pada file komentar"""
+    def __init__(self, file_path: Path, wake: threading.Event):
+        super().__init__()
+        self.file_path = os.path.normcase(os.path.abspath(file_path))
+        self.wake = wake
+
+    def dispatch(self, event):
+        for path in (getattr(event, 'src_path', None), getattr(event, 'dest_path', None)):
+            if path and os.path.normcase(os.path.abspath(os.fsdecode(path))) == self.file_path:
+                self.wake.set()
+                return
 
 
 class FileCommentDetector(CommentDetector):
-    """Deteksi komentar dari file teks"""
+    """Deteksi komentar dari file teks.
+
+    tail_mode "watch" (default): satu handle file tetap terbuka dan thread tail hanya bangun
+    saat watchdog melaporkan perubahan (check_interval tetap jadi fallback); "poll": file dibaca
+    saat update()/get_new_comments() dipanggil. Truncate dan rotasi (file diganti/di-rename)
+    dideteksi, dan offset byte terakhir yang sudah diproses disimpan ke checkpoint_path
+    (default "<file_path>.offset", null = nonaktif) sehingga restart melanjutkan dari posisi itu.
+    Offset baru disimpan setelah barisnya diserahkan: mode watch setelah masuk queue, mode poll
+    pada panggilan get_new_comments() berikutnya (batch sebelumnya sudah diproses pemanggil).
+    Catatan Windows: selama handle terbuka, writer tidak bisa me-rename file (truncate tetap bisa).
+    """
+    # Baris terakhir tanpa newline dianggap lengkap jika tidak bertambah selama ini (detik)
+    PARTIAL_LINE_TIMEOUT = 0.5
+    CHECKPOINT_INTERVAL = 1.0
+
     def __init__(self, config: Dict):
         super().__init__(config)
-        self.file_path = Path(config['comment_source']['file_path'])
-        self.check_interval = config['comment_source'].get('check_interval', 1.0)
+        src = config['comment_source']
+        self.file_path = Path(src['file_path'])
+        self.check_interval = src.get('check_interval', 1.0)
+        self.scheduler = AdaptivePollScheduler.from_config(src.get('adaptive_poll'), float(self.check_interval))
+        self.tail_mode = src.get('tail_mode', 'watch')
+        checkpoint = src.get('checkpoint_path', f"{self.file_path}.offset")
+        self.checkpoint_path = Path(checkpoint) if checkpoint else None
         self.running = False
+        # Offset byte setelah baris lengkap terakhir yang sudah dibaca
         self.last_position = 0
+        # (identity, offset) setelah pembacaan terakhir dan yang sudah diserahkan (isi checkpoint)
+        self._read_state = None
+        self._processed_state = None
+        self._handle = None
+        self._identity = None
+        self._partial = b''
+        self._partial_since = 0.0
+        self._saved_state = None
+        self._saved_at = 0.0
+        self._read_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._ready = threading.Event()
+        self._observer = None
+        self._thread = None
         
         # Buat file jika belum ada
         if not self.file_path.exists():
             self.file_path.touch()
     
-    def parse_comment_line(self, line: str) -> Optional[Comment]:
+    @staticmethod
+    def parse_comment_line(line: str) -> Optional[Comment]:
         """Parse baris komentar dari file"""
         line = line.strip()
         if not line:
@@ -108,81 +336,222 @@ class FileCommentDetector(CommentDetector):
                 return Comment(username, text)
         
         return None
-    
-    def check_new_comments(self):
-        """Check file untuk komentar baru"""
+
+    def _open(self, position: int) -> bool:
+        """(Re)open file dan seek ke position; posisi di luar file dianggap 0"""
+        self._close()
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                # Pindah ke posisi terakhir yang dibaca
-                f.seek(self.last_position)
-                
-                # Baca baris baru
-                new_lines = f.readlines()
-                self.last_position = f.tell()
-                
-                # Parse dan notify
-                for line in new_lines:
-                    comment = self.parse_comment_line(line)
-                    if comment:
-                        comment_id = f"{comment.username}:{comment.text}:{comment.timestamp}"
-                        if comment_id not in self.processed_comments:
-                            self.processed_comments.add(comment_id)
-                            self.notify_callbacks(comment)
-        except Exception as e:
-            print(f"Error reading comments file: {e}")
+            handle = open(self.file_path, 'rb')
+        except OSError:
+            return False
+        st = os.fstat(handle.fileno())
+        if position > st.st_size:
+            position = 0
+        handle.seek(position)
+        self._handle = handle
+        self._identity = (st.st_dev, st.st_ino)
+        self.last_position = position
+        self._partial = b''
+        return True
 
-    def get_new_comments(self) -> List["Comment"]:
-        """Return list komentar baru tanpa callbacks (untuk web server loop)"""
-        new_comments: List[Comment] = []
+    def _close(self):
+        if self._handle is not None:
+            try:
+                self._handle.close()
+            except OSError:
+                pass
+            self._handle = None
+
+    def _drain(self, final: bool = False) -> List[bytes]:
+        """Baca semua data baru dari handle; simpan baris terakhir yang belum lengkap"""
+        data = self._handle.read()
+        now = time.monotonic()
+        if data:
+            self._partial_since = now
+            data = self._partial + data
+            lines = data.split(b'\n')
+            self._partial = lines.pop()
+        else:
+            lines = []
+        if self._partial and (final or now - self._partial_since >= self.PARTIAL_LINE_TIMEOUT):
+            lines.append(self._partial)
+            self._partial = b''
+        self.last_position = self._handle.tell() - len(self._partial)
+        return lines
+
+    def _read_lines(self) -> List[bytes]:
+        """Baris baru sejak pembacaan terakhir, termasuk penanganan truncate/rotasi"""
+        with self._read_lock:
+            if self._handle is None and not self._open(self.last_position):
+                return []
+            lines = self._drain()
+            if os.fstat(self._handle.fileno()).st_size < self._handle.tell():
+                print(f"Comments file truncated, reading {self.file_path} from the start")
+                self._open(0)
+                lines += self._drain()
+            else:
+                try:
+                    st = os.stat(self.file_path)
+                    rotated = (st.st_dev, st.st_ino) != self._identity
+                except OSError:
+                    rotated = False  # file belum dibuat ulang; tetap baca handle lama
+                if rotated:
+                    print(f"Comments file rotated, reading new {self.file_path}")
+                    lines += self._drain(final=True)
+                    self._open(0)
+                    lines += self._drain()
+            self._read_state = (self._identity, self.last_position)
+            return lines
+
+    def _load_checkpoint(self) -> Optional[int]:
+        """Offset dari checkpoint, None jika tidak ada atau milik file lain"""
+        if self.checkpoint_path is None:
+            return None
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                f.seek(self.last_position)
-                new_lines = f.readlines()
-                self.last_position = f.tell()
-                for line in new_lines:
-                    comment = self.parse_comment_line(line)
-                    if comment:
-                        comment_id = f"{comment.username}:{comment.text}:{comment.timestamp}"
-                        if comment_id not in self.processed_comments:
-                            self.processed_comments.add(comment_id)
-                            new_comments.append(comment)
-        except Exception as e:
-            print(f"Error reading comments file: {e}")
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            st = os.stat(self.file_path)
+        except (OSError, ValueError):
+            return None
+        if data.get('path') != str(self.file_path):
+            return None
+        if [data.get('dev'), data.get('ino')] != [st.st_dev, st.st_ino]:
+            # File sudah dirotasi saat aplikasi mati: baca file baru dari awal
+            return 0
+        return int(data.get('offset', 0))
+
+    def _mark_processed(self, force: bool = False):
+        """Baris sampai pembacaan terakhir sudah diserahkan; simpan offset-nya ke checkpoint"""
+        with self._read_lock:
+            self._processed_state = self._read_state
+            self._save_checkpoint(force)
+
+    def _save_checkpoint(self, force: bool = False):
+        state = self._processed_state
+        if self.checkpoint_path is None or state is None or state[0] is None or state == self._saved_state:
+            return
+        now = time.monotonic()
+        if not force and now - self._saved_at < self.CHECKPOINT_INTERVAL:
+            return
+        tmp = self.checkpoint_path.with_name(self.checkpoint_path.name + '.tmp')
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'path': str(self.file_path), 'offset': state[1],
+                           'dev': state[0][0], 'ino': state[0][1]}, f)
+            os.replace(tmp, self.checkpoint_path)
+            self._saved_state = state
+            self._saved_at = now
+        except OSError as e:
+            print(f"Error saving comments checkpoint: {e}")
+
+    def _collect(self, lines: List[bytes]) -> List[Comment]:
+        """Parse + dedup baris mentah"""
+        new_comments: List[Comment] = []
+        for raw in lines:
+            comment = self.parse_comment_line(raw.decode('utf-8', errors='replace'))
+            if comment:
+                comment_id = comment.dedup_key()
+                if not self._is_duplicate(comment, comment_id):
+                    new_comments.append(comment)
         return new_comments
 
+    def _tail_loop(self):
+        """Thread tail: tidur sampai ada event file (atau check_interval), lalu baca"""
+        while self.running:
+            self._wake.wait(self.poll_delay())
+            self._wake.clear()
+            if not self.running:
+                break
+            try:
+                comments = self._collect(self._read_lines())
+            except Exception as e:
+                print(f"Error reading comments file: {e}")
+                self.scheduler.on_error()
+                continue
+            self.scheduler.observe(len(comments))
+            self._push_many(comments)
+            self._mark_processed()
+            if comments:
+                self._ready.set()
+
+    def check_new_comments(self):
+        """Check file untuk komentar baru dan panggil callbacks"""
+        for comment in self.get_new_comments():
+            self.notify_callbacks(comment)
+
     def get_new_comments(self) -> List["Comment"]:
         """Return list komentar baru tanpa menggunakan callbacks"""
-        new_comments: List[Comment] = []
-        try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                f.seek(self.last_position)
-                new_lines = f.readlines()
-                self.last_position = f.tell()
-                for line in new_lines:
-                    comment = self.parse_comment_line(line)
-                    if comment:
-                        comment_id = f"{comment.username}:{comment.text}:{comment.timestamp}"
-                        if comment_id not in self.processed_comments:
-                            self.processed_comments.add(comment_id)
-                            new_comments.append(comment)
-        except Exception as e:
-            print(f"Error reading comments file: {e}")
-        return new_comments
+        if self._thread is None:
+            # Pemanggil sudah memproses batch sebelumnya
+            self._mark_processed()
+            try:
+                comments = self._collect(self._read_lines())
+            except Exception as e:
+                print(f"Error reading comments file: {e}")
+                self.scheduler.on_error()
+                return []
+            self.scheduler.observe(len(comments))
+            return comments
+        self._ready.clear()
+        return self._drain_queue()
+
+    def wait_for_comments(self, timeout: float):
+        """Bangun segera saat thread tail menerima komentar (mode watch)"""
+        if self._thread is None:
+            time.sleep(timeout)
+        else:
+            self._ready.wait(timeout)
     
     def start(self):
         """Mulai monitoring file"""
+        if self.running:
+            return
         self.running = True
-        # Set posisi awal ke akhir file
-        if self.file_path.exists():
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                f.seek(0, 2)  # Seek to end
-                self.last_position = f.tell()
+        # Lanjut dari checkpoint; tanpa checkpoint mulai dari akhir file
+        position = self._load_checkpoint()
+        if position is None:
+            try:
+                position = self.file_path.stat().st_size
+            except OSError:
+                position = 0
+        with self._read_lock:
+            self._open(position)
+            self._read_state = self._processed_state = (self._identity, self.last_position)
+        
+        if self.tail_mode == 'watch':
+            try:
+                self._observer = Observer()
+                self._observer.schedule(_TailEventHandler(self.file_path, self._wake),
+                                        str(self.file_path.resolve().parent), recursive=False)
+                self._observer.start()
+            except Exception as e:
+                print(f"File watcher unavailable ({e}), polling every {self.poll_delay():.2f}s")
+                self._observer = None
+            self._thread = threading.Thread(target=self._tail_loop, daemon=True)
+            self._thread.start()
+            # Thread tail mendorong komentar ke queue, stream() tidak perlu polling
+            self.push_source = True
         
-        print(f"Monitoring komentar dari: {self.file_path}")
+        print(f"Monitoring komentar dari: {self.file_path} (mode {self.tail_mode})")
     
     def stop(self):
         """Stop monitoring file"""
         self.running = False
+        self._wake.set()
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+                self._observer.join(timeout=2)
+            except Exception:
+                pass
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.push_source = False
+        self._mark_processed(force=True)
+        with self._read_lock:
+            self._close()
         print("Stopped monitoring comments")
     
     def update(self):
@@ -192,7 +561,19 @@ class FileCommentDetector(CommentDetector):
 
 
 class TikTokCommentDetector(CommentDetector):
-    """Deteksi komentar langsung dari TikTok Research API"""
+    """Deteksi komentar langsung dari TikTok Research API.
+
+    Satu siklus poll mengambil halaman demi halaman selama has_more masih true (catch-up),
+    dibatasi catch_up.max_pages dan catch_up.max_seconds per siklus. Halaman berikutnya
+    di-prefetch di background selagi halaman sekarang diproses pipeline. Endpoint hanya menerima
+    video_id, max_count dan cursor, dan cursor mentok di CURSOR_LIMIT: komentar setelahnya tidak
+    bisa diambil. Saat mentok siklus berhenti, lag dilaporkan dan siklus berikutnya mulai lagi dari
+    cursor 0 (dedup per id komentar). Sejak itu komentar yang lebih tua dari create_time terbaru
+    yang sudah diterima (window_start) dibuang walau dedup sudah melupakannya, dan halaman yang
+    seluruhnya lebih tua mengakhiri siklus.
+    """
+    CURSOR_LIMIT = 1000
+
     def __init__(self, config: Dict):
         super().__init__(config)
         src = config.get('comment_source', {})
@@ -204,16 +585,39 @@ class TikTokCommentDetector(CommentDetector):
         self.max_count = int(src.get('max_count', 10))
         self.cursor = int(src.get('cursor', 0))
         self.poll_interval = float(src.get('poll_interval', 2.0))
+        self.scheduler = AdaptivePollScheduler.from_config(src.get('adaptive_poll'), self.poll_interval)
+        catch_up = src.get('catch_up') or {}
+        self.catch_up_pages = max(1, int(catch_up.get('max_pages', 10)))
+        self.catch_up_seconds = float(catch_up.get('max_seconds', 5.0))
+        self.prefetch = bool(catch_up.get('prefetch', True))
         self.running = False
         self._last_poll = 0.0
+        # Client bersama yang dipakai fetch_video_comments (keep-alive, retry, metrics)
+        self.client = get_client(src)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Optional[Future] = None
+        self._cycle_pages = 0
+        self._cycle_started = 0.0
+        # Batas bawah create_time (epoch detik) setelah cursor mentok; high_water = create_time terbaru
+        self.window_start: Optional[int] = None
+        self.high_water: Optional[float] = None
+        self.has_more = False
+        self.lag_seconds = 0.0
+        self.catch_up = {'pages': 0, 'cycles': 0, 'budget_stops': 0, 'ceiling_hits': 0, 'prefetched': 0}
 
     def start(self):
         self.running = True
         self._last_poll = 0.0
+        if self.prefetch and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tiktok-prefetch')
         print(f"Monitoring TikTok comments for video_id={self.video_id}")
 
     def stop(self):
         self.running = False
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._pending = None
         print("Stopped TikTok comments monitoring")
 
     def _to_comment(self, item: Dict) -> Optional[Comment]:
@@ -223,105 +627,135 @@ class TikTokCommentDetector(CommentDetector):
         # TikTok response does not include username; use a placeholder
         username = f"tiktok:{item.get('id', 'unknown')}"
         ts = item.get('create_time')
-        if isinstance(ts, int):
-            # convert unix timestamp to readable string
-            try:
-                dt = datetime.fromtimestamp(ts)
-                timestamp = dt.strftime("%Y-%m-%d %H:%M:%S")
-            except Exception:
-                timestamp = None
-        else:
-            timestamp = None
-        return Comment(username=username, text=text, timestamp=timestamp)
+        created_at = float(ts) if isinstance(ts, (int, float)) else None
+        return Comment(username=username, text=text, created_at=created_at)
 
-    def fetch_and_notify(self):
+    def _fetch(self, cursor: int) -> Dict:
+        return fetch_video_comments(
+            self.src,
+            video_id=self.video_id,
+            fields=self.fields,
+            max_count=self.max_count,
+            cursor=cursor,
+        )
+
+    def _next_page(self) -> Optional[Dict]:
+        """Hasil prefetch jika ada, selain itu fetch langsung di cursor sekarang"""
+        pending, self._pending = self._pending, None
+        if self._cycle_pages == 0:
+            self._cycle_started = time.monotonic()
+            self.catch_up['cycles'] += 1
         try:
-            result = fetch_video_comments(
-                self.src,
-                video_id=self.video_id,
-                fields=self.fields,
-                max_count=self.max_count,
-                cursor=self.cursor,
-            )
+            if pending is not None:
+                self.catch_up['prefetched'] += 1
+                return pending.result()
+            return self._fetch(self.cursor)
         except TikTokAPIError as e:
             print(f"TikTok API error: {e}")
-            return
+            self._cycle_pages = 0
+            self.scheduler.on_error(throttled=e.status == 429, retry_after=e.retry_after)
+            return None
 
-        comments = result.get('comments', [])
-        # Update cursor for next page, but do not exceed 1000
+    def _advance(self, result: Dict, new_count: int, newest: Optional[float], stale: bool):
+        """Update cursor, metrik lag dan tentukan apakah siklus catch-up lanjut"""
+        self._cycle_pages += 1
+        self.catch_up['pages'] += 1
+        self.has_more = bool(result.get('has_more'))
         self.cursor = int(result.get('cursor', self.cursor))
+        # Lag di belakang live: umur komentar terbaru di halaman ini selama backlog masih ada
+        if not self.has_more:
+            self.lag_seconds = 0.0
+        elif newest is not None:
+            self.lag_seconds = max(0.0, time.time() - newest)
 
-        for item in comments:
-            comment = self._to_comment(item)
-            if not comment:
-                continue
-            # Use TikTok comment id to deduplicate
-            comment_id = f"tiktok:{item.get('id')}"
-            if comment_id not in self.processed_comments:
-                self.processed_comments.add(comment_id)
-                self.notify_callbacks(comment)
+        self.scheduler.observe(new_count, self.has_more)
+        more = self.has_more
+        if more and self.cursor >= self.CURSOR_LIMIT:
+            # Cursor mentok: sisa backlog tidak terjangkau, siklus berikutnya mulai lagi dari 0
+            self.catch_up['ceiling_hits'] += 1
+            if self.catch_up['ceiling_hits'] == 1:
+                print(f"TikTok API cursor limit ({self.CURSOR_LIMIT}) reached; older backlog is skipped, "
+                      f"restarting from cursor 0")
+            self._restart_walk()
+            more = False
+        elif more and stale and self.window_start is not None:
+            # Sisa halaman hanya berisi komentar yang sudah pernah diterima
+            self._restart_walk()
+            more = False
+        if more and (self._cycle_pages >= self.catch_up_pages
+                     or time.monotonic() - self._cycle_started >= self.catch_up_seconds):
+            self.catch_up['budget_stops'] += 1
+            more = False
+        if more:
+            # Tanpa prefetch halaman berikutnya diambil di panggilan get_new_comments berikutnya
+            if self.prefetch and self._executor is not None:
+                self._pending = self._executor.submit(self._fetch, self.cursor)
+        else:
+            self._cycle_pages = 0
+
+    def _restart_walk(self):
+        """Mulai lagi dari cursor 0 dan buang komentar yang lebih tua dari detik high-water"""
+        self.cursor = 0
+        if self.high_water is not None:
+            start = int(self.high_water)
+            self.window_start = start if self.window_start is None else max(self.window_start, start)
+            self.lag_seconds = max(0.0, time.time() - self.high_water)
 
     def get_new_comments(self) -> List["Comment"]:
-        """Return list komentar baru dari TikTok tanpa callbacks"""
+        """Return list komentar baru dari TikTok tanpa callbacks (satu halaman per panggilan)"""
         out: List[Comment] = []
-        try:
-            result = fetch_video_comments(
-                self.src,
-                video_id=self.video_id,
-                fields=self.fields,
-                max_count=self.max_count,
-                cursor=self.cursor,
-            )
-        except TikTokAPIError as e:
-            print(f"TikTok API error: {e}")
+        result = self._next_page()
+        if result is None:
             return out
-
-        comments = result.get('comments', [])
-        self.cursor = int(result.get('cursor', self.cursor))
-        for item in comments:
+        items = result.get('comments', [])
+        newest = None
+        older = 0
+        for item in items:
+            ts = item.get('create_time')
+            if isinstance(ts, (int, float)):
+                if self.window_start is not None and ts < self.window_start:
+                    older += 1
+                    continue
+                newest = ts if newest is None else max(newest, ts)
             comment = self._to_comment(item)
             if not comment:
                 continue
             cid = f"tiktok:{item.get('id')}"
-            if cid not in self.processed_comments:
-                self.processed_comments.add(cid)
+            if not self._is_duplicate(comment, cid):
                 out.append(comment)
+        if newest is not None:
+            self.high_water = newest if self.high_water is None else max(self.high_water, newest)
+        self._advance(result, len(out), newest, stale=bool(items) and older == len(items))
         return out
 
+    def catching_up(self) -> bool:
+        """Halaman berikutnya sudah di-prefetch atau siklus catch-up masih dalam budget"""
+        return self._pending is not None or self._cycle_pages > 0
+
+    def wait_for_comments(self, timeout: float):
+        """Saat catch-up, lanjut ke halaman berikutnya segera; selain itu tunggu interval scheduler"""
+        if self._pending is not None:
+            futures_wait([self._pending], timeout=timeout)
+        elif not self._cycle_pages:
+            time.sleep(timeout)
+
+    def fetch_and_notify(self):
+        for comment in self.get_new_comments():
+            self.notify_callbacks(comment)
+
     def update(self):
         if not self.running:
             return
         now = time.time()
-        if now - self._last_poll >= self.poll_interval:
+        # Selama catch-up halaman berikutnya diambil tanpa menunggu interval poll
+        if self._cycle_pages or now - self._last_poll >= self.poll_delay():
             self._last_poll = now
             self.fetch_and_notify()
 
-    def get_new_comments(self) -> List["Comment"]:
-        """Return list komentar baru dari TikTok tanpa callbacks"""
-        out: List[Comment] = []
-        try:
-            result = fetch_video_comments(
-                self.src,
-                video_id=self.video_id,
-                fields=self.fields,
-                max_count=self.max_count,
-                cursor=self.cursor,
-            )
-        except TikTokAPIError as e:
-            print(f"TikTok API error: {e}")
-            return out
-
-        comments = result.get('comments', [])
-        self.cursor = int(result.get('cursor', self.cursor))
-        for item in comments:
-            comment = self._to_comment(item)
-            if not comment:
-                continue
-            cid = f"tiktok:{item.get('id')}"
-            if cid not in self.processed_comments:
-                self.processed_comments.add(cid)
-                out.append(comment)
-        return out
+    def source_stats(self) -> Dict:
+        return {'cursor': self.cursor, 'has_more': self.has_more, 'lag_seconds': round(self.lag_seconds, 1),
+                'windowed': self.window_start is not None, 'window_start': self.window_start,
+                'high_water': self.high_water, **self.catch_up}
 
 
 class DummyTikTokCommentDetector(CommentDetector):
@@ -330,6 +764,7 @@ class DummyTikTokCommentDetector(CommentDetector):
         super().__init__(config)
         src = config.get('comment_source', {})
         self.poll_interval = float(src.get('poll_interval', 1.0))
+        self.scheduler = AdaptivePollScheduler.from_config(src.get('adaptive_poll'), self.poll_interval)
         self.running = False
         self._last_emit = 0.0
         self._counter = 0
@@ -355,11 +790,10 @@ class DummyTikTokCommentDetector(CommentDetector):
         print("Stopped dummy TikTok comments monitoring")
 
     def _make_comment(self) -> Comment:
-        import random, time as _t
+        import random
         self._counter += 1
         text = random.choice(self._samples)
-        ts = datetime.fromtimestamp(int(_t.time())).strftime("%Y-%m-%d %H:%M:%S")
-        return Comment(username=f"dummy:{self._counter}", text=text, timestamp=ts)
+        return Comment(username=f"dummy:{self._counter}", text=text)
 
     def get_new_comments(self) -> List["Comment"]:
         out: List[Comment] = []
@@ -369,9 +803,9 @@ class DummyTikTokCommentDetector(CommentDetector):
             self._last_emit = now
             c = self._make_comment()
             cid = f"dummy:{self._counter}"
-            if cid not in self.processed_comments:
-                self.processed_comments.add(cid)
+            if not self._is_duplicate(c, cid):
                 out.append(c)
+        self.scheduler.observe(len(out))
         return out
 
     def update(self):
@@ -379,12 +813,210 @@ class DummyTikTokCommentDetector(CommentDetector):
         pass
 
 
+class LoadGeneratorDetector(DummyTikTokCommentDetector):
+    """tiktok_dummy dengan comment_source.load: generator komentar sintetis berkecepatan tinggi.
+
+    Kedatangan dihitung dari jam dinding setiap get_new_comments() (tanpa thread): "steady" tepat
+    rate/detik, "poisson" jarak antar komentar eksponensial, "burst" poisson dengan burst_rate
+    selama burst_duration detik setiap burst_every detik (flash sale). Text diambil dari pool yang
+    disiapkan di awal (keyword config untuk hit_ratio, sisanya obrolan biasa, sebagian diberi typo
+    dan emoji), username dari pool sebesar usernames, jadi biaya per komentar hanya beberapa
+    random() + membuat Comment. Kedatangan yang tertinggal lebih dari max_lag detik (consumer
+    lambat) tidak dibuat lagi tapi dihitung di "missed".
+    """
+    PROCESSES = ('steady', 'poisson', 'burst')
+    POOL_SIZE = 4096
+    CHATTER = ["halo kak", "ready kak?", "spill harga dong", "ongkir ke bandung berapa", "cod bisa?",
+               "warna lain ada?", "size L masih?", "mantap", "wkwk", "bagus banget", "kapan restock",
+               "kak sapa aku dong", "promo sampai kapan", "bahannya apa kak", "lanjut kak", "hadir"]
+    EMOJI = ["🔥", "😍", "🙏", "👍", "❤️", "🛒", "😂", "✨"]
+
+    def __init__(self, config: Dict):
+        super().__init__(config)
+        import random
+        load = config.get('comment_source', {}).get('load') or {}
+        self.rate = float(load.get('rate', 1000.0))
+        self.process = load.get('process', 'poisson')
+        if self.process not in self.PROCESSES:
+            raise ValueError(f"load.process must be one of {self.PROCESSES}")
+        self.burst_rate = float(load.get('burst_rate', self.rate * 10))
+        self.burst_every = float(load.get('burst_every', 30.0))
+        self.burst_duration = float(load.get('burst_duration', 5.0))
+        self.hit_ratio = min(1.0, max(0.0, float(load.get('hit_ratio', 0.2))))
+        self.usernames = max(1, int(load.get('usernames', 5000)))
+        self.typo_ratio = float(load.get('typo_ratio', 0.1))
+        self.emoji_ratio = float(load.get('emoji_ratio', 0.2))
+        self.duration = load.get('duration')
+        self.max_lag = float(load.get('max_lag', 1.0))
+        self.max_per_poll = int(load.get('max_per_poll', 50000))
+        # Jeda poll tetap (interval adaptif tidak berguna untuk generator)
+        self.poll_interval = float(load.get('tick', 0.01))
+        self.scheduler = None
+        self._random = random.Random(load.get('seed'))
+        self._hits = self._pool(self._keyword_texts(config.get('comment_keywords') or {}))
+        self._misses = self._pool(self.CHATTER)
+        self._users = [f"user{i}" for i in range(min(self.usernames, 100000))]
+        self._reset_stats()
+
+    def _keyword_texts(self, keywords: Dict) -> List[str]:
+        """Komentar yang seharusnya match: keyword biasa, alias, dan slot template dengan nomor acak"""
+        rnd = self._random
+        texts: List[str] = []
+        for keyword, cfg in keywords.items():
+            cfg = cfg if isinstance(cfg, dict) else {}
+            if cfg.get('is_regex'):
+                continue
+            base = keyword.split()[0] if keyword.split() else keyword
+            for word in [keyword] + [keyword.replace(base, alias, 1) for alias in cfg.get('aliases', [])]:
+                if '{n}' in word:
+                    # Keluarga tanpa max ("max": null) tetap memakai nomor kecil
+                    low = int(cfg.get('min', 1))
+                    high = int(cfg.get('max') or max(low, 100))
+                    texts.extend(word.replace('{n}', str(rnd.randint(low, high))) for _ in range(8))
+                else:
+                    texts.append(word)
+        return texts or list(self._samples)
+
+    def _typo(self, text: str) -> str:
+        rnd = self._random
+        if len(text) < 4:
+            return text + text[-1] * 2
+        i = rnd.randrange(1, len(text) - 1)
+        kind = rnd.random()
+        if kind < 0.4:
+            # Huruf berulang ("keranjaaang")
+            return text[:i] + text[i] * 3 + text[i + 1:]
+        if kind < 0.7:
+            return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+        return text[:i] + text[i + 1:]
+
+    def _pool(self, texts: List[str]) -> List[str]:
+        """Pool text siap pakai dengan campuran typo/emoji sesuai rasio"""
+        rnd = self._random
+        pool = []
+        for i in range(self.POOL_SIZE):
+            text = texts[i % len(texts)]
+            if rnd.random() < self.typo_ratio:
+                text = self._typo(text)
+            if rnd.random() < self.emoji_ratio:
+                emoji = rnd.choice(self.EMOJI) * rnd.randint(1, 3)
+                text = f"{text} {emoji}" if rnd.random() < 0.7 else f"{emoji} {text}"
+            pool.append(text)
+        rnd.shuffle(pool)
+        return pool
+
+    def _reset_stats(self):
+        self.generated = 0
+        self.hits = 0
+        self.missed = 0
+        self.gen_seconds = 0.0
+        self._started_at: Optional[float] = None
+        self._next_arrival = 0.0
+        self._truncated = False
+        self._window = deque(maxlen=20)
+
+    def start(self):
+        self.running = True
+        self._reset_stats()
+        self._started_at = self._next_arrival = time.monotonic()
+        print(f"Generating synthetic comments ({self.process}, {self.rate:g}/s)")
+
+    def _rate_at(self, t: float) -> float:
+        if self.process == 'burst' and self.burst_every > 0:
+            if (t - self._started_at) % self.burst_every < self.burst_duration:
+                return self.burst_rate
+        return self.rate
+
+    def _arrivals(self, now: float) -> int:
+        """Jumlah komentar yang jatuh tempo sampai now; _next_arrival maju sesuai proses kedatangan"""
+        if self.duration is not None:
+            now = min(now, self._started_at + float(self.duration))
+        if now - self._next_arrival > self.max_lag:
+            skipped = now - self.max_lag - self._next_arrival
+            self.missed += int(skipped * self._rate_at(self._next_arrival))
+            self._next_arrival = now - self.max_lag
+        count = 0
+        expovariate = self._random.expovariate
+        steady = self.process == 'steady'
+        while self._next_arrival <= now and count < self.max_per_poll:
+            count += 1
+            rate = self._rate_at(self._next_arrival)
+            if rate <= 0:
+                self._next_arrival = now + self.poll_interval
+                break
+            self._next_arrival += 1.0 / rate if steady else expovariate(rate)
+        return count
+
+    def catching_up(self) -> bool:
+        """Poll sebelumnya terpotong max_per_poll: sisa kedatangan yang jatuh tempo diambil segera"""
+        return self.running and self._truncated
+
+    def get_new_comments(self) -> List["Comment"]:
+        if not self.running:
+            return []
+        began = time.perf_counter()
+        count = self._arrivals(time.monotonic())
+        out: List[Comment] = []
+        rnd = self._random.random
+        hits, misses, users = self._hits, self._misses, self._users
+        n_pool, n_users = len(hits), len(users)
+        hit_ratio, usernames = self.hit_ratio, self.usernames
+        start = self.generated
+        for i in range(start, start + count):
+            if rnd() < hit_ratio:
+                text = hits[int(rnd() * n_pool)]
+                self.hits += 1
+            else:
+                text = misses[int(rnd() * n_pool)]
+            u = int(rnd() * usernames)
+            c = Comment(username=users[u] if u < n_users else f"user{u}", text=text)
+            if not self._is_duplicate(c, f"load:{i}"):
+                out.append(c)
+        self.generated += count
+        self._truncated = count >= self.max_per_poll
+        if count:
+            self._window.append((time.monotonic(), count))
+        self.gen_seconds += time.perf_counter() - began
+        return out
+
+    def update(self):
+        for comment in self.get_new_comments():
+            self.notify_callbacks(comment)
+
+    def source_stats(self) -> Dict:
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        window = list(self._window)
+        recent = None
+        if len(window) > 1 and window[-1][0] > window[0][0]:
+            recent = round(sum(n for _, n in window[1:]) / (window[-1][0] - window[0][0]), 1)
+        return {
+            'process': self.process,
+            'target_rate': self.rate,
+            'generated': self.generated,
+            'hits': self.hits,
+            'missed': self.missed,
+            'achieved_rate': round(self.generated / elapsed, 1) if elapsed > 0 else None,
+            'recent_rate': recent,
+            # Biaya generator sendiri; jauh di bawah 1/achieved_rate berarti bukan bottleneck
+            'cost_us_per_comment': round(self.gen_seconds / self.generated * 1e6, 2) if self.generated else None,
+            'generator_busy': round(self.gen_seconds / elapsed, 4) if elapsed > 0 else None,
+        }
+
+
 class TikTokLiveConnectorDetector(CommentDetector):
     """Use Node-based TikTok-Live-Connector to stream live comments.
 
-    Spawns a Node process running node_bridge/tiktok_live_bridge.js and reads JSON lines
-    for chat events, converting them to Comment instances consumable by the server loop.
+    Spawns a Node process running node_bridge/tiktok_live_bridge.js. The bridge dedups msgId and
+    writes batched JSON frames to stdout ({"type": "comments", "items": [...]}); its logs arrive
+    on stderr. When the queue grows past high_water the reader stops reading stdout until the
+    consumer drains it below low_water, so the bridge coalesces (and if needed drops) at the source.
+    Once connected the bridge sends a heartbeat frame every heartbeat_ms; health() reports the
+    bridge down when the process exits, TikTok disconnects, the first 'connected' status takes
+    longer than connect_timeout or heartbeats stop for heartbeat_timeout after connecting.
     """
+    push_source = True
+    supervised = True
+
     def __init__(self, config: Dict):
         super().__init__(config)
         src = config.get('comment_source', {})
@@ -393,77 +1025,194 @@ class TikTokLiveConnectorDetector(CommentDetector):
             raise ValueError("comment_source.live_username is required for tiktok_live")
         self.poll_interval = float(src.get('poll_interval', 1.0))
         self.bridge_path = src.get('bridge_path', str(Path('node_bridge') / 'tiktok_live_bridge.js'))
+        bridge = src.get('bridge') or {}
+        self.bridge_args = {flag: str(bridge[key]) for key, flag in (
+            ('flush_ms', '--flush-ms'), ('batch_max', '--batch-max'),
+            ('dedup_size', '--dedup-size'), ('max_pending', '--max-pending'),
+            ('heartbeat_ms', '--heartbeat-ms')) if key in bridge}
+        self.heartbeat_timeout = float(bridge.get('heartbeat_timeout', 15.0))
+        # Resolve room + websocket TikTok bisa lama; heartbeat baru dikirim setelah 'connected'
+        self.connect_timeout = float(bridge.get('connect_timeout', 60.0))
+        self.high_water = int(bridge.get('high_water', 5000))
+        self.low_water = min(int(bridge.get('low_water', 1000)), self.high_water)
         self.proc: Optional[subprocess.Popen] = None
-        self.queue: "Queue[Comment]" = Queue()
         self.running = False
         self._reader_thread: Optional[threading.Thread] = None
+        self._log_thread: Optional[threading.Thread] = None
+        self._resume = threading.Event()
+        self._paused = False
+        self._started_at: Optional[float] = None
+        self._connected_at: Optional[float] = None
+        self.bridge_status: Optional[Dict] = None
+        # Baris stderr terakhir dari bridge untuk diagnosa
+        self.bridge_log: "deque[str]" = deque(maxlen=50)
+        self.counters = {'frames': 0, 'comments': 0, 'parse_errors': 0, 'dropped_by_bridge': 0, 'pauses': 0}
+
+    def _comment(self, item: Dict) -> Optional[Comment]:
+        text = (item.get('comment') or '').strip()
+        if not text:
+            return None
+        user = item.get('user') or {}
+        username = user.get('nickname') or user.get('uniqueId') or 'tiktok'
+        # Bridge mengirim Date.now() (milidetik)
+        c = Comment(username=username, text=text, created_at=_epoch_seconds(item.get('timestamp')))
+        if self._is_duplicate(c, item.get('msgId') or c.dedup_key()):
+            return None
+        return c
+
+    def _handle_frame(self, frame: Dict):
+        kind = frame.get('type')
+        if kind == 'comments':
+            self.counters['dropped_by_bridge'] += int(frame.get('dropped') or 0)
+            items = frame.get('items') or []
+        elif kind == 'comment':
+            # Frame lama: satu event per baris
+            items = [frame]
+        else:
+            if kind == 'status':
+                self.bridge_status = frame
+                print(f"TikTok Live bridge: {frame.get('status')} {frame.get('message') or ''}".rstrip())
+                if frame.get('status') == 'connected':
+                    self._connected_at = time.monotonic()
+                elif frame.get('status') in ('disconnected', 'error'):
+                    self._failed()
+            return
+        for item in items:
+            c = self._comment(item)
+            if c is not None:
+                self.counters['comments'] += 1
+                self._push(c)
+
+    def _wait_for_room(self):
+        """Backpressure: berhenti membaca stdout sampai queue turun ke low_water"""
+        if self.queue.qsize() < self.high_water:
+            return
+        self.counters['pauses'] += 1
+        self._paused = True
+        while self.running and self.queue.qsize() > self.low_water:
+            self._resume.wait(0.05)
+            self._resume.clear()
+        self._paused = False
+
+    def _drain_queue(self, limit: Optional[int] = None) -> List["Comment"]:
+        out = super()._drain_queue(limit)
+        if self._paused and self.queue.qsize() <= self.low_water:
+            self._resume.set()
+        return out
 
     def _reader(self, stream):
-        for line in iter(stream.readline, ''):
+        for line in stream:
+            self._wait_for_room()
+            if not line.strip():
+                continue
             try:
-                data = json.loads(line.strip())
-                if data.get('type') == 'comment':
-                    text = (data.get('comment') or '').strip()
-                    if not text:
-                        continue
-                    user = data.get('user', {})
-                    username = user.get('nickname') or user.get('uniqueId') or 'tiktok'
-                    ts = data.get('timestamp')
-                    if isinstance(ts, (int, float)):
-                        try:
-                            timestamp = datetime.fromtimestamp(int(ts)).strftime("%Y-%m-%d %H:%M:%S")
-                        except Exception:
-                            timestamp = None
-                    else:
-                        timestamp = None
-                    c = Comment(username=username, text=text, timestamp=timestamp)
-                    cid = data.get('msgId') or f"{username}:{text}:{timestamp}"
-                    if cid in self.processed_comments:
-                        continue
-                    self.processed_comments.add(cid)
-                    self.queue.put(c)
-            except Exception:
+                frame = json.loads(line)
+            except ValueError as e:
+                self.counters['parse_errors'] += 1
+                if self.counters['parse_errors'] <= 5 or self.counters['parse_errors'] % 100 == 0:
+                    print(f"TikTok Live bridge: invalid frame ({e}): {line[:120]!r}")
                 continue
+            self.counters['frames'] += 1
+            self._touch()
+            try:
+                self._handle_frame(frame)
+            except Exception as e:
+                print(f"TikTok Live bridge: error handling frame: {e}")
+        if self.running and self.proc is not None and stream is self.proc.stdout:
+            # stdout ditutup = proses bridge keluar
+            self._failed()
+
+    def _log_reader(self, stream):
+        for line in stream:
+            line = line.decode('utf-8', errors='replace').rstrip()
+            if line:
+                self.bridge_log.append(line)
+                print(f"[bridge] {line}")
+
+    def health(self) -> Optional[str]:
+        if not self.running or self.proc is None:
+            return "bridge not running"
+        code = self.proc.poll()
+        if code is not None:
+            return f"bridge exited with code {code}"
+        status = (self.bridge_status or {}).get('status')
+        if status in ('disconnected', 'error'):
+            return f"bridge {status}: {(self.bridge_status or {}).get('message') or 'TikTok connection lost'}"
+        now = time.monotonic()
+        if self._connected_at is None:
+            waited = now - self._started_at
+            if waited > self.connect_timeout:
+                return f"bridge not connected after {waited:.0f}s"
+            return None
+        # Saat backpressure reader sengaja tidak membaca stdout, jadi heartbeat tidak terlihat
+        idle = now - max(self.last_activity or 0.0, self._connected_at)
+        if not self._paused and idle > self.heartbeat_timeout:
+            return f"no heartbeat from bridge for {idle:.0f}s"
+        return None
 
     def start(self):
         if self.running:
             return
         self.running = True
+        self.bridge_status = None
+        self.last_activity = None
+        self._started_at = time.monotonic()
+        self._connected_at = None
         cmd = ["node", self.bridge_path, "--uniqueId", self.username]
+        for flag, value in self.bridge_args.items():
+            cmd += [flag, value]
         try:
-            self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+            self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=1 << 16)
         except FileNotFoundError:
+            self.running = False
             raise RuntimeError("Node.js not found. Please install Node.js to use TikTok-Live-Connector.")
         if not self.proc or not self.proc.stdout:
+            self.running = False
             raise RuntimeError("Failed to start TikTok live bridge process")
         self._reader_thread = threading.Thread(target=self._reader, args=(self.proc.stdout,), daemon=True)
         self._reader_thread.start()
+        self._log_thread = threading.Thread(target=self._log_reader, args=(self.proc.stderr,), daemon=True)
+        self._log_thread.start()
         print(f"Monitoring TikTok Live comments for @{self.username}")
 
     def stop(self):
         self.running = False
+        self._resume.set()
+        proc, self.proc = self.proc, None
         try:
-            if self.proc and self.proc.poll() is None:
-                self.proc.terminate()
+            if proc and proc.poll() is None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
         except Exception:
             pass
-        self.proc = None
+        # Pipe tertutup setelah proses keluar; tunggu reader lama selesai supaya restart tidak
+        # menyisakan dua reader
+        for thread in (self._reader_thread, self._log_thread):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join(timeout=2)
+        self._reader_thread = self._log_thread = None
+
+    def source_stats(self) -> Dict:
+        return {**self.counters, 'queue': self.queue.qsize(), 'paused': self._paused,
+                'high_water': self.high_water, 'low_water': self.low_water,
+                'status': (self.bridge_status or {}).get('status'),
+                'idle_s': round(time.monotonic() - self.last_activity, 3) if self.last_activity else None}
 
-    def get_new_comments(self) -> List["Comment"]:
-        out: List[Comment] = []
-        while True:
-            try:
-                out.append(self.queue.get_nowait())
-            except Empty:
-                break
-        return out
 
 class TikTokSocketIODetector(CommentDetector):
     """Connects to an external Socket.IO server that proxies TikTok live events.
 
     Expects the external server to accept 'setUniqueId' with (uniqueId, options)
     and emit 'chat' events containing at least { comment, uniqueId|nickname }.
+    The client does not reconnect by itself; DetectorSupervisor restarts it when the
+    connection drops so the restart backoff and recovery metrics live in one place.
     """
+    push_source = True
+    supervised = True
+
     def __init__(self, config: Dict):
         super().__init__(config)
         src = config.get('comment_source', {})
@@ -471,12 +1220,12 @@ class TikTokSocketIODetector(CommentDetector):
         self.username = src.get('live_username') or src.get('username') or ''
         if not self.username:
             raise ValueError("comment_source.live_username is required for tiktok_live_socket")
-        self._client = socketio.Client(logger=False, engineio_logger=False)
-        self.queue: "Queue[Comment]" = Queue()
+        self._client = socketio.Client(reconnection=False, logger=False, engineio_logger=False)
         self.running = False
 
         @self._client.event
         def connect():
+            self._touch()
             try:
                 self._client.emit('setUniqueId', self.username, {})
             except Exception:
@@ -491,18 +1240,25 @@ class TikTokSocketIODetector(CommentDetector):
                 nickname = msg.get('nickname') or msg.get('user', {}).get('nickname')
                 unique_id = msg.get('uniqueId') or msg.get('user', {}).get('uniqueId')
                 uname = nickname or unique_id or 'tiktok'
-                c = Comment(username=uname, text=text)
-                cid = msg.get('msgId') or f"{uname}:{text}:{c.timestamp}"
-                if cid in self.processed_comments:
+                c = Comment(username=uname, text=text, created_at=_epoch_seconds(msg.get('createTime')))
+                cid = msg.get('msgId') or c.dedup_key()
+                if self._is_duplicate(c, cid):
                     return
-                self.processed_comments.add(cid)
-                self.queue.put(c)
+                self._push(c)
             except Exception:
                 return
 
         @self._client.event
         def disconnect():
-            pass
+            if self.running:
+                self._failed()
+
+    def health(self) -> Optional[str]:
+        if not self.running:
+            return "not connected"
+        if not self._client.connected:
+            return f"disconnected from {self.server_url}"
+        return None
 
     def start(self):
         if self.running:
@@ -523,20 +1279,16 @@ class TikTokSocketIODetector(CommentDetector):
         except Exception:
             pass
 
-    def get_new_comments(self) -> List["Comment"]:
-        out: List[Comment] = []
-        while True:
-            try:
-                out.append(self.queue.get_nowait())
-            except Empty:
-                break
-        return out
-
 class TikTokLivePyDetector(CommentDetector):
     """Use the Python TikTokLive library to stream live comments.
 
-    Runs a TikTokLiveClient in a background thread and enqueues Comment objects.
+    Runs a TikTokLiveClient in a background thread and enqueues Comment objects. The thread
+    retries on its own; health() reports the source down only when the thread has died or the
+    client stayed disconnected longer than reconnect_grace seconds.
     """
+    push_source = True
+    supervised = True
+
     def __init__(self, config: Dict):
         super().__init__(config)
         src = config.get('comment_source', {})
@@ -545,11 +1297,22 @@ class TikTokLivePyDetector(CommentDetector):
             raise ValueError("comment_source.live_username is required for tiktok_live_py")
         if TikTokLiveClient is None:
             raise RuntimeError("TikTokLive package not installed. Run: pip install TikTokLive")
-        self.queue: "Queue[Comment]" = Queue()
         self.client = TikTokLiveClient(unique_id=self.username)
         self._thread: Optional[threading.Thread] = None
         self.running = False
         self._backoff = 1.0  # seconds, grows on failures
+        self.reconnect_grace = float(src.get('reconnect_grace', 30.0))
+        self._disconnected_at: Optional[float] = None
+
+        @self.client.on("connect")
+        async def on_connect(_event):
+            self._disconnected_at = None
+            self._touch()
+
+        @self.client.on("disconnect")
+        async def on_disconnect(_event):
+            if self._disconnected_at is None:
+                self._disconnected_at = time.monotonic()
 
         @self.client.on("comment")
         async def on_comment(event: CommentEvent):
@@ -558,17 +1321,19 @@ class TikTokLivePyDetector(CommentDetector):
                 if not text:
                     return
                 uname = getattr(event.user, 'nickname', None) or getattr(event.user, 'uniqueId', None) or 'tiktok'
-                c = Comment(username=uname, text=text)
-                cid = getattr(event, 'msg_id', None) or f"{uname}:{text}:{c.timestamp}"
-                if cid in self.processed_comments:
+                base = getattr(event, 'base_message', None)
+                c = Comment(username=uname, text=text,
+                            created_at=_epoch_seconds(getattr(base, 'create_time', None)))
+                cid = getattr(event, 'msg_id', None) or c.dedup_key()
+                if self._is_duplicate(c, cid):
                     return
-                self.processed_comments.add(cid)
-                self.queue.put(c)
+                self._push(c)
             except Exception:
                 return
 
     def _run(self):
-        while self.running:
+        # Setelah restart thread lama berhenti sendiri, thread baru yang memegang client
+        while self.running and self._thread is threading.current_thread():
             try:
                 self.client.run()
                 # If run() returns, break loop unless stopped
@@ -585,10 +1350,19 @@ class TikTokLivePyDetector(CommentDetector):
             # Reset backoff on clean loop
             self._backoff = 1.0
 
+    def health(self) -> Optional[str]:
+        if not self.running or self._thread is None or not self._thread.is_alive():
+            return "client thread not running"
+        since = self._disconnected_at
+        if since is not None and time.monotonic() - since > self.reconnect_grace:
+            return f"disconnected for {time.monotonic() - since:.0f}s"
+        return None
+
     def start(self):
         if self.running:
             return
         self.running = True
+        self._disconnected_at = None
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
         print(f"Monitoring TikTok Live (Python) for @{self.username}")
@@ -600,89 +1374,434 @@ class TikTokLivePyDetector(CommentDetector):
         except Exception:
             pass
 
-    def get_new_comments(self) -> List["Comment"]:
-        out: List[Comment] = []
-        while True:
-            try:
-                out.append(self.queue.get_nowait())
-            except Empty:
-                break
-        return out
+def _replay_records(handle):
+    """Baca sesi rekaman baris per baris -> (epoch detik atau None, Comment, msg_id atau None).
 
-class CommentMatcher:
-    """Match komentar dengan keyword configuration"""
-    def __init__(self, keywords_config: Dict):
-        self.keywords_config = keywords_config
-        self.patterns = self._compile_patterns()
-    
-    def _compile_patterns(self) -> Dict[str, re.Pattern]:
-        """Compile regex patterns untuk setiap keyword"""
-        patterns = {}
-        for keyword, config in self.keywords_config.items():
-            # Check if this keyword is a regex pattern
-            is_regex = config.get('is_regex', False)
-            
-            if is_regex:
-                # Use keyword as-is as regex pattern
+    Baris JSON: frame bridge ({"type": "comments", "items": [...]}, frame lama "comment"), event
+    chat mentah ({comment, user, timestamp, msgId}) atau record journal.py ({"kind": "comment", ...},
+    kind lain dilewati). Baris lain memakai format comments_example.txt ("[timestamp] user: text").
+    """
+    for raw in handle:
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8', errors='replace')
+        line = raw.strip()
+        if not line or line.startswith('#'):
+            continue
+        if not line.startswith('{'):
+            comment = FileCommentDetector.parse_comment_line(line)
+            if comment is None:
+                yield None
+                continue
+            ts = None
+            if comment._timestamp:
                 try:
-                    pattern = re.compile(keyword, re.IGNORECASE)
-                    patterns[keyword] = pattern
-                except re.error as e:
-                    print(f"Warning: Invalid regex pattern '{keyword}': {e}")
-                    # Fallback to literal match
-                    keyword_clean = re.escape(keyword.lower())
-                    pattern = re.compile(r'\b' + keyword_clean + r'\b', re.IGNORECASE)
-                    patterns[keyword] = pattern
+                    ts = datetime.strptime(comment._timestamp.strip(), "%Y-%m-%d %H:%M:%S").timestamp()
+                except ValueError:
+                    pass
+            yield ts, comment, None
+            continue
+        try:
+            frame = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        kind = frame.get('type') or frame.get('kind')
+        if kind == 'comments':
+            items = frame.get('items') or []
+        elif kind in (None, 'comment'):
+            items = [frame]
+        else:
+            continue
+        for item in items:
+            text = (item.get('comment') or item.get('text') or '').strip()
+            if not text:
+                yield None
+                continue
+            user = item.get('user')
+            if isinstance(user, dict):
+                username = user.get('nickname') or user.get('uniqueId')
             else:
-                # Create pattern yang match keyword (case insensitive)
-                # Support "keranjang 1", "krnjg 1", "keranjang1", dll
-                keyword_clean = keyword.lower().replace(" ", r"\s*")
-                pattern = re.compile(r'\b' + keyword_clean + r'\b', re.IGNORECASE)
-                patterns[keyword] = pattern
-        
-        return patterns
+                username = user or item.get('username')
+            comment = Comment(username=username or 'tiktok', text=text)
+            comment.room = item.get('room')
+            ts = _epoch_seconds(item.get('timestamp') or item.get('ts') or item.get('createTime'))
+            yield ts, comment, item.get('msgId') or item.get('id') or item.get('seq')
+
+
+class ReplayCommentDetector(CommentDetector):
+    """Putar ulang sesi live yang direkam untuk uji beban dan regresi.
+
+    Thread replay mengirim komentar sesuai jarak waktu aslinya dibagi speed (1 = real-time,
+    10 = 10x lebih cepat, 0 = secepat mungkin). Jeda sepi bisa dipotong dengan max_gap, dan saat
+    speed 0 thread menunggu jika queue melewati max_pending supaya memori tetap terbatas.
+    Dedup sama seperti sumber aslinya (msgId, atau username + text + timestamp untuk format teks).
+    replay_path juga boleh folder journal (lihat journal.py): segmen diputar berurutan dan start_at
+    (epoch detik) melompat lewat index waktu segmen.
+    """
+    push_source = True
+    # Komentar yang sudah jatuh tempo dikirim per batch maksimal sebanyak ini
+    BATCH_SIZE = 500
+
+    def __init__(self, config: Dict):
+        super().__init__(config)
+        src = config.get('comment_source', {})
+        path = src.get('replay_path') or src.get('file_path')
+        if not path:
+            raise ValueError("comment_source.replay_path is required for replay")
+        self.replay_path = Path(path)
+        if not self.replay_path.exists():
+            raise ValueError(f"Replay file not found: {self.replay_path}")
+        self.speed = max(0.0, float(src.get('speed', 1.0)))
+        max_gap = src.get('max_gap')
+        self.max_gap = float(max_gap) if max_gap is not None else None
+        self.start_offset = float(src.get('start_offset', 0.0))
+        start_at = src.get('start_at')
+        self.start_at = _epoch_seconds(start_at) if start_at is not None else None
+        # Jarak antar baris tanpa timestamp (detik waktu sesi)
+        self.untimed_gap = float(src.get('untimed_gap', 0.1))
+        self.loop = bool(src.get('loop', False))
+        self.max_pending = int(src.get('max_pending', 10000))
+        self.running = False
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.counters = {'records': 0, 'emitted': 0, 'duplicates': 0, 'skipped': 0, 'passes': 0}
+        self.position = 0.0
+        # Total detik sesi yang sudah diputar (semua putaran loop)
+        self.played = 0.0
+        self.behind = 0.0
+        self.finished = False
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._stop_event.clear()
+        self._reset_stats()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='comment-replay')
+        self._thread.start()
+        speed = f"{self.speed:g}x" if self.speed else "as fast as possible"
+        print(f"Replaying comments from {self.replay_path} ({speed})")
+
+    def stop(self):
+        self.running = False
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _wait_for_room(self):
+        while self.running and self.queue.qsize() >= self.max_pending:
+            self._stop_event.wait(0.005)
+
+    def _flush(self, batch: List[Comment]):
+        self._wait_for_room()
+        self._push_many(batch)
+        self.counters['emitted'] += len(batch)
+        batch.clear()
+
+    def _run(self):
+        try:
+            while self.running:
+                self.counters['passes'] += 1
+                self._play(self.counters['passes'])
+                if not self.loop:
+                    break
+        except Exception as e:
+            print(f"Replay stopped: {e}")
+        self.finished = True
+        self._finished_at = time.monotonic()
+        if self.running:
+            stats = self.source_stats()
+            print(f"Replay finished: {stats['emitted']} comments in {stats['elapsed_s']}s "
+                  f"({stats['rate']}/s, {stats['achieved_speed']}x)")
+
+    def _play(self, pass_no: int):
+        """Satu kali putar file; posisi sesi = detik sejak record pertama (jeda dipotong max_gap)"""
+        batch: List[Comment] = []
+        prev_ts = None
+        position = 0.0
+        origin = None
+        seen = False
+        played_before = self.played
+        for record in _replay_records(read_journal_lines(self.replay_path, self.start_at)):
+            if not self.running:
+                return
+            if record is None:
+                self.counters['skipped'] += 1
+                continue
+            ts, comment, msg_id = record
+            if self.start_at is not None and ts is not None and ts < self.start_at:
+                continue
+            self.counters['records'] += 1
+            if ts is not None and prev_ts is not None:
+                gap = max(0.0, ts - prev_ts)
+            elif ts is None and seen:
+                gap = self.untimed_gap
+            else:
+                gap = 0.0
+            seen = True
+            if self.max_gap is not None:
+                gap = min(gap, self.max_gap)
+            position += gap
+            if ts is not None:
+                prev_ts = ts
+            if position < self.start_offset:
+                continue
+            if origin is None:
+                origin = time.monotonic()
+                self._started_at = self._started_at or origin
+            self.position = position
+            self.played = played_before + position - self.start_offset
+            if self.speed:
+                delay = origin + (position - self.start_offset) / self.speed - time.monotonic()
+                self.behind = max(0.0, -delay)
+                if delay > 0:
+                    self._flush(batch)
+                    if self._stop_event.wait(delay):
+                        return
+            # Diterima "sekarang", bukan saat baris dibaca dari file
+            comment.received_ns = time.monotonic_ns()
+            # Putaran loop berikutnya memakai id berbeda supaya tidak dianggap duplikat
+            comment_id = f"replay{pass_no}:{msg_id or comment.dedup_key()}"
+            if self._is_duplicate(comment, comment_id):
+                self.counters['duplicates'] += 1
+                continue
+            batch.append(comment)
+            if len(batch) >= self.BATCH_SIZE:
+                self._flush(batch)
+        self._flush(batch)
+
+    def update(self):
+        """Untuk loop berbasis callback (main.py): serahkan komentar yang sudah jatuh tempo"""
+        for comment in self.get_new_comments():
+            self.notify_callbacks(comment)
+
+    def source_stats(self) -> Dict:
+        start = self._started_at
+        elapsed = ((self._finished_at or time.monotonic()) - start) if start else 0.0
+        return {
+            **self.counters,
+            'queue': self.queue.qsize(),
+            'speed': self.speed,
+            'position_s': round(self.position, 3),
+            'elapsed_s': round(elapsed, 3),
+            'rate': round(self.counters['emitted'] / elapsed, 1) if elapsed > 0 else None,
+            'achieved_speed': round(self.played / elapsed, 2) if elapsed > 0 else None,
+            'behind_ms': round(self.behind * 1000, 1),
+            'finished': self.finished,
+        }
+
+
+class CommentMatcher:
+    """Match komentar dengan keyword configuration"""
+    def __init__(self, keywords_config: Dict, cache_size: int = 1024, fuzzy: Optional[Dict] = None,
+                 regex: Optional[Dict] = None):
+        self.cache_size = cache_size
+        # matcher_settings.fuzzy, mis. {"enabled": true, "max_distance": 1, "time_budget_ms": 2}
+        self.fuzzy = fuzzy
+        # matcher_settings.regex, mis. {"budget_ms": 50, "guard": true, "overruns": 3, "cooldown": 300}
+        regex = regex or {}
+        self.profiler = RegexProfiler(**{k: regex[k] for k in ('budget_ms', 'guard', 'overruns', 'cooldown')
+                                         if k in regex})
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # (index, cache) selalu diganti bersamaan supaya cache tidak pernah basi
+        self._state = (KeywordIndex(keywords_config, fuzzy=fuzzy, profiler=self.profiler), OrderedDict())
+
+    @property
+    def index(self) -> KeywordIndex:
+        return self._state[0]
+
+    def _publish(self, index: KeywordIndex):
+        """Pasang snapshot index baru beserta cache kosong dalam satu assignment"""
+        self._state = (index, OrderedDict())
+
+    def reload(self, keywords_config: Dict):
+        """Rebuild index dari config baru dan kosongkan cache secara atomik"""
+        index = KeywordIndex(keywords_config, fuzzy=self.fuzzy, profiler=self.profiler)
+        with self._write_lock:
+            self._publish(index)
+
+    def add_keyword(self, keyword: str, config: Dict):
+        """Tambah (atau ganti) satu keyword tanpa rebuild seluruh index"""
+        with self._write_lock:
+            self._publish(self._state[0].with_keyword(keyword, config))
+
+    def update_keyword(self, old_keyword: str, keyword: str, config: Dict):
+        """Ganti keyword lama dengan keyword/config baru"""
+        with self._write_lock:
+            index = self._state[0]
+            if old_keyword != keyword:
+                index = index.without_keyword(old_keyword)
+            self._publish(index.with_keyword(keyword, config))
+
+    def remove_keyword(self, keyword: str):
+        """Hapus satu keyword dari index"""
+        with self._write_lock:
+            self._publish(self._state[0].without_keyword(keyword))
+
+    def find_rules(self, text) -> Tuple[KeywordRule, ...]:
+        """Return KeywordRule yang match untuk text atau Comment (LRU cache, tanpa copy).
+
+        Rule dan tuple hasil dipakai bersama; jangan diubah. Key cache = text ternormalisasi, kecuali ada keyword regex (regex melihat text
+        lowercase asli, jadi key-nya juga text lowercase).
+        """
+        if isinstance(text, Comment):
+            lowered, normalized = text.text, text.normalized
+        else:
+            lowered = (text or '').lower()
+            normalized = normalize_text(lowered)
+        index, cache = self._state
+        key = lowered if index.regex_rules else normalized
+        with self._lock:
+            result = cache.get(key)
+            if result is not None:
+                cache.move_to_end(key)
+                self.cache_hits += 1
+                return result
+            self.cache_misses += 1
+        result = tuple(index.search(lowered, normalized))
+        if self.cache_size > 0:
+            with self._lock:
+                cache[key] = result
+                if len(cache) > self.cache_size:
+                    cache.popitem(last=False)
+        return result
+
+    def cache_stats(self) -> Dict:
+        """Statistik cache untuk sizing"""
+        with self._lock:
+            total = self.cache_hits + self.cache_misses
+            return {
+                'size': len(self._state[1]),
+                'capacity': self.cache_size,
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'hit_rate': round(self.cache_hits / total, 4) if total else 0.0,
+            }
     
     def match(self, comment: Comment) -> Optional[Dict]:
         """Match komentar dengan configuration"""
-        comment_text = comment.text.lower()
-        
-        # Cek setiap pattern
-        for keyword, pattern in self.patterns.items():
-            if pattern.search(comment_text):
-                config = self.keywords_config[keyword].copy()
-                config['matched_keyword'] = keyword
-                config['comment'] = comment
-                return config
-        
-        return None
+        matches = self.find_rules(comment)
+        if not matches:
+            return None
+        config = matches[0].config.copy()
+        config['matched_keyword'] = matches[0].keyword
+        config['comment'] = comment
+        return config
+
+    def find_match(self, text) -> Tuple[Optional[str], Optional[Dict]]:
+        """Match plain text (atau Comment) dan return (keyword, config)"""
+        matches = self.find_rules(text)
+        if not matches:
+            return None, None
+        return matches[0].keyword, matches[0].config.copy()
+
+    def find_all_matches(self, text) -> List[Tuple[str, Dict]]:
+        """Return all matching (keyword, config) pairs for the given text or Comment."""
+        return [(rule.keyword, rule.config.copy()) for rule in self.find_rules(text)]
+
+
+class MultiRoomDetector(CommentDetector):
+    """Pantau beberapa akun live sekaligus dalam satu proses.
+
+    comment_source.rooms berisi satu comment_source per room (ditambah "room" sebagai nama dan
+    opsional "comment_keywords" sendiri). Setiap room punya detector anak sendiri (untuk
+    tiktok_live berarti satu proses bridge Node per room); stream() menggabungkan stream semua
+    anak dan setiap komentar diberi tag comment.room.
+    """
+    push_source = True
+
+    def __init__(self, config: Dict):
+        super().__init__(config)
+        rooms = config.get('comment_source', {}).get('rooms') or []
+        if not rooms:
+            raise ValueError("comment_source.rooms is required for multi_room")
+        self.children: "OrderedDict[str, CommentDetector]" = OrderedDict()
+        for i, source in enumerate(rooms):
+            room = str(source.get('room') or source.get('live_username') or f"room{i + 1}")
+            if room in self.children:
+                raise ValueError(f"Duplicate room name: {room}")
+            if source.get('type') == 'multi_room':
+                raise ValueError("multi_room cannot be nested")
+            self.children[room] = create_comment_detector({**config, 'comment_source': source})
+        self.start_errors: Dict[str, str] = {}
+        self.running = False
+
+    @staticmethod
+    def _tag(comments: List["Comment"], room: str) -> List["Comment"]:
+        for comment in comments:
+            comment.room = room
+        return comments
+
+    def add_callback(self, callback: Callable):
+        super().add_callback(callback)
+        for room, child in self.children.items():
+            child.add_callback(lambda comment, room=room: callback(self._tag([comment], room)[0]))
+
+    def start(self):
+        """Start semua room; room yang gagal dicatat di start_errors, gagal semua = error"""
+        self.start_errors = {}
+        for room, child in self.children.items():
+            try:
+                child.start()
+            except Exception as e:
+                self.start_errors[room] = str(e)
+                print(f"Room {room} failed to start: {e}")
+        if len(self.start_errors) == len(self.children):
+            raise RuntimeError(f"All rooms failed to start: {self.start_errors}")
+        self.running = True
+
+    def stop(self):
+        self.running = False
+        for child in self.children.values():
+            try:
+                child.stop()
+            except Exception as e:
+                print(f"Error stopping room: {e}")
+
+    def get_new_comments(self) -> List["Comment"]:
+        out: List[Comment] = []
+        for room, child in self.children.items():
+            out.extend(self._tag(child.get_new_comments(), room))
+        return out
+
+    def update(self):
+        for child in self.children.values():
+            child.update()
+
+    async def stream(self, max_batch: int = 64) -> AsyncIterator[List["Comment"]]:
+        """Gabungan stream semua room (push maupun poll) dalam satu event loop"""
+        merged: "asyncio.Queue[List[Comment]]" = asyncio.Queue()
+
+        async def pump(room: str, child: CommentDetector):
+            try:
+                async for batch in child.stream(max_batch):
+                    await merged.put(self._tag(batch, room))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Room {room} stream stopped: {e}")
+
+        tasks = [asyncio.ensure_future(pump(room, child)) for room, child in self.children.items()]
+        try:
+            while True:
+                yield await merged.get()
+        finally:
+            for task in tasks:
+                task.cancel()
 
-    def find_match(self, text: str) -> Tuple[Optional[str], Optional[Dict]]:
-        """Match plain text dan return (keyword, config)"""
-        text_l = (text or '').lower()
-        for keyword, pattern in self.patterns.items():
-            if pattern.search(text_l):
-                cfg = self.keywords_config[keyword].copy()
-                return keyword, cfg
-        return None, None
-
-    def find_match(self, text: str):
-        """Compatibility: return (keyword, config) by matching plain text"""
-        text_l = (text or '').lower()
-        for keyword, pattern in self.patterns.items():
-            if pattern.search(text_l):
-                cfg = self.keywords_config[keyword].copy()
-                return keyword, cfg
-        return None, None
-
-    def find_all_matches(self, text: str) -> List[Tuple[str, Dict]]:
-        """Return all matching (keyword, config) pairs for the given text."""
-        text_l = (text or '').lower()
-        matches: List[Tuple[str, Dict]] = []
-        for keyword, pattern in self.patterns.items():
-            if pattern.search(text_l):
-                cfg = self.keywords_config[keyword].copy()
-                matches.append((keyword, cfg))
-        return matches
+    def source_stats(self) -> Dict:
+        return {room: {'dedup': child.processed_comments.stats(), 'source': child.source_stats(),
+                       'start_error': self.start_errors.get(room)}
+                for room, child in self.children.items()}
 
 
 def create_comment_detector(config: Dict) -> CommentDetector:
@@ -694,6 +1813,8 @@ def create_comment_detector(config: Dict) -> CommentDetector:
     elif source_type == 'tiktok':
         return TikTokCommentDetector(config)
     elif source_type == 'tiktok_dummy':
+        if config['comment_source'].get('load'):
+            return LoadGeneratorDetector(config)
         return DummyTikTokCommentDetector(config)
     elif source_type == 'tiktok_live':
         return TikTokLiveConnectorDetector(config)
@@ -701,6 +1822,10 @@ def create_comment_detector(config: Dict) -> CommentDetector:
         return TikTokSocketIODetector(config)
     elif source_type == 'tiktok_live_py':
         return TikTokLivePyDetector(config)
+    elif source_type == 'multi_room':
+        return MultiRoomDetector(config)
+    elif source_type == 'replay':
+        return ReplayCommentDetector(config)
     else:
         raise ValueError(f"Unknown comment source type: {source_type}")
 
@@ -0,0 +1,80 @@
+"""
+Comment Pipeline Module
+Konsumsi CommentDetector.stream() di event loop asyncio (thread sendiri) dan proses setiap batch
+komentar segera setelah tiba, tanpa interval polling tetap
+"""
+import asyncio
+import threading
+from typing import Callable, List, Optional
+
+
+class CommentPipeline:
+    """Jalankan detector.stream() dan panggil process_batch(comments) untuk setiap batch.
+
+    process_batch dipanggil di thread pipeline; exception-nya diteruskan ke on_error sehingga
+    satu batch gagal tidak menghentikan stream.
+    """
+    def __init__(self, detector, process_batch: Callable[[List], None], max_batch: int = 64,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        self.detector = detector
+        self.process_batch = process_batch
+        self.max_batch = max(1, int(max_batch))
+        self.on_error = on_error or (lambda e: print(f"Error processing comments: {e}"))
+        self.batches = 0
+        self.comments = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Mulai event loop pipeline di background thread"""
+        if self.running:
+            return
+        self._started.clear()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='comment-pipeline')
+        self._thread.start()
+        self._started.wait(timeout=5)
+
+    def stop(self, timeout: float = 5.0):
+        """Hentikan stream dan tunggu thread pipeline selesai"""
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        self._task = loop.create_task(self._consume())
+        self._started.set()
+        try:
+            loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.on_error(e)
+        finally:
+            try:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            finally:
+                loop.close()
+
+    async def _consume(self):
+        async for batch in self.detector.stream(self.max_batch):
+            self.batches += 1
+            self.comments += len(batch)
+            try:
+                self.process_batch(batch)
+            except Exception as e:
+                self.on_error(e)
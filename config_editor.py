@@ -8,6 +8,7 @@ import json
 import shutil
 from pathlib import Path
 import re
+from keyword_index import regex_safety_issue
 
 
 class ConfigEditorWindow:
@@ -166,12 +167,14 @@ class ConfigEditorWindow:
                     return
                 del self.config['comment_keywords'][keyword]
             
-            # Update data
-            self.config['comment_keywords'][new_keyword] = {
+            # Update data (field lain seperti aliases template slot tetap dipertahankan)
+            updated = dict(current_data)
+            updated.update({
                 'video_path': dialog.result['video_path'],
                 'response_text': dialog.result['response_text'],
                 'is_regex': dialog.result.get('is_regex', False)
-            }
+            })
+            self.config['comment_keywords'][new_keyword] = updated
             
             self.load_keywords()
             self.status_label.config(text=f"Updated keyword: {new_keyword}")
@@ -229,8 +232,14 @@ class ConfigEditorWindow:
                     if match:
                         num = match.group(1)
                         keyword = f"keranjang {num}"
+                        family = self.config.get('comment_keywords', {}).get("keranjang {n}")
                         
-                        if keyword not in self.config.get('comment_keywords', {}):
+                        if family is not None:
+                            # Template slot sudah ada: cukup catat video yang tidak sesuai template
+                            video_path = f"videos/{src.name}"
+                            if family.get('video_path', '').replace('{n}', str(int(num))) != video_path:
+                                family.setdefault('videos', {})[str(int(num))] = video_path
+                        elif keyword not in self.config.get('comment_keywords', {}):
                             if 'comment_keywords' not in self.config:
                                 self.config['comment_keywords'] = {}
                             
@@ -499,6 +508,12 @@ class KeywordEditorDialog:
                                    f"Invalid regex pattern:\n{e}",
                                    parent=self.dialog)
                 return
+            issue = regex_safety_issue(keyword)
+            if issue:
+                messagebox.showerror("Unsafe Regex", 
+                                   f"Regex pattern bisa membuat matcher hang:\n{issue}",
+                                   parent=self.dialog)
+                return
         
         self.result = {
             'keyword': keyword,
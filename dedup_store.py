@@ -0,0 +1,169 @@
+"""
+Dedup Store Module
+Penyimpanan id komentar yang sudah diproses, dibatasi waktu (TTL) dan jumlah item
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+
+class BloomFilter:
+    """Bloom filter sederhana (double hashing blake2b) dengan kapasitas & target false positive"""
+    def __init__(self, capacity: int, fp_rate: float = 0.001):
+        capacity = max(1, int(capacity))
+        self.capacity = capacity
+        self.bits = max(64, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        array = self.array
+        return all(array[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: str):
+        array = self.array
+        for p in self._positions(key):
+            array[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __len__(self) -> int:
+        return self.count
+
+    def false_positive_rate(self) -> float:
+        """Estimasi peluang false positive dengan jumlah item saat ini"""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    def memory_bytes(self) -> int:
+        return len(self.array)
+
+
+class DedupStore:
+    """Set id komentar dengan TTL dan batas memori, dipakai semua CommentDetector.
+
+    Item disimpan di beberapa bucket waktu (masing-masing ttl/buckets detik). Bucket tertua
+    dibuang saat umurnya melewati ttl, atau lebih awal jika total item melebihi max_items, jadi
+    memori tetap terbatas selama live berjam-jam. Mode set menyimpan hash 64-bit id (false
+    positive praktis nol); mode bloom memakai Bloom filter per bucket dengan target fp_rate
+    sehingga memori tetap per bucket berapa pun panjang id-nya.
+    """
+    def __init__(self, ttl: float = 900.0, max_items: int = 200000, buckets: int = 6,
+                 bloom: bool = False, fp_rate: float = 0.001, clock: Callable[[], float] = time.monotonic):
+        self.ttl = float(ttl)
+        self.max_items = int(max_items)
+        self.bucket_count = max(1, int(buckets))
+        self.bloom = bool(bloom)
+        self.fp_rate = float(fp_rate)
+        self.span = self.ttl / self.bucket_count
+        self.bucket_capacity = max(1, self.max_items // self.bucket_count)
+        self.clock = clock
+        self.evicted = 0
+        self._lock = threading.Lock()
+        # (waktu mulai bucket, set hash / BloomFilter), tertua di kiri
+        self._buckets = deque()
+        self._size = 0
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict]) -> "DedupStore":
+        """Buat store dari config dedup_settings"""
+        settings = settings or {}
+        return cls(**{k: settings[k] for k in ('ttl', 'max_items', 'buckets', 'bloom', 'fp_rate') if k in settings})
+
+    def _new_bucket(self):
+        if self.bloom:
+            return BloomFilter(self.bucket_capacity, self.fp_rate)
+        return set()
+
+    def _key(self, key: str):
+        return key if self.bloom else hash(key)
+
+    def _expire(self, now: float):
+        buckets = self._buckets
+        while buckets and now - buckets[0][0] >= self.ttl:
+            self._drop_oldest()
+        # Bucket baru setiap span detik, atau saat bucket terbaru sudah penuh
+        if not buckets or now - buckets[-1][0] >= self.span or len(buckets[-1][1]) >= self.bucket_capacity:
+            buckets.append((now, self._new_bucket()))
+        # Batas memori: buang bucket tertua lebih awal (bucket terbaru selalu dipertahankan)
+        while self._size > self.max_items and len(buckets) > 1:
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        _, bucket = self._buckets.popleft()
+        self._size -= len(bucket)
+        self.evicted += len(bucket)
+
+    def _contains(self, key) -> bool:
+        return any(key in bucket for _, bucket in self._buckets)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._expire(self.clock())
+            return self._contains(self._key(key))
+
+    def add(self, key: str):
+        with self._lock:
+            self._expire(self.clock())
+            key = self._key(key)
+            if not self._contains(key):
+                self._buckets[-1][1].add(key)
+                self._size += 1
+
+    def seen(self, key: str) -> bool:
+        """Cek lalu tandai dalam satu langkah; True jika key sudah pernah diproses"""
+        with self._lock:
+            self._expire(self.clock())
+            key = self._key(key)
+            if self._contains(key):
+                return True
+            self._buckets[-1][1].add(key)
+            self._size += 1
+            return False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._size = 0
+
+    def false_positive_rate(self) -> float:
+        """Estimasi peluang id baru dianggap duplikat"""
+        with self._lock:
+            if self.bloom:
+                miss = 1.0
+                for _, bucket in self._buckets:
+                    miss *= 1 - bucket.false_positive_rate()
+                return 1 - miss
+            # Tabrakan hash 64-bit
+            return self._size / 2.0 ** 64
+
+    def stats(self) -> Dict:
+        """Ukuran, eviction dan estimasi false positive untuk monitoring"""
+        fp = self.false_positive_rate()
+        with self._lock:
+            if self.bloom:
+                memory = sum(bucket.memory_bytes() for _, bucket in self._buckets)
+            else:
+                # Perkiraan: slot hash table set + objek int per item
+                memory = sum(len(bucket) * 60 for _, bucket in self._buckets)
+            return {
+                'mode': 'bloom' if self.bloom else 'set',
+                'size': self._size,
+                'max_items': self.max_items,
+                'ttl': self.ttl,
+                'buckets': len(self._buckets),
+                'evicted': self.evicted,
+                'false_positive_rate': fp,
+                'memory_bytes': memory,
+            }
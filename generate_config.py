@@ -4,8 +4,12 @@ Script untuk generate config.json dengan 1-100 produk
 """
 import json
 
-def generate_config(num_products: int = 100):
-    """Generate config untuk N produk"""
+def generate_config(num_products: int = 100, template: bool = False):
+    """Generate config untuk N produk
+
+    Dengan template=True, semua produk ditulis sebagai satu entry "keranjang {n}"
+    sehingga ukuran config tidak bertambah seiring jumlah produk.
+    """
     
     config = {
         "obs_settings": {
@@ -27,12 +31,22 @@ def generate_config(num_products: int = 100):
         }
     }
     
-    # Generate keywords untuk N produk
-    for i in range(1, num_products + 1):
-        config["comment_keywords"][f"keranjang {i}"] = {
-            "video_path": f"videos/product_{i}.mp4",
-            "response_text": f"Terima kasih! Produk {i} akan kami proses segera 🎉"
+    if template:
+        # Satu entry template untuk semua produk
+        config["comment_keywords"]["keranjang {n}"] = {
+            "aliases": ["krnjg", "kr"],
+            "video_path": "videos/product_{n}.mp4",
+            "response_text": "Terima kasih! Produk {n} akan kami proses segera 🎉",
+            "min": 1,
+            "max": num_products
         }
+    else:
+        # Generate keywords untuk N produk
+        for i in range(1, num_products + 1):
+            config["comment_keywords"][f"keranjang {i}"] = {
+                "video_path": f"videos/product_{i}.mp4",
+                "response_text": f"Terima kasih! Produk {i} akan kami proses segera 🎉"
+            }
     
     # Save to file
     with open("config.json", "w", encoding="utf-8") as f:
@@ -50,14 +64,17 @@ if __name__ == "__main__":
     import sys
     
     # Check argument
+    args = [a for a in sys.argv[1:] if a != '--template']
+    template = '--template' in sys.argv[1:]
     num = 100
-    if len(sys.argv) > 1:
+    if args:
         try:
-            num = int(sys.argv[1])
+            num = int(args[0])
         except:
-            print("Usage: python generate_config.py [number_of_products]")
+            print("Usage: python generate_config.py [number_of_products] [--template]")
             print("Example: python generate_config.py 50")
+            print("         python generate_config.py 1000 --template")
             sys.exit(1)
     
     print(f"Generating config for {num} products...\n")
-    generate_config(num)
+    generate_config(num, template)
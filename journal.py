@@ -0,0 +1,262 @@
+"""
+Journal Module
+Journal append-only (NDJSON) untuk setiap komentar, keputusan match dan trigger: segmen dirotasi
+per waktu, index waktu jarang per segmen, dan semua tulis disk dikerjakan thread writer
+"""
+import bisect
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from queue import Empty, Full, Queue
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SEGMENT_SUFFIX = '.ndjson'
+INDEX_SUFFIX = '.idx'
+
+
+class CommentJournal:
+    """Tulis record ke segmen journal tanpa memblok pemanggil.
+
+    append() hanya memasukkan dict ke queue (penuh = record dibuang dan dihitung di "dropped").
+    Thread writer mengambil record per batch (maks. batch_max atau setiap flush_interval detik),
+    serialisasi JSON dan menulis satu write() per batch. Segmen baru dibuat setiap segment_seconds
+    (dan selalu saat start, jadi segmen yang terpotong karena crash tidak pernah ditulisi lagi);
+    file .idx di sampingnya berisi "ts offset" untuk record pertama setiap index_interval detik.
+    Record "comment" memakai field yang dibaca sumber replay (ts, user, text, id, room).
+    """
+    def __init__(self, path: str = 'journal', segment_seconds: float = 3600.0, index_interval: float = 10.0,
+                 flush_interval: float = 0.2, batch_max: int = 2000, max_queue: int = 100000,
+                 fsync: bool = False, max_segments: Optional[int] = None):
+        self.path = Path(path)
+        self.segment_seconds = float(segment_seconds)
+        self.index_interval = float(index_interval)
+        self.flush_interval = float(flush_interval)
+        self.batch_max = max(1, int(batch_max))
+        self.fsync = bool(fsync)
+        self.max_segments = int(max_segments) if max_segments else None
+        self.queue: "Queue[Dict]" = Queue(maxsize=max(1, int(max_queue)))
+        self._seq = itertools.count(1)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._segment: Optional[Path] = None
+        self._handle = None
+        self._index = None
+        self._segment_started = 0.0
+        self._offset = 0
+        self._last_indexed: Optional[float] = None
+        self.counters = {'appended': 0, 'written': 0, 'dropped': 0, 'batches': 0, 'bytes': 0,
+                         'segments': 0, 'errors': 0}
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict]) -> Optional["CommentJournal"]:
+        """Buat journal dari config journal; None jika dinonaktifkan"""
+        settings = settings or {}
+        if not settings.get('enabled', True):
+            return None
+        keys = ('path', 'segment_seconds', 'index_interval', 'flush_interval', 'batch_max', 'max_queue',
+                'fsync', 'max_segments')
+        return cls(**{k: settings[k] for k in keys if k in settings})
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='comment-journal')
+        self._thread.start()
+
+    def close(self, timeout: float = 5.0):
+        """Tulis sisa queue lalu tutup segmen"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def append(self, record: Dict) -> bool:
+        """Masukkan record ke queue writer (tidak pernah memblok); False jika dibuang"""
+        record['seq'] = next(self._seq)
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.counters['dropped'] += 1
+            return False
+        self.counters['appended'] += 1
+        return True
+
+    def comment(self, comment, decision: Optional[Dict] = None) -> bool:
+        """Record komentar yang masuk beserta keputusan match-nya"""
+        record = {'kind': 'comment', 'ts': comment.created_at, 'user': comment.username,
+                  'text': comment.raw_text, 'room': comment.room}
+        if decision:
+            record.update(decision)
+        return self.append(record)
+
+    def trigger(self, **fields) -> bool:
+        """Record play_video promo yang dikirim ke player"""
+        return self.append({'kind': 'trigger', 'ts': time.time(), **fields})
+
+    def _run(self):
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch:
+                    try:
+                        self._write(batch)
+                    except OSError as e:
+                        self.counters['errors'] += 1
+                        print(f"Journal write failed: {e}")
+                        self._close_segment()
+                elif self._stop.is_set():
+                    break
+        finally:
+            self._close_segment()
+
+    def _next_batch(self) -> List[Dict]:
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except Empty:
+            return []
+        while len(batch) < self.batch_max:
+            try:
+                batch.append(self.queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict]):
+        now = time.time()
+        if self._handle is None or now - self._segment_started >= self.segment_seconds:
+            self._open_segment(now)
+        lines = []
+        index = []
+        offset = self._offset
+        for record in batch:
+            line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+            ts = record.get('ts')
+            if ts is not None and (self._last_indexed is None or ts - self._last_indexed >= self.index_interval):
+                index.append(f"{ts:.3f} {offset}\n")
+                self._last_indexed = ts
+            data = line.encode('utf-8')
+            lines.append(data)
+            offset += len(data)
+        chunk = b''.join(lines)
+        self._handle.write(chunk)
+        self._handle.flush()
+        if index:
+            self._index.write(''.join(index))
+            self._index.flush()
+        if self.fsync:
+            os.fsync(self._handle.fileno())
+        self._offset = offset
+        self.counters['written'] += len(batch)
+        self.counters['batches'] += 1
+        self.counters['bytes'] += len(chunk)
+
+    def _open_segment(self, now: float):
+        self._close_segment()
+        # Nomor urut lebar tetap supaya urutan nama = urutan waktu walau dibuat di detik yang sama
+        name = datetime.fromtimestamp(now).strftime('comments-%Y%m%d-%H%M%S')
+        same_second = sorted(self.path.glob(f"{name}-*{SEGMENT_SUFFIX}"))
+        n = int(same_second[-1].stem.rsplit('-', 1)[1]) + 1 if same_second else 0
+        segment = self.path / f"{name}-{n:03d}{SEGMENT_SUFFIX}"
+        self._segment = segment
+        self._handle = open(segment, 'ab')
+        self._index = open(segment.with_suffix(INDEX_SUFFIX), 'a', encoding='utf-8')
+        self._segment_started = now
+        self._offset = 0
+        self._last_indexed = None
+        self.counters['segments'] += 1
+        self._prune()
+
+    def _close_segment(self):
+        for handle in (self._handle, self._index):
+            if handle is not None:
+                try:
+                    handle.close()
+                except OSError:
+                    pass
+        self._handle = self._index = None
+
+    def _prune(self):
+        if not self.max_segments:
+            return
+        for segment in segments(self.path)[:-self.max_segments]:
+            for path in (segment, segment.with_suffix(INDEX_SUFFIX)):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict:
+        return {**self.counters, 'queue': self.queue.qsize(), 'path': str(self.path),
+                'segment': self._segment.name if self._segment else None}
+
+
+def segments(path) -> List[Path]:
+    """Segmen journal di folder path, urut waktu (nama file berisi waktu mulai segmen)"""
+    return sorted(Path(path).glob(f"comments-*{SEGMENT_SUFFIX}"))
+
+
+def _load_index(segment: Path) -> Tuple[List[float], List[int]]:
+    times: List[float] = []
+    offsets: List[int] = []
+    try:
+        with open(segment.with_suffix(INDEX_SUFFIX), 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    try:
+                        ts, offset = float(parts[0]), int(parts[1])
+                    except ValueError:
+                        continue
+                    times.append(ts)
+                    offsets.append(offset)
+    except OSError:
+        pass
+    return times, offsets
+
+
+def read_lines(path, since: Optional[float] = None) -> Iterator[bytes]:
+    """Baris NDJSON mentah dari file segmen atau folder journal.
+
+    Dengan since (epoch detik), segmen yang berakhir sebelum since dilewati dan posisi awal dicari
+    lewat index jarang; baris sebelum since masih bisa ikut (maks. satu index_interval).
+    """
+    path = Path(path)
+    files = segments(path) if path.is_dir() else [path]
+    for i, segment in enumerate(files):
+        start = 0
+        if since is not None:
+            times, offsets = _load_index(segment)
+            if i + 1 < len(files):
+                next_times, _ = _load_index(files[i + 1])
+                if next_times and next_times[0] <= since:
+                    continue
+            pos = bisect.bisect_right(times, since) - 1
+            if pos > 0:
+                start = offsets[pos]
+        with open(segment, 'rb') as f:
+            f.seek(start)
+            for line in f:
+                yield line
+
+
+def read_journal(path, since: Optional[float] = None, kinds: Optional[Tuple[str, ...]] = None) -> Iterator[Dict]:
+    """Record journal (dict) dari folder/segmen, dimulai dari since; baris rusak (crash) dilewati"""
+    for line in read_lines(path, since):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if since is not None and (record.get('ts') or 0) < since:
+            continue
+        if kinds is None or record.get('kind') in kinds:
+            yield record
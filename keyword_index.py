@@ -0,0 +1,914 @@
+"""
+Keyword Index Module
+Compiled matching engine untuk comment_keywords: semua keyword dicari dalam satu pass
+"""
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
+
+# Keyword non-regex yang bisa masuk index: kata-kata \w dipisah spasi
+_PLAIN_KEYWORD = re.compile(r'\w+(?: +\w+)*')
+# Placeholder nomor slot pada keyword template, mis. "keranjang {n}"
+SLOT_PLACEHOLDER = '{n}'
+# Nomor slot lebih panjang dari ini tidak pernah valid (juga batas aman int() untuk input penonton)
+MAX_SLOT_DIGITS = 9
+
+# Pipeline normalisasi komentar
+_NON_WORD = re.compile(r'[\W_]+')
+_REPEATED_LETTER = re.compile(r'([^\W\d_])\1{2,}')
+_DIGIT_LETTER = re.compile(r'(?<=\d)(?=[^\W\d_])|(?<=[^\W\d_])(?=\d)')
+
+
+def normalize_text(text: str) -> str:
+    """Normalisasi komentar untuk matching, cache dan dedup.
+
+    NFKC + lowercase, emoji/tanda baca jadi spasi, huruf berulang 3x+ diringkas
+    ("keranjaaaang" -> "keranjang"), angka dipisah dari huruf ("keranjang3" -> "keranjang 3").
+    """
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text)
+    text = text.lower()
+    text = _NON_WORD.sub(' ', text)
+    if _REPEATED_LETTER.search(text):
+        text = _REPEATED_LETTER.sub(r'\1', text)
+    text = _DIGIT_LETTER.sub(' ', text)
+    return ' '.join(text.split())
+
+
+class KeywordRule(NamedTuple):
+    """Hasil match yang sudah di-resolve; immutable dan dipakai ulang untuk setiap komentar"""
+    keyword: str
+    config: Dict
+    video_path: str
+    video_abspath: str
+    video_name: str
+    video_url: str
+    response_text: str
+
+
+def make_rule(keyword: str, config: Dict) -> KeywordRule:
+    """Resolve path, nama file dan URL player untuk satu keyword sekali saja"""
+    video_path = config.get('video_path') or ''
+    return KeywordRule(
+        keyword=keyword,
+        config=config,
+        video_path=video_path,
+        video_abspath=os.path.abspath(video_path) if video_path else '',
+        video_name=os.path.basename(video_path) if video_path else '',
+        video_url=f"/video-absolute?path={quote(video_path)}" if video_path else '',
+        response_text=config.get('response_text', ''),
+    )
+
+
+def is_slot_family(keyword: str) -> bool:
+    """True jika keyword adalah template keluarga slot ("keranjang {n}")"""
+    return SLOT_PLACEHOLDER in keyword
+
+
+class SlotFamily:
+    """Satu entry template yang mewakili banyak slot keranjang.
+
+    Contoh config:
+        "keranjang {n}": {
+            "aliases": ["krnjg", "kr"],
+            "video_path": "videos/product_{n}.mp4",
+            "response_text": "Terima kasih! Produk {n} akan kami proses segera 🎉",
+            "min": 1, "max": 1000,
+            "videos": {"3": "videos/promo_spesial.mp4"}
+        }
+    """
+    # Batas cache slot untuk keluarga tanpa max
+    CACHE_SIZE = 1024
+
+    def __init__(self, keyword: str, config: Dict):
+        self.keyword = keyword
+        self.config = config
+        self.min = int(config.get('min', 1))
+        self.max = int(config['max']) if config.get('max') is not None else None
+        self.overrides = {int(k): v for k, v in (config.get('videos') or {}).items()}
+        self.words: List[str] = []
+        for word in [keyword.replace(SLOT_PLACEHOLDER, '')] + list(config.get('aliases') or []):
+            # Komentar dinormalisasi sebelum matching, alias juga ("Krnjg" -> "krnjg")
+            normalized = normalize_text(word)
+            if normalized and ' ' not in normalized:
+                self.words.append(normalized)
+            elif word.strip():
+                print(f"Warning: Slot alias '{word}' for '{keyword}' must be a single word without digits, ignored")
+        # slot -> rule yang sudah di-resolve; tanpa max nomor berasal dari penonton, jadi dibatasi LRU
+        self._slots: Dict[int, KeywordRule] = OrderedDict()
+        self._slots_lock = threading.Lock()
+
+    def resolve(self, n: int) -> Optional[KeywordRule]:
+        """Return rule untuk slot n, atau None jika di luar range"""
+        if n < self.min or (self.max is not None and n > self.max):
+            return None
+        with self._slots_lock:
+            resolved = self._slots.get(n)
+            if resolved is not None:
+                if self.max is None:
+                    self._slots.move_to_end(n)
+                return resolved
+        slot = str(n)
+        config = {k: v for k, v in self.config.items() if k not in ('aliases', 'min', 'max', 'videos')}
+        config['video_path'] = self.overrides.get(n) or self.config.get('video_path', '').replace(SLOT_PLACEHOLDER, slot)
+        config['response_text'] = self.config.get('response_text', '').replace(SLOT_PLACEHOLDER, slot)
+        config['slot'] = n
+        resolved = make_rule(self.keyword.replace(SLOT_PLACEHOLDER, slot), config)
+        with self._slots_lock:
+            self._slots[n] = resolved
+            if self.max is None and len(self._slots) > self.CACHE_SIZE:
+                self._slots.popitem(last=False)
+        return resolved
+
+
+def compile_keyword_pattern(keyword: str, config: Dict) -> re.Pattern:
+    """Compile regex pattern untuk satu keyword (perilaku asli CommentMatcher)"""
+    if config.get('is_regex', False):
+        # Use keyword as-is as regex pattern
+        try:
+            return re.compile(keyword, re.IGNORECASE)
+        except re.error as e:
+            print(f"Warning: Invalid regex pattern '{keyword}': {e}")
+            # Fallback to literal match
+            keyword_clean = re.escape(keyword.lower())
+            return re.compile(r'\b' + keyword_clean + r'\b', re.IGNORECASE)
+    # Support "keranjang 1", "krnjg 1", "keranjang1", dll
+    keyword_clean = keyword.lower().replace(" ", r"\s*")
+    try:
+        return re.compile(r'\b' + keyword_clean + r'\b', re.IGNORECASE)
+    except re.error:
+        # Karakter regex di keyword biasa: perlakukan sebagai literal
+        return re.compile(r'\b' + re.escape(keyword.lower()).replace(r"\ ", r"\s*") + r'\b', re.IGNORECASE)
+
+
+_REPEATS = (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT)
+_ZERO_WIDTH = (_sre_parse.AT, _sre_parse.ASSERT, _sre_parse.ASSERT_NOT)
+_CATEGORIES = {
+    _sre_parse.CATEGORY_DIGIT: re.compile(r'\d'),
+    _sre_parse.CATEGORY_WORD: re.compile(r'\w'),
+    _sre_parse.CATEGORY_SPACE: re.compile(r'\s'),
+}
+
+
+def _char_class(op, av):
+    """Karakter yang bisa dimakan satu item: (chars, kategori); None = tidak diketahui/semua"""
+    if op is _sre_parse.LITERAL:
+        return frozenset([ord(chr(av).lower())]), frozenset()
+    if op is not _sre_parse.IN:
+        return None
+    chars, categories = set(), set()
+    for item_op, item_av in av:
+        if item_op is _sre_parse.LITERAL:
+            chars.add(ord(chr(item_av).lower()))
+        elif item_op is _sre_parse.RANGE and item_av[1] - item_av[0] <= 256:
+            chars.update(ord(chr(c).lower()) for c in range(item_av[0], item_av[1] + 1))
+        elif item_op is _sre_parse.CATEGORY and item_av in _CATEGORIES:
+            categories.add(item_av)
+        else:
+            return None
+    return frozenset(chars), frozenset(categories)
+
+
+def _union(classes):
+    chars, categories = set(), set()
+    for cls in classes:
+        if cls is None:
+            return None
+        chars |= cls[0]
+        categories |= cls[1]
+    return frozenset(chars), frozenset(categories)
+
+
+def _disjoint(a, b) -> bool:
+    if a is None or b is None or a[0] & b[0]:
+        return False
+    for chars, categories in ((a[0], b[1]), (b[0], a[1])):
+        for category in categories:
+            if any(_CATEGORIES[category].match(chr(c)) for c in chars):
+                return False
+    space = _sre_parse.CATEGORY_SPACE
+    # \d dan \w overlap; \s terpisah dari keduanya
+    return all(x != y and space in (x, y) for x in a[1] for y in b[1])
+
+
+def _consumed(items):
+    """Gabungan semua karakter yang bisa dimakan items"""
+    classes = []
+    for op, av in items:
+        if op in _REPEATS:
+            classes.append(_consumed(av[2]))
+        elif op is _sre_parse.SUBPATTERN:
+            classes.append(_consumed(av[3]))
+        elif op is _sre_parse.BRANCH:
+            classes.extend(_consumed(alt) for alt in av[1])
+        elif op not in _ZERO_WIDTH:
+            classes.append(_char_class(op, av))
+    return _union(classes)
+
+
+def _can_be_empty(items) -> bool:
+    for op, av in items:
+        if op in _REPEATS:
+            if av[0] > 0 and not _can_be_empty(av[2]):
+                return False
+        elif op is _sre_parse.SUBPATTERN:
+            if not _can_be_empty(av[3]):
+                return False
+        elif op is _sre_parse.BRANCH:
+            if not any(_can_be_empty(alt) for alt in av[1]):
+                return False
+        elif op not in _ZERO_WIDTH:
+            return False
+    return True
+
+
+def _first_class(items):
+    """Karakter pertama yang mungkin dimakan items; None jika tidak diketahui"""
+    for op, av in items:
+        if op in _ZERO_WIDTH:
+            continue
+        if op in _REPEATS:
+            return _first_class(av[2]) if av[0] > 0 else None
+        if op is _sre_parse.SUBPATTERN:
+            return _first_class(av[3])
+        if op is _sre_parse.BRANCH:
+            return _union(_first_class(alt) for alt in av[1])
+        return _char_class(op, av)
+    return None
+
+
+def _mandatory_classes(items):
+    """Class item yang wajib muncul di setiap pengulangan items"""
+    for op, av in items:
+        if op is _sre_parse.SUBPATTERN:
+            yield from _mandatory_classes(av[3])
+        elif op in _REPEATS:
+            if av[0] > 0 and len(av[2]) == 1:
+                yield _char_class(*av[2][0])
+        else:
+            yield _char_class(op, av)
+
+
+def _inner(items, kinds):
+    """Item bertipe kinds di dalam items (tidak masuk ke repeat possessive/atomic)"""
+    for op, av in items:
+        if op in kinds:
+            yield op, av
+        if op in _REPEATS:
+            yield from _inner(av[2], kinds)
+        elif op is _sre_parse.SUBPATTERN:
+            yield from _inner(av[3], kinds)
+        elif op is _sre_parse.BRANCH:
+            for alt in av[1]:
+                yield from _inner(alt, kinds)
+
+
+def regex_safety_issue(pattern: str) -> Optional[str]:
+    r"""Cek pattern is_regex sebelum dipakai; return alasan penolakan, atau None jika aman.
+
+    Yang ditolak: regex tidak valid, quantifier bersarang yang body-nya bisa dipecah dengan
+    banyak cara ((a+)+, (\w+\s?)*), dan alternation di dalam repeat yang cabangnya bisa
+    dimulai dengan karakter yang sama atau kosong ((a|ab)*, (ka|kak)+). Konstruksi seperti
+    (\w+\s)+ tetap boleh karena \s wajib dan tidak overlap dengan \w.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern)
+    except re.error as e:
+        return f"invalid regex: {e}"
+    except RecursionError:
+        return "pattern too deeply nested"
+    for op, (lo, hi, body) in _inner(parsed, _REPEATS):
+        if hi <= 1:
+            continue
+        unbounded = hi == _sre_parse.MAXREPEAT
+        for _, (inner_lo, inner_hi, inner_body) in _inner(body, _REPEATS):
+            if inner_hi <= 1 or not (unbounded or inner_hi == _sre_parse.MAXREPEAT):
+                continue
+            repeated = _consumed(inner_body)
+            if not any(_disjoint(cls, repeated) for cls in _mandatory_classes(body)):
+                return "nested quantifiers can backtrack exponentially, e.g. (a+)+"
+        if not unbounded:
+            continue
+        for _, (_, alternatives) in _inner(body, (_sre_parse.BRANCH,)):
+            if any(_can_be_empty(alt) for alt in alternatives):
+                return "repeated alternation has an empty branch, e.g. (a|ab)*"
+            firsts = [_first_class(alt) for alt in alternatives]
+            for i, first in enumerate(firsts):
+                if any(not _disjoint(first, other) for other in firsts[i + 1:]):
+                    return "repeated alternation has overlapping branches, e.g. (a|a)*"
+    return None
+
+
+# Batas jumlah string saat menggabungkan literal dengan alternation, mis. "k(a|e)k"
+_MAX_LITERAL_SET = 16
+
+
+def _exact_strings(op, av) -> Optional[FrozenSet[str]]:
+    """Semua string yang bisa dimakan item, jika terbatas dan hanya literal"""
+    if op is _sre_parse.LITERAL:
+        return frozenset([chr(av).lower()]) if av < 128 else None
+    if op is _sre_parse.IN:
+        if len(av) <= _MAX_LITERAL_SET and all(item_op is _sre_parse.LITERAL and item_av < 128
+                                               for item_op, item_av in av):
+            return frozenset(chr(item_av).lower() for _, item_av in av)
+        return None
+    if op is _sre_parse.SUBPATTERN:
+        alternatives = [av[3]]
+    elif op is _sre_parse.BRANCH:
+        alternatives = av[1]
+    else:
+        return None
+    strings = set()
+    for alt in alternatives:
+        current = {''}
+        for item in alt:
+            exact = _exact_strings(*item)
+            if exact is None or len(current) * len(exact) > _MAX_LITERAL_SET:
+                return None
+            current = {a + b for a in current for b in exact}
+        strings |= current
+    return frozenset(strings) if len(strings) <= _MAX_LITERAL_SET else None
+
+
+def _literal_sets(items) -> Optional[FrozenSet[str]]:
+    """Set string dengan minimal satu anggotanya pasti muncul di setiap match items"""
+    candidates = []
+    current = {''}
+    for op, av in items:
+        exact = _exact_strings(op, av)
+        if exact is not None and len(current) * len(exact) <= _MAX_LITERAL_SET:
+            current = {a + b for a in current for b in exact}
+            continue
+        candidates.append(frozenset(current))
+        current = {''}
+        if exact is not None:
+            current = set(exact)
+        elif op is _sre_parse.SUBPATTERN:
+            candidates.append(_literal_sets(av[3]))
+        elif op in _REPEATS and av[0] > 0:
+            candidates.append(_literal_sets(av[2]))
+        elif op is _sre_parse.BRANCH:
+            alternatives = [_literal_sets(alt) for alt in av[1]]
+            if all(alternatives):
+                candidates.append(frozenset().union(*alternatives))
+    candidates.append(frozenset(current))
+    best = None
+    for candidate in candidates:
+        if not candidate or '' in candidate:
+            continue
+        # Pilih set dengan string terpendek paling panjang, lalu alternatif paling sedikit
+        if best is None or (min(map(len, candidate)), -len(candidate)) > (min(map(len, best)), -len(best)):
+            best = candidate
+    return best
+
+
+def required_literals(pattern: str) -> Optional[FrozenSet[str]]:
+    r"""Literal lowercase yang salah satunya wajib ada di text agar pattern bisa match.
+
+    Mis. r"size\s*(xl|l)" -> {"size"}, r"k(a|e)k" -> {"kak", "kek"}. None jika
+    tidak ada literal yang bisa dipastikan (pattern harus selalu dievaluasi).
+    """
+    try:
+        return _literal_sets(_sre_parse.parse(pattern))
+    except (re.error, RecursionError):
+        return None
+
+
+# Karakter non-ASCII yang match huruf ASCII dengan re.IGNORECASE tapi lower()-nya bukan ASCII
+_IGNORECASE_EXTRA = str.maketrans({'\u0131': 'i', '\u017f': 's', '\u212a': 'k'})
+
+
+class RegexPrefilter:
+    """Inverted index trigram dari literal wajib setiap keyword regex.
+
+    Komentar cukup di-scan sekali (satu dict lookup per posisi) untuk menemukan rule kandidat;
+    rule lain pasti tidak match sehingga regex-nya tidak perlu dievaluasi. Literal < 3 karakter
+    dicek dengan substring, rule tanpa literal wajib selalu jadi kandidat.
+    """
+    GRAM = 3
+
+    def __init__(self, entries):
+        # trigram -> (entry, ...)
+        self.grams: Dict[str, Tuple] = {}
+        # ((entry, literal pendek), ...)
+        self.short: Tuple = ()
+        self.unfiltered: Tuple = ()
+        for entry in entries:
+            literals = entry[2]
+            if not literals:
+                self.unfiltered += (entry,)
+            elif min(map(len, literals)) < self.GRAM:
+                self.short += ((entry, tuple(literals)),)
+            else:
+                for literal in literals:
+                    grams = [literal[i:i + self.GRAM] for i in range(len(literal) - self.GRAM + 1)]
+                    # Gram dengan bucket paling kecil supaya kandidat sesedikit mungkin
+                    gram = min(grams, key=lambda g: len(self.grams.get(g, ())))
+                    if entry not in self.grams.get(gram, ()):
+                        self.grams[gram] = self.grams.get(gram, ()) + (entry,)
+
+    def candidates(self, text: str):
+        """Rule regex yang mungkin match text"""
+        if not (self.grams or self.short):
+            return self.unfiltered
+        probe = text.lower()
+        if not probe.isascii():
+            probe = probe.translate(_IGNORECASE_EXTRA)
+        found = list(self.unfiltered)
+        for entry, literals in self.short:
+            if any(literal in probe for literal in literals):
+                found.append(entry)
+        grams = self.grams
+        if grams:
+            seen = set()
+            size = self.GRAM
+            for i in range(len(probe) - size + 1):
+                entries = grams.get(probe[i:i + size])
+                if entries:
+                    for entry in entries:
+                        if id(entry) not in seen:
+                            seen.add(id(entry))
+                            found.append(entry)
+        return found
+
+
+class RegexProfiler:
+    """Catat biaya evaluasi setiap keyword regex dan karantina pattern yang terlalu lambat.
+
+    Waktu evaluasi diukur dengan jam dinding (ikut termasuk menunggu GIL), jadi satu sampel lambat
+    belum tentu pattern-nya yang mahal: pattern baru dikarantina (tidak dievaluasi lagi) setelah
+    `overruns` evaluasi berturut-turut di atas budget_ms, dan dilepas lagi setelah `cooldown`
+    detik. Dengan guard=True, pattern dari config yang ditolak regex_safety_issue() dikarantina
+    sejak index dibangun sampai keyword diedit. Semua karantina dilepas saat keyword diedit atau
+    dihapus.
+    """
+    def __init__(self, budget_ms: float = 50.0, guard: bool = True, on_quarantine=None,
+                 overruns: int = 3, cooldown: float = 300.0):
+        self.budget_ns = int(float(budget_ms) * 1_000_000)
+        self.guard = guard
+        self.overruns = max(1, int(overruns))
+        self.cooldown = max(0.0, float(cooldown))
+        # Callback (keyword, alasan), mis. untuk activity log
+        self.on_quarantine = on_quarantine
+        # keyword -> [jumlah evaluasi, total ns, ns terlama, overrun berturut-turut]
+        self.stats: Dict[str, List[int]] = {}
+        # keyword -> alasan karantina
+        self.quarantined: Dict[str, str] = {}
+        # keyword -> waktu (monotonic) karantina karena lambat dilepas
+        self._release_at: Dict[str, float] = {}
+
+    def record(self, keyword: str, elapsed_ns: int):
+        entry = self.stats.get(keyword)
+        if entry is None:
+            entry = self.stats[keyword] = [0, 0, 0, 0]
+        entry[0] += 1
+        entry[1] += elapsed_ns
+        if elapsed_ns > entry[2]:
+            entry[2] = elapsed_ns
+        if elapsed_ns <= self.budget_ns:
+            entry[3] = 0
+            return
+        entry[3] += 1
+        if entry[3] >= self.overruns:
+            entry[3] = 0
+            self._release_at[keyword] = time.monotonic() + self.cooldown
+            self.quarantine(keyword, f"{self.overruns} evaluations in a row over budget "
+                                     f"(last {elapsed_ns / 1e6:.1f} ms, budget {self.budget_ns / 1e6:g} ms)")
+
+    def release_due(self, keyword: str) -> bool:
+        """Lepas karantina karena lambat yang cooldown-nya sudah lewat (True jika dilepas)"""
+        release_at = self._release_at.get(keyword)
+        if release_at is None or time.monotonic() < release_at:
+            return False
+        self._release_at.pop(keyword, None)
+        self.quarantined.pop(keyword, None)
+        print(f"Regex keyword '{keyword}' released from quarantine after {self.cooldown:g}s cooldown")
+        return True
+
+    def check(self, keyword: str):
+        """Karantina keyword regex yang tidak aman secara statis"""
+        if self.guard:
+            issue = regex_safety_issue(keyword)
+            if issue:
+                self.quarantine(keyword, issue)
+
+    def quarantine(self, keyword: str, reason: str):
+        if keyword in self.quarantined:
+            return
+        self.quarantined[keyword] = reason
+        print(f"Warning: regex keyword '{keyword}' quarantined: {reason}")
+        if self.on_quarantine is not None:
+            self.on_quarantine(keyword, reason)
+
+    def forget(self, keyword: str):
+        self.stats.pop(keyword, None)
+        self.quarantined.pop(keyword, None)
+        self._release_at.pop(keyword, None)
+
+    def retain(self, keywords):
+        """Buang statistik keyword yang sudah tidak ada di config"""
+        for keyword in [k for k in list(self.stats) + list(self.quarantined) if k not in keywords]:
+            self.forget(keyword)
+
+    def table(self) -> List[Dict]:
+        """Tabel biaya per keyword regex, paling mahal dulu"""
+        rows = []
+        stats = dict(self.stats)
+        quarantined = dict(self.quarantined)
+        release_at = dict(self._release_at)
+        now = time.monotonic()
+        for keyword in set(stats) | set(quarantined):
+            calls, total_ns, max_ns, overruns = stats.get(keyword, (0, 0, 0, 0))
+            rows.append({
+                'keyword': keyword,
+                'calls': calls,
+                'total_ms': round(total_ns / 1e6, 3),
+                'mean_us': round(total_ns / calls / 1e3, 2) if calls else 0.0,
+                'max_us': round(max_ns / 1e3, 2),
+                'quarantined': keyword in quarantined,
+                'reason': quarantined.get(keyword),
+                'overruns': overruns,
+                'release_in_s': round(max(0.0, release_at[keyword] - now), 1)
+                if keyword in quarantined and keyword in release_at else None,
+            })
+        rows.sort(key=lambda row: (not row['quarantined'], -row['total_ms']))
+        return rows
+
+
+def _deletes(word: str, distance: int) -> set:
+    """Semua variasi word dengan menghapus sampai `distance` karakter (termasuk word)"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (typo + transposisi), berhenti di atas limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class FuzzyIndex:
+    """Index symmetric-delete atas kosakata keyword untuk toleransi typo.
+
+    Semua variasi hapus-karakter dari setiap kata keyword dihitung di depan, sehingga
+    lookup "kranjang" / "keranjng" cukup beberapa dict lookup + verifikasi edit distance.
+    Kata pendek (< 8 huruf) maksimal 1 typo; koreksi per komentar dibatasi time_budget_ms.
+    """
+    def __init__(self, words, max_distance: int = 1, min_length: int = 4, time_budget_ms: float = 2.0):
+        self.words = frozenset(words)
+        self.max_distance = int(max_distance)
+        self.min_length = int(min_length)
+        self.time_budget = float(time_budget_ms) / 1000.0
+        self.budget_exceeded = 0
+        # variasi hapus -> kata keyword asal
+        self.deletes: Dict[str, Tuple[str, ...]] = {}
+        for word in self.words:
+            if len(word) < self.min_length:
+                continue
+            for variant in _deletes(word, self._allowed(word)):
+                self.deletes[variant] = self.deletes.get(variant, ()) + (word,)
+
+    def _allowed(self, word: str) -> int:
+        return min(self.max_distance, 1 if len(word) < 8 else 2)
+
+    def lookup(self, word: str) -> Optional[str]:
+        """Kata keyword terdekat untuk word, atau None"""
+        if word in self.words or len(word) < self.min_length or not word.isalpha():
+            return None
+        limit = self._allowed(word)
+        best, best_distance = None, limit + 1
+        for variant in _deletes(word, limit):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate == best:
+                    continue
+                distance = _edit_distance(word, candidate, min(limit, self._allowed(candidate)))
+                if distance < best_distance or (distance == best_distance and best is not None and candidate < best):
+                    best, best_distance = candidate, distance
+        return best if best_distance <= limit else None
+
+    def correct(self, words: List[str]) -> Optional[List[str]]:
+        """Return kata komentar yang sudah dikoreksi, atau None jika tidak ada yang berubah"""
+        deadline = time.perf_counter() + self.time_budget
+        corrected = None
+        for i, word in enumerate(words):
+            replacement = self.lookup(word)
+            if replacement is not None:
+                if corrected is None:
+                    corrected = list(words)
+                corrected[i] = replacement
+            if time.perf_counter() > deadline:
+                self.budget_exceeded += 1
+                break
+        return corrected
+
+
+def _plain_chain(keyword: str, config: Dict) -> Optional[Tuple[str, FrozenSet[int], List[str]]]:
+    """Return (kata digabung, posisi celah, kata-kata) untuk keyword biasa, None jika harus pakai regex"""
+    keyword_l = keyword.lower()
+    if config.get('is_regex', False) or not _PLAIN_KEYWORD.fullmatch(keyword_l):
+        return None
+    # Dicocokkan dengan komentar yang sudah dinormalisasi, jadi keyword juga
+    parts = normalize_text(keyword_l).split()
+    if not parts:
+        return None
+    gaps = []
+    offset = 0
+    for part in parts[:-1]:
+        offset += len(part)
+        gaps.append(offset)
+    return ''.join(parts), frozenset(gaps), parts
+
+
+class KeywordIndex:
+    """Index semua keyword; search() mengembalikan keyword yang match sesuai urutan config.
+
+    Keyword biasa ("keranjang 1") disimpan di hash table dengan key gabungan katanya
+    ("keranjang1") plus posisi celah yang boleh berisi whitespace. Komentar cukup dipecah
+    sekali menjadi run kata, lalu setiap rangkaian run yang dipisah whitespace di-lookup
+    langsung, sehingga biaya per komentar tidak bergantung pada jumlah keyword.
+    Template slot ("keranjang {n}") dicari lewat kata dasar/alias + nomor yang mengikutinya.
+    Keyword regex (dan keyword yang tidak bisa diindex) tetap dievaluasi per pattern.
+
+    Index bersifat immutable. with_keyword()/without_keyword() mengembalikan snapshot baru
+    yang hanya menyalin shard yang disentuh, jadi biaya edit sebanding dengan perubahannya
+    dan thread pembaca selalu melihat snapshot yang konsisten.
+
+    Dengan fuzzy={...} (matcher_settings.fuzzy), kata komentar yang tidak dikenal dikoreksi
+    ke kata keyword terdekat lewat FuzzyIndex sebelum dicocokkan ulang. Dengan profiler,
+    setiap evaluasi keyword regex diukur dan pattern yang dikarantina dilewati.
+    """
+    SHARDS = 64
+
+    def __init__(self, keywords_config: Optional[Dict] = None, fuzzy: Optional[Dict] = None,
+                 profiler: Optional[RegexProfiler] = None):
+        # keyword -> (order, rule), dibagi per shard
+        self.rules: Tuple[Dict[str, Tuple[int, KeywordRule]], ...] = tuple({} for _ in range(self.SHARDS))
+        # joined text -> (((order, rule), gaps), ...), dibagi per shard
+        self.chains: Tuple[Dict[str, Tuple], ...] = tuple({} for _ in range(self.SHARDS))
+        # ((order, rule), pattern, literal wajib), disaring lewat prefilter saat search
+        self.regex_rules: Tuple[Tuple[Tuple[int, KeywordRule], re.Pattern, Optional[FrozenSet[str]]], ...] = ()
+        self.prefilter = RegexPrefilter(())
+        # kata dasar/alias -> ((order, family), ...)
+        self.families: Dict[str, Tuple[Tuple[int, SlotFamily], ...]] = {}
+        # kata keyword -> jumlah pemakai, sumber kosakata fuzzy index
+        self.vocab: Dict[str, int] = {}
+        self.fuzzy_settings = fuzzy
+        self.fuzzy: Optional[FuzzyIndex] = None
+        # Dipakai bersama semua snapshot turunan
+        self.profiler = profiler
+        self.max_parts = 1
+        self.next_order = 0
+        self.size = 0
+        self.version = 0
+        # None = semua shard milik snapshot ini (sedang dibangun)
+        self._owned = None
+        self._vocab_changed = False
+        self._regex_changed = False
+        for keyword, config in (keywords_config or {}).items():
+            self._insert(keyword, config, self.next_order)
+            self.next_order += 1
+        self._build_fuzzy()
+        self._rebuild()
+        if profiler is not None:
+            profiler.retain({entry[0][1].keyword for entry in self.regex_rules})
+
+    def __len__(self) -> int:
+        return self.size
+
+    def get_rule(self, keyword: str) -> Optional[Tuple[int, KeywordRule]]:
+        """Return (order, rule) untuk keyword, atau None"""
+        return self.rules[hash(keyword) % self.SHARDS].get(keyword)
+
+    def with_keyword(self, keyword: str, config: Dict) -> "KeywordIndex":
+        """Snapshot baru dengan keyword ditambah, atau diganti di posisi yang sama"""
+        new = self._clone()
+        old = self.get_rule(keyword)
+        if old is not None:
+            new._remove(old)
+            order = old[0]
+        else:
+            order = new.next_order
+            new.next_order += 1
+        new._insert(keyword, config, order)
+        new._rebuild()
+        return new
+
+    def without_keyword(self, keyword: str) -> "KeywordIndex":
+        """Snapshot baru tanpa keyword (self jika keyword tidak ada)"""
+        old = self.get_rule(keyword)
+        if old is None:
+            return self
+        new = self._clone()
+        new._remove(old)
+        new._rebuild()
+        return new
+
+    def _clone(self) -> "KeywordIndex":
+        new = object.__new__(KeywordIndex)
+        new.__dict__.update(self.__dict__)
+        new.version = self.version + 1
+        new._owned = set()
+        return new
+
+    def _shard(self, name: str, key: str) -> Dict:
+        """Shard untuk key yang boleh diubah (copy-on-write pada snapshot hasil clone)"""
+        i = hash(key) % self.SHARDS
+        shards = getattr(self, name)
+        if self._owned is not None and (name, i) not in self._owned:
+            shards = list(shards)
+            shards[i] = dict(shards[i])
+            setattr(self, name, tuple(shards))
+            self._owned.add((name, i))
+        return shards[i]
+
+    def _own_families(self) -> Dict:
+        if self._owned is not None and 'families' not in self._owned:
+            self.families = dict(self.families)
+            self._owned.add('families')
+        return self.families
+
+    def _count_words(self, words: List[str], delta: int):
+        """Update kosakata keyword (dipakai fuzzy index), copy-on-write"""
+        if self._owned is not None and 'vocab' not in self._owned:
+            self.vocab = dict(self.vocab)
+            self._owned.add('vocab')
+        for word in words:
+            if not word.isalpha():
+                continue
+            count = self.vocab.get(word, 0) + delta
+            if count > 0:
+                self.vocab[word] = count
+            else:
+                self.vocab.pop(word, None)
+                self._vocab_changed = True
+            if count == 1 and delta > 0:
+                self._vocab_changed = True
+
+    def _rebuild(self):
+        """Bangun ulang struktur turunan yang berubah setelah insert/remove"""
+        if self._vocab_changed:
+            self._build_fuzzy()
+        if self._regex_changed:
+            self.prefilter = RegexPrefilter(self.regex_rules)
+            self._regex_changed = False
+
+    def _build_fuzzy(self):
+        if self.fuzzy_settings and self.fuzzy_settings.get('enabled', True):
+            self.fuzzy = FuzzyIndex(self.vocab, **{
+                k: self.fuzzy_settings[k] for k in ('max_distance', 'min_length', 'time_budget_ms')
+                if k in self.fuzzy_settings
+            })
+        else:
+            self.fuzzy = None
+        self._vocab_changed = False
+
+    def _insert(self, keyword: str, config: Dict, order: int):
+        rule = (order, make_rule(keyword, config))
+        self._shard('rules', keyword)[keyword] = rule
+        self.size += 1
+        if is_slot_family(keyword):
+            family = SlotFamily(keyword, config)
+            families = self._own_families()
+            for word in family.words:
+                families[word] = families.get(word, ()) + ((order, family),)
+            self._count_words(family.words, 1)
+            return
+        chain = _plain_chain(keyword, config)
+        if chain is not None:
+            joined, gaps, parts = chain
+            shard = self._shard('chains', joined)
+            shard[joined] = shard.get(joined, ()) + ((rule, gaps),)
+            self.max_parts = max(self.max_parts, len(parts))
+            self._count_words(parts, 1)
+        else:
+            pattern = compile_keyword_pattern(keyword, config)
+            self.regex_rules = self.regex_rules + ((rule, pattern, required_literals(pattern.pattern)),)
+            self._regex_changed = True
+            if self.profiler is not None and config.get('is_regex', False):
+                self.profiler.check(keyword)
+
+    def _remove(self, rule: Tuple[int, KeywordRule]):
+        order, keyword, config = rule[0], rule[1].keyword, rule[1].config
+        del self._shard('rules', keyword)[keyword]
+        self.size -= 1
+        if is_slot_family(keyword):
+            families = self._own_families()
+            words = SlotFamily(keyword, config).words
+            for word in words:
+                remaining = tuple(entry for entry in families.get(word, ()) if entry[0] != order)
+                if remaining:
+                    families[word] = remaining
+                else:
+                    families.pop(word, None)
+            self._count_words(words, -1)
+            return
+        chain = _plain_chain(keyword, config)
+        if chain is not None:
+            # max_parts tidak diperkecil; cukup sebagai batas atas
+            joined = chain[0]
+            self._count_words(chain[2], -1)
+            shard = self._shard('chains', joined)
+            remaining = tuple(entry for entry in shard.get(joined, ()) if entry[0][0] != order)
+            if remaining:
+                shard[joined] = remaining
+            else:
+                shard.pop(joined, None)
+        else:
+            self.regex_rules = tuple(entry for entry in self.regex_rules if entry[0][0] != order)
+            self._regex_changed = True
+            if self.profiler is not None:
+                self.profiler.forget(keyword)
+
+    def _match_slot(self, word: str, number: str, position: int, hits: Dict):
+        if len(number) > MAX_SLOT_DIGITS:
+            return
+        n = int(number)
+        for order, family in self.families.get(word, ()):
+            resolved = family.resolve(n)
+            if resolved is not None:
+                hits.setdefault((order, position), resolved)
+
+    def _scan(self, words: List[str], hits: Dict):
+        """Cari keyword biasa dan template slot pada kata-kata komentar ternormalisasi"""
+        chains = self.chains
+        shards = self.SHARDS
+        families = self.families
+        max_parts = self.max_parts
+        for i in range(len(words)):
+            joined = words[i]
+            # Setelah normalisasi "keranjang12" menjadi "keranjang 12"
+            if families and i and joined.isdecimal() and words[i - 1] in families:
+                self._match_slot(words[i - 1], joined, i, hits)
+            bounds: List[int] = []
+            j = i
+            while True:
+                entries = chains[hash(joined) % shards].get(joined)
+                if entries:
+                    for rule, gaps in entries:
+                        if all(b in gaps for b in bounds):
+                            hits.setdefault((rule[0], -1), rule[1])
+                j += 1
+                if j >= len(words) or j - i >= max_parts:
+                    break
+                bounds.append(len(joined))
+                joined += words[j]
+
+    def search(self, text: str, normalized: Optional[str] = None) -> List[KeywordRule]:
+        """Return semua KeywordRule yang match, urut sesuai config.
+
+        Keyword biasa dan template slot dicocokkan dengan normalize_text(text), keyword regex
+        dengan text lowercase apa adanya. Rule dipakai bersama oleh semua komentar; config di
+        dalamnya jangan diubah.
+        """
+        if normalized is None:
+            normalized = normalize_text(text)
+        # (order, posisi) -> rule
+        hits: Dict[Tuple[int, int], KeywordRule] = {}
+        if self.size:
+            words = normalized.split()
+            self._scan(words, hits)
+            if self.fuzzy is not None:
+                corrected = self.fuzzy.correct(words)
+                if corrected is not None:
+                    self._scan(corrected, hits)
+        profiler = self.profiler
+        for rule, pattern, _ in self.prefilter.candidates(text) if self.regex_rules else ():
+            if profiler is None:
+                matched = pattern.search(text)
+            else:
+                keyword = rule[1].keyword
+                if keyword in profiler.quarantined and not profiler.release_due(keyword):
+                    continue
+                start = time.perf_counter_ns()
+                matched = pattern.search(text)
+                profiler.record(keyword, time.perf_counter_ns() - start)
+            if matched:
+                hits.setdefault((rule[0], -1), rule[1])
+        return [hits[key] for key in sorted(hits)]
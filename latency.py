@@ -0,0 +1,142 @@
+"""
+Latency Module
+Histogram latency per tahap trigger: komentar dibuat di sumber -> diterima detector -> dedup ->
+diproses pipeline -> match -> play_video di-emit -> player benar-benar mulai memutar
+"""
+import bisect
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+# Batas atas bucket (milidetik); bucket terakhir menampung sisanya
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Urutan tahap seperti yang dialami satu komentar, plus total dari terima sampai player memutar
+STAGES = OrderedDict([
+    ('source', "Sumber -> detector (timestamp bridge/TikTokLive)"),
+    ('dedup', "Terima -> lolos dedup"),
+    ('queue', "Dedup -> diproses pipeline (antrian/polling)"),
+    ('match', "Matching keyword"),
+    ('emit', "Diproses -> play_video di-emit"),
+    ('player', "play_video -> player 'playing'"),
+    ('total', "Terima -> player 'playing'"),
+])
+
+
+class LatencyHistogram:
+    """Histogram bucket tetap (ms) dengan count/sum/min/max dan estimasi persentil"""
+    def __init__(self, bounds=BUCKET_BOUNDS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, ms: float):
+        ms = max(0.0, ms)
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Batas atas bucket yang memuat persentil q (0-1); dibatasi nilai max yang tercatat"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, cumulative in zip(self.bounds + (self.max,), itertools.accumulate(self.counts)):
+            if cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict:
+        labels = [f"<={b:g}" for b in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 3) if self.count else None,
+            'min_ms': round(self.min, 3) if self.min is not None else None,
+            'p50_ms': self.percentile(0.5),
+            'p90_ms': self.percentile(0.9),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max, 3) if self.max is not None else None,
+            'buckets': {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class LatencyTracker:
+    """Kumpulan histogram per tahap + trigger yang menunggu laporan 'playing' dari player"""
+    MAX_PENDING = 256
+    PENDING_TTL = 120.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+            # trigger_id -> (emit monotonic ns, received monotonic ns atau None)
+            self._pending: "OrderedDict[int, tuple]" = OrderedDict()
+            self.started_at = time.time()
+
+    def record(self, stage: str, ms: float):
+        with self._lock:
+            self.histograms[stage].record(ms)
+
+    def record_ns(self, stage: str, start_ns: Optional[int], end_ns: Optional[int]):
+        """Catat selisih dua stempel time.monotonic_ns(); dilewati jika salah satunya tidak ada"""
+        if start_ns is not None and end_ns is not None:
+            self.record(stage, (end_ns - start_ns) / 1e6)
+
+    def record_comment(self, comment, dispatched_ns: int, matched_ns: int):
+        """Tahap source/dedup/queue/match untuk satu komentar yang diproses pipeline"""
+        if comment.source_lag is not None:
+            self.record('source', comment.source_lag * 1000)
+        self.record_ns('dedup', comment.received_ns, comment.dedup_ns)
+        self.record_ns('queue', comment.dedup_ns or comment.received_ns, dispatched_ns)
+        self.record_ns('match', dispatched_ns, matched_ns)
+
+    def begin_trigger(self, received_ns: Optional[int] = None, dispatched_ns: Optional[int] = None) -> int:
+        """Tandai play_video yang akan di-emit; return trigger_id untuk payload ke player"""
+        now = time.monotonic_ns()
+        self.record_ns('emit', dispatched_ns, now)
+        with self._lock:
+            trigger_id = next(self._ids)
+            self._pending[trigger_id] = (now, received_ns)
+            cutoff = now - int(self.PENDING_TTL * 1e9)
+            while self._pending and (len(self._pending) > self.MAX_PENDING
+                                     or next(iter(self._pending.values()))[0] < cutoff):
+                self._pending.popitem(last=False)
+        return trigger_id
+
+    def player_started(self, trigger_id) -> Optional[float]:
+        """Player melaporkan event 'playing'; return latency play_video -> playing (ms)"""
+        now = time.monotonic_ns()
+        with self._lock:
+            try:
+                emitted_ns, received_ns = self._pending.pop(int(trigger_id))
+            except (KeyError, TypeError, ValueError):
+                return None
+            ms = (now - emitted_ns) / 1e6
+            self.histograms['player'].record(ms)
+            if received_ns is not None:
+                self.histograms['total'].record((now - received_ns) / 1e6)
+        return ms
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            stages: List[Dict] = []
+            for stage, description in STAGES.items():
+                data = self.histograms[stage].snapshot()
+                data.update({'stage': stage, 'description': description})
+                stages.append(data)
+            return {
+                'since': self.started_at,
+                'pending_triggers': len(self._pending),
+                'stages': stages,
+            }
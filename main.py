@@ -29,7 +29,9 @@ class AutoPlaySellerApp:
         # Initialize components
         self.obs_controller = OBSController(self.config)
         self.comment_detector = create_comment_detector(self.config)
-        self.comment_matcher = CommentMatcher(self.config['comment_keywords'])
+        self.comment_matcher = CommentMatcher(self.config['comment_keywords'],
+                                              fuzzy=self.config.get('matcher_settings', {}).get('fuzzy'),
+                                              regex=self.config.get('matcher_settings', {}).get('regex'))
         
         # State
         self.running = False
@@ -409,7 +411,7 @@ class AutoPlaySellerApp:
         
         try:
             self.config = self.load_config()
-            self.comment_matcher = CommentMatcher(self.config['comment_keywords'])
+            self.comment_matcher.reload(self.config['comment_keywords'])
             self.log(f"✓ Config reloaded: {len(self.config['comment_keywords'])} keywords", "success")
             messagebox.showinfo("Success", "Configuration reloaded successfully!")
         except Exception as e:
@@ -1,5 +1,8 @@
 #!/usr/bin/env node
-// Tiny bridge: Use tiktok-live-connector to emit chat as NDJSON to stdout
+// Tiny bridge: Use tiktok-live-connector to emit chat as NDJSON to stdout.
+// Chat events are deduplicated by msgId and coalesced into batched frames, one JSON object per
+// line: {"type":"comments","items":[...],"dropped":n}, {"type":"status",...} or {"type":"heartbeat"}.
+// Logs go to stderr.
 let ConnectorCtor = null;
 try {
   // CommonJS (0.9.x)
@@ -31,30 +34,106 @@ if (!uniqueId) {
   console.error('Missing --uniqueId');
   process.exit(2);
 }
+// Flush a frame every FLUSH_MS or as soon as BATCH_MAX events are waiting
+const FLUSH_MS = Math.max(1, parseInt(getArg('--flush-ms', '20'), 10) || 20);
+const BATCH_MAX = Math.max(1, parseInt(getArg('--batch-max', '200'), 10) || 200);
+// Remember this many recent msgIds to drop repeats at the source
+const DEDUP_SIZE = Math.max(0, parseInt(getArg('--dedup-size', '5000'), 10) || 0);
+// While stdout is blocked (reader applying backpressure) keep at most this many events
+const MAX_PENDING = Math.max(BATCH_MAX, parseInt(getArg('--max-pending', '20000'), 10) || 20000);
+// Liveness signal for the Python supervisor while connected (0 disables)
+const HEARTBEAT_MS = Math.max(0, parseInt(getArg('--heartbeat-ms', '5000'), 10) || 0);
 
 const tiktok = new ConnectorCtor(uniqueId);
 
-function emit(obj) {
-  try { process.stdout.write(JSON.stringify(obj) + '\n'); } catch (e) {}
+// Bounded LRU of recently seen msgIds (Map keeps insertion order)
+const seen = new Map();
+function isDuplicate(msgId) {
+  if (!msgId || !DEDUP_SIZE) return false;
+  if (seen.has(msgId)) {
+    seen.delete(msgId);
+    seen.set(msgId, true);
+    return true;
+  }
+  seen.set(msgId, true);
+  if (seen.size > DEDUP_SIZE) seen.delete(seen.keys().next().value);
+  return false;
+}
+
+let pending = [];
+let dropped = 0;
+let blocked = false;
+let timer = null;
+
+function writeFrame(obj) {
+  try {
+    if (!process.stdout.write(JSON.stringify(obj) + '\n')) {
+      // Reader is behind: keep coalescing until the pipe drains
+      blocked = true;
+      process.stdout.once('drain', () => { blocked = false; flush(); });
+    }
+  } catch (e) {
+    console.error('stdout write failed:', e?.message || e);
+  }
+}
+
+function flush() {
+  if (timer) { clearTimeout(timer); timer = null; }
+  while (!blocked && pending.length) {
+    const items = pending.splice(0, BATCH_MAX);
+    const frame = { type: 'comments', items };
+    if (dropped) { frame.dropped = dropped; dropped = 0; }
+    writeFrame(frame);
+  }
 }
 
+function enqueue(item) {
+  pending.push(item);
+  if (pending.length > MAX_PENDING) {
+    // Storm while stdout is blocked: drop the oldest, the reader is told how many
+    dropped += pending.length - MAX_PENDING;
+    pending.splice(0, pending.length - MAX_PENDING);
+  }
+  if (blocked) return;
+  if (pending.length >= BATCH_MAX) flush();
+  else if (!timer) timer = setTimeout(flush, FLUSH_MS);
+}
+
+function emitStatus(obj) {
+  flush();
+  writeFrame({ type: 'status', ...obj });
+}
+
+let heartbeat = null;
+
 tiktok.connect().then(state => {
-  emit({ type: 'status', status: 'connected', roomId: state.roomId });
+  emitStatus({ status: 'connected', roomId: state.roomId });
+  console.error(`Connected to @${uniqueId} (room ${state.roomId})`);
+  if (HEARTBEAT_MS) {
+    // Skipped while stdout is blocked: the reader is applying backpressure, not dead
+    heartbeat = setInterval(() => { if (!blocked) writeFrame({ type: 'heartbeat', pending: pending.length }); }, HEARTBEAT_MS);
+  }
 }).catch(err => {
-  emit({ type: 'status', status: 'error', message: String(err) });
+  emitStatus({ status: 'error', message: String(err) });
+  console.error('Connect failed:', String(err));
   process.exit(1);
 });
 
 // Support both legacy and new event payloads
 tiktok.on('chat', data => {
-  emit({
-    type: 'comment',
+  const msgId = data.msgId || data.eventId || data?.data?.msgId || undefined;
+  if (isDuplicate(msgId)) return;
+  enqueue({
     comment: data.comment || data?.data?.comment || data?.text || '',
-    msgId: data.msgId || data.eventId || data?.data?.msgId || undefined,
+    msgId,
     user: { uniqueId: data.uniqueId || data?.user?.uniqueId, nickname: data.nickname || data?.user?.nickname },
     timestamp: Date.now()
   });
 });
 
-// Optional: basic logs suppressed to stdout; errors to stderr
-tiktok.on('disconnected', () => emit({ type: 'status', status: 'disconnected' }));
+tiktok.on('disconnected', () => {
+  if (heartbeat) { clearInterval(heartbeat); heartbeat = null; }
+  emitStatus({ status: 'disconnected' });
+  console.error('Disconnected');
+});
+tiktok.on('error', err => console.error('Connector error:', err?.message || err));
@@ -0,0 +1,101 @@
+"""
+Poll Scheduler Module
+Interval polling adaptif untuk sumber komentar berbasis poll (TikTok Research API, dummy, file)
+"""
+import time
+from typing import Callable, Dict, Optional
+
+
+class AdaptivePollScheduler:
+    """Atur jeda antar poll di antara min_interval dan max_interval.
+
+    - has_more / backlog: langsung ke min_interval
+    - komentar masuk: interval = target_batch / laju kedatangan (EWMA komentar per detik)
+    - sepi: interval melebar bertahap (idle_growth) sampai max_interval
+    - error / throttle: backoff eksponensial, minimal selama Retry-After
+    """
+    def __init__(self, base_interval: float = 1.0, min_interval: Optional[float] = None,
+                 max_interval: Optional[float] = None, target_batch: float = 5.0, alpha: float = 0.3,
+                 idle_growth: float = 1.5, backoff: float = 2.0, enabled: bool = True,
+                 clock: Callable[[], float] = time.monotonic):
+        self.base_interval = float(base_interval)
+        self.min_interval = float(min_interval if min_interval is not None else self.base_interval / 4)
+        self.max_interval = float(max_interval if max_interval is not None else self.base_interval * 5)
+        self.max_interval = max(self.max_interval, self.min_interval)
+        self.target_batch = float(target_batch)
+        self.alpha = float(alpha)
+        self.idle_growth = float(idle_growth)
+        self.backoff = float(backoff)
+        self.enabled = bool(enabled)
+        self.clock = clock
+        self.interval = self._clamp(self.base_interval)
+        self.rate = 0.0
+        self.errors = 0
+        self.reason = "initial"
+        self._last_observed: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict], base_interval: float) -> "AdaptivePollScheduler":
+        """Buat scheduler dari comment_source.adaptive_poll"""
+        settings = settings or {}
+        keys = ('min_interval', 'max_interval', 'target_batch', 'alpha', 'idle_growth', 'backoff', 'enabled')
+        return cls(base_interval, **{k: settings[k] for k in keys if k in settings})
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _set(self, interval: float, reason: str) -> float:
+        if self.enabled:
+            self.interval = self._clamp(interval)
+            self.reason = reason
+        return self.interval
+
+    def observe(self, count: int, has_more: bool = False) -> float:
+        """Catat hasil satu poll yang berhasil; return interval berikutnya"""
+        now = self.clock()
+        first = self._last_observed is None
+        if first:
+            # Belum ada jeda terukur: anggap komentar datang selama satu interval sekarang
+            self.rate = count / max(1e-3, self.interval)
+        else:
+            elapsed = max(1e-3, now - self._last_observed)
+            self.rate += self.alpha * (count / elapsed - self.rate)
+        self._last_observed = now
+        self.errors = 0
+        if has_more:
+            return self._set(self.min_interval, "backlog (has_more)")
+        if count:
+            interval = self.target_batch / max(self.rate, 1e-6)
+            # Satu sampel belum cukup untuk memperlebar interval
+            if first:
+                interval = min(interval, self.interval)
+            return self._set(interval, f"{self.rate:.2f} comments/s")
+        if self.rate * self.interval >= 1:
+            # Masih ada komentar belakangan ini, jangan langsung melebar
+            return self._set(self.interval, f"{self.rate:.2f} comments/s")
+        return self._set(self.interval * self.idle_growth, "idle")
+
+    def on_error(self, throttled: bool = False, retry_after: Optional[float] = None) -> float:
+        """Catat poll gagal; return interval berikutnya (backoff)"""
+        self.errors += 1
+        interval = max(self.interval, self.base_interval) * self.backoff
+        if retry_after is not None:
+            interval = max(interval, retry_after)
+        reason = "throttled" if throttled else f"error x{self.errors}"
+        if not self.enabled:
+            return self.interval
+        # Retry-After boleh melewati max_interval
+        self.interval = max(self._clamp(interval), retry_after or 0.0)
+        self.reason = reason
+        return self.interval
+
+    def snapshot(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'interval': round(self.interval, 3),
+            'min_interval': self.min_interval,
+            'max_interval': self.max_interval,
+            'rate': round(self.rate, 3),
+            'errors': self.errors,
+            'reason': self.reason,
+        }
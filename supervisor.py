@@ -0,0 +1,199 @@
+"""
+Supervisor Module
+Pantau detector push (bridge Node, Socket.IO, TikTokLive) dan restart otomatis saat mati atau macet
+"""
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from latency import LatencyHistogram
+
+
+class DetectorSupervisor:
+    """Cek liveness setiap check_interval dan restart detector yang mati dengan backoff eksponensial.
+
+    Detector dianggap mati jika detector.health() mengembalikan alasan (proses bridge keluar,
+    socket putus, heartbeat berhenti). Restart memakai objek detector yang sama (stop() lalu
+    start()) sehingga queue dan processed_comments (dedup) tetap utuh. Restart pertama langsung,
+    percobaan gagal berikutnya menunggu backoff_initial * backoff_factor^n (maks. backoff_max).
+    Time-to-recover = saat terdeteksi mati -> aktivitas pertama (komentar/heartbeat/connect)
+    setelah restart.
+    """
+    def __init__(self, targets: Dict[str, object], check_interval: float = 1.0,
+                 backoff_initial: float = 0.5, backoff_max: float = 30.0, backoff_factor: float = 2.0,
+                 jitter: float = 0.2, on_event: Optional[Callable[[str, str], None]] = None):
+        self.targets = dict(targets)
+        self.check_interval = float(check_interval)
+        self.backoff_initial = float(backoff_initial)
+        self.backoff_max = float(backoff_max)
+        self.backoff_factor = float(backoff_factor)
+        self.jitter = float(jitter)
+        self.on_event = on_event or (lambda message, level: print(message))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # Di-set detector (on_failure) agar kegagalan ditangani tanpa menunggu check_interval
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._state = {name: self._new_state() for name in self.targets}
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict], targets: Dict[str, object], **kwargs) -> "DetectorSupervisor":
+        """Buat supervisor dari comment_source.supervisor"""
+        settings = settings or {}
+        keys = ('check_interval', 'backoff_initial', 'backoff_max', 'backoff_factor', 'jitter')
+        return cls(targets, **{k: settings[k] for k in keys if k in settings}, **kwargs)
+
+    @staticmethod
+    def targets_for(detector) -> Dict[str, object]:
+        """Detector yang perlu diawasi: detector itu sendiri, atau setiap room multi_room"""
+        children = getattr(detector, 'children', None)
+        if children:
+            return {room: child for room, child in children.items() if child.supervised}
+        return {'source': detector} if detector.supervised else {}
+
+    @staticmethod
+    def _new_state() -> Dict:
+        return {
+            'status': 'up',
+            'reason': None,
+            'down_since': None,
+            'restarted_at': None,
+            'next_attempt': 0.0,
+            'attempts': 0,
+            'restarts': 0,
+            'failed_restarts': 0,
+            'outages': 0,
+            'downtime': 0.0,
+            'last_recovery': None,
+            'recovery': LatencyHistogram(),
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running or not self.targets:
+            return
+        self._stop.clear()
+        for detector in self.targets.values():
+            detector.on_failure = self._wake.set
+        self._thread = threading.Thread(target=self._run, daemon=True, name='detector-supervisor')
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        for detector in self.targets.values():
+            detector.on_failure = None
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check()
+            self._wake.wait(self._next_check())
+            self._wake.clear()
+
+    def _next_check(self) -> float:
+        """Jeda sampai check berikutnya; lebih awal jika ada restart yang jatuh tempo"""
+        delay = self.check_interval
+        now = time.monotonic()
+        with self._lock:
+            for state in self._state.values():
+                if state['status'] == 'down':
+                    delay = min(delay, max(0.0, state['next_attempt'] - now))
+        return delay
+
+    def _label(self, name: str) -> str:
+        return "Comment source" if name == 'source' else f"Room {name}"
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_max, self.backoff_initial * self.backoff_factor ** max(0, attempts - 1))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def check(self):
+        """Satu putaran liveness check + restart; dipanggil thread supervisor (atau langsung di test)"""
+        for name, detector in self.targets.items():
+            if self._stop.is_set():
+                return
+            try:
+                reason = detector.health()
+            except Exception as e:
+                reason = f"health check failed: {e}"
+            now = time.monotonic()
+            state = self._state[name]
+            if reason is None:
+                if state['status'] == 'recovering':
+                    self._recovered(name, detector, now)
+                continue
+            if state['status'] == 'up':
+                with self._lock:
+                    state.update(status='down', reason=reason, down_since=now, next_attempt=now, attempts=0)
+                    state['outages'] += 1
+                self.on_event(f"⚠ {self._label(name)} down: {reason}", "warning")
+            elif state['status'] == 'recovering':
+                # Restart berhasil tapi sumber mati lagi sebelum sempat aktif
+                with self._lock:
+                    state.update(status='down', reason=reason,
+                                 next_attempt=now + self._backoff(state['attempts']))
+            if now >= state['next_attempt']:
+                self._restart(name, detector)
+
+    def _restart(self, name: str, detector):
+        state = self._state[name]
+        with self._lock:
+            state['attempts'] += 1
+        try:
+            detector.stop()
+        except Exception:
+            pass
+        started = time.monotonic()
+        try:
+            detector.start()
+        except Exception as e:
+            now = time.monotonic()
+            with self._lock:
+                state['failed_restarts'] += 1
+                state['reason'] = str(e)
+                state['next_attempt'] = now + self._backoff(state['attempts'])
+            self.on_event(f"✗ {self._label(name)} restart #{state['attempts']} failed: {e}", "error")
+            return
+        with self._lock:
+            state.update(status='recovering', restarted_at=started)
+            state['restarts'] += 1
+
+    def _recovered(self, name: str, detector, now: float):
+        state = self._state[name]
+        last_activity = getattr(detector, 'last_activity', None)
+        if last_activity is None or last_activity < state['restarted_at']:
+            # Proses/socket hidup tapi belum ada tanda aktivitas dari sumber
+            return
+        recovery = max(0.0, last_activity - state['down_since'])
+        with self._lock:
+            state['recovery'].record(recovery * 1000)
+            state['downtime'] += recovery
+            state.update(status='up', reason=None, down_since=None, attempts=0, last_recovery=recovery)
+        self.on_event(f"✓ {self._label(name)} recovered in {recovery:.1f}s", "success")
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            out = {}
+            for name, state in self._state.items():
+                down_for = now - state['down_since'] if state['down_since'] is not None else None
+                out[name] = {
+                    'status': state['status'],
+                    'reason': state['reason'],
+                    'down_for_s': round(down_for, 3) if down_for is not None else None,
+                    'outages': state['outages'],
+                    'restarts': state['restarts'],
+                    'failed_restarts': state['failed_restarts'],
+                    'downtime_s': round(state['downtime'], 3),
+                    'last_recovery_s': (round(state['last_recovery'], 3)
+                                        if state['last_recovery'] is not None else None),
+                    'time_to_recover': state['recovery'].snapshot(),
+                }
+            return out
@@ -0,0 +1,100 @@
+"""
+Test Activity Log
+Ring buffer log aktivitas: nomor urut, agregasi pesan berulang dan emit log_update per batch
+"""
+import sys
+import time
+
+from activity_log import ActivityLog
+
+
+class FakeEmit:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, event, data):
+        self.calls.append((event, data))
+
+
+def test_ring_buffer_and_sequence():
+    log = ActivityLog(FakeEmit(), size=50)
+    for i in range(120):
+        log.add(f"pesan {i}")
+    entries = log.snapshot()
+    assert len(entries) == 50
+    # Terbaru lebih dulu, nomor urut terus naik
+    assert entries[0]['message'] == 'pesan 119' and entries[0]['seq'] == 120
+    assert [e['seq'] for e in entries] == list(range(120, 70, -1))
+
+
+def test_batched_emit():
+    emit = FakeEmit()
+    log = ActivityLog(emit, size=50, interval=0.05)
+    log.start()
+    for i in range(30):
+        log.add(f"pesan {i}", 'warning')
+    time.sleep(0.2)
+    log.stop()
+    assert len(emit.calls) == 1
+    event, data = emit.calls[0]
+    assert event == 'log_update' and data['missed'] == 0 and data['seq'] == 30
+    assert [e['message'] for e in data['items']] == [f"pesan {i}" for i in range(30)]
+    log.add("lagi")
+    log.flush()
+    assert [e['seq'] for e in emit.calls[-1][1]['items']] == [31]
+
+
+def test_missed_when_buffer_wraps():
+    emit = FakeEmit()
+    log = ActivityLog(emit, size=10)
+    for i in range(25):
+        log.add(f"pesan {i}")
+    log.flush()
+    data = emit.calls[0][1]
+    assert len(data['items']) == 10 and data['missed'] == 15
+    assert log.stats()['missed'] == 15
+
+
+def test_repeats_are_summarized():
+    emit = FakeEmit()
+    log = ActivityLog(emit, aggregate_window=0.1)
+    for i in range(313):
+        log.add(f"⚠ No match for: 'halo {i}'", 'warning', key="⚠ No match")
+    log.add("🎯 Matched: 'keranjang 1'", 'success')
+    assert [e['message'] for e in log.snapshot()] == ["🎯 Matched: 'keranjang 1'", "⚠ No match for: 'halo 0'"]
+    time.sleep(0.15)
+    log.flush()
+    assert log.snapshot()[0]['message'] == "⚠ No match ×312 in last 0.1s"
+    assert log.snapshot()[0]['level'] == 'warning'
+    # Jendela baru: pesan pertama tampil utuh lagi
+    log.add("⚠ No match for: 'baru'", 'warning', key="⚠ No match")
+    assert log.snapshot()[0]['message'] == "⚠ No match for: 'baru'"
+    stats = log.stats()
+    assert stats['added'] == 315 and stats['aggregated'] == 312
+
+
+def test_cheap_under_load():
+    log = ActivityLog(FakeEmit())
+    started = time.perf_counter()
+    for i in range(100000):
+        log.add(f"⚠ No match for: '{i}'", 'warning', key="⚠ No match")
+    assert time.perf_counter() - started < 2.0
+    assert len(log.snapshot()) == 1
+
+
+def main():
+    tests = [test_ring_buffer_and_sequence, test_batched_emit, test_missed_when_buffer_wraps,
+             test_repeats_are_summarized, test_cheap_under_load]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Test Comment Broadcast
+Broadcast komentar per jendela waktu: satu emit per batch, batas max_batch dan sampel per client
+"""
+import sys
+import time
+
+from comment_broadcast import CommentBroadcaster
+
+
+class FakeEmit:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, event, data, to):
+        self.calls.append((event, data, to))
+
+
+def items(n, start=0):
+    return [{'username': f"user{i}", 'text': f"keranjang {i}", 'ts': i} for i in range(start, start + n)]
+
+
+def test_one_emit_per_window():
+    emit = FakeEmit()
+    broadcaster = CommentBroadcaster(emit, interval=0.05)
+    broadcaster.start()
+    for item in items(200):
+        broadcaster.add(item)
+    time.sleep(0.15)
+    broadcaster.stop()
+    assert len(emit.calls) == 1
+    event, data, to = emit.calls[0]
+    assert event == 'comments' and to == 'comments' and data['room'] is None
+    # Hanya max_batch terbaru yang dikirim, urut lama -> baru
+    assert [c['ts'] for c in data['items']] == list(range(150, 200)) and data['dropped'] == 150
+    stats = broadcaster.stats()
+    assert stats['comments'] == 200 and stats['dropped'] == 150 and stats['batches'] == 1
+
+
+def test_rooms_are_separate():
+    emit = FakeEmit()
+    broadcaster = CommentBroadcaster(emit)
+    broadcaster.add(items(1)[0], 'tokoA')
+    broadcaster.add(items(1, 1)[0], 'tokoB')
+    broadcaster.flush()
+    broadcaster.flush()
+    assert sorted(to for _, _, to in emit.calls) == ['comments:tokoA', 'comments:tokoB']
+
+
+def test_sample_keeps_order_and_newest():
+    batch = items(50)
+    sampled = CommentBroadcaster.sample(batch, 10)
+    ts = [c['ts'] for c in sampled]
+    assert len(ts) == 10 and ts == sorted(ts) and ts[-1] == 49
+    assert CommentBroadcaster.sample(batch, 0) == []
+    assert CommentBroadcaster.sample(batch[:3], 10) == batch[:3]
+
+
+def test_capped_clients():
+    emit = FakeEmit()
+    broadcaster = CommentBroadcaster(emit)
+    assert broadcaster.subscribe('full', None, None) is True
+    assert broadcaster.subscribe('slow', None, 5) is False
+    assert broadcaster.subscribe('silent', None, 0) is False
+    assert broadcaster.subscribe('other', 'tokoA', 5) is False
+    for item in items(30):
+        broadcaster.add(item)
+    broadcaster.flush()
+    by_target = {to: data for _, data, to in emit.calls}
+    assert set(by_target) == {'comments', 'slow'}
+    assert len(by_target['comments']['items']) == 30
+    assert len(by_target['slow']['items']) == 5 and by_target['slow']['dropped'] == 25
+    assert by_target['slow']['items'][-1]['ts'] == 29
+    broadcaster.unsubscribe('slow')
+    broadcaster.add(items(1)[0])
+    broadcaster.flush()
+    assert emit.calls[-1][2] == 'comments'
+
+
+def test_default_client_cap():
+    broadcaster = CommentBroadcaster(FakeEmit(), client_cap=10)
+    assert broadcaster.subscribe('a', None, None) is False
+    assert broadcaster.stats()['capped_clients'] == 1
+
+
+def main():
+    tests = [test_one_emit_per_window, test_rooms_are_separate, test_sample_keeps_order_and_newest,
+             test_capped_clients, test_default_client_cap]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
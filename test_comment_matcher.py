@@ -0,0 +1,101 @@
+"""
+Test Comment Matcher
+LRU cache CommentMatcher: eviction, counter hit/miss, key cache dengan keyword regex dan invalidasi
+saat keyword diubah
+"""
+import sys
+
+from comment_detector import Comment, CommentMatcher
+
+KEYWORDS = {
+    'keranjang 1': {'video_path': 'videos/product_1.mp4'},
+    'keranjang 2': {'video_path': 'videos/product_2.mp4'},
+}
+
+
+def keywords_of(rules):
+    return [rule.keyword for rule in rules]
+
+
+def test_lru_eviction_and_counters():
+    matcher = CommentMatcher(KEYWORDS, cache_size=3)
+    for text in ("keranjang 1", "keranjang 2", "halo", "promo dong"):
+        matcher.find_rules(text)
+    stats = matcher.cache_stats()
+    assert stats['size'] == 3 and stats['capacity'] == 3
+    assert stats['hits'] == 0 and stats['misses'] == 4
+    # "keranjang 2" dipakai lagi -> pindah ke belakang, "halo" jadi yang tertua
+    assert keywords_of(matcher.find_rules("keranjang 2")) == ["keranjang 2"]
+    matcher.find_rules("keranjang 3")
+    # "keranjang 1" sudah terbuang lebih dulu, "halo" terbuang oleh "keranjang 3"
+    assert keywords_of(matcher.find_rules("keranjang 1")) == ["keranjang 1"]
+    matcher.find_rules("halo")
+    stats = matcher.cache_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 7 and stats['hit_rate'] == round(1 / 8, 4)
+
+
+def test_normalized_keys_share_entry():
+    matcher = CommentMatcher(KEYWORDS)
+    first = matcher.find_rules("Keranjang 1!!")
+    # Comment dan text biasa dengan bentuk ternormalisasi sama memakai entry yang sama
+    assert matcher.find_rules(Comment("buyer", "keranjang   1")) is first
+    assert matcher.find_rules("KERANJANG-1") is first
+    assert matcher.cache_stats()['hits'] == 2
+
+
+def test_regex_rules_use_lowered_text_keys():
+    matcher = CommentMatcher({**KEYWORDS, r'keranjang-\d': {'is_regex': True, 'video_path': 'videos/x.mp4'}})
+    assert keywords_of(matcher.find_rules("Keranjang-1")) == ["keranjang 1", r'keranjang-\d']
+    # Normalisasi sama, tapi regex melihat text lowercase asli: bukan hit cache
+    assert keywords_of(matcher.find_rules("keranjang 1")) == ["keranjang 1"]
+    assert matcher.cache_stats()['hits'] == 0
+    matcher.find_rules("KERANJANG-1")
+    assert matcher.cache_stats()['hits'] == 1
+
+
+def test_cache_cleared_on_edits():
+    matcher = CommentMatcher(dict(KEYWORDS))
+    assert keywords_of(matcher.find_rules("garansi dong")) == []
+    matcher.add_keyword('garansi', {'video_path': 'videos/garansi.mp4'})
+    assert matcher.cache_stats()['size'] == 0
+    assert keywords_of(matcher.find_rules("garansi dong")) == ["garansi"]
+
+    matcher.update_keyword('garansi', 'garansi resmi', {'video_path': 'videos/garansi.mp4'})
+    assert matcher.cache_stats()['size'] == 0
+    assert keywords_of(matcher.find_rules("garansi dong")) == []
+    assert keywords_of(matcher.find_rules("garansi resmi dong")) == ["garansi resmi"]
+
+    matcher.remove_keyword('garansi resmi')
+    assert matcher.cache_stats()['size'] == 0
+    assert keywords_of(matcher.find_rules("garansi resmi dong")) == []
+
+    matcher.find_rules("keranjang 1")
+    matcher.reload({'keranjang 1': {'video_path': 'videos/baru.mp4'}})
+    assert matcher.cache_stats()['size'] == 0
+    assert matcher.find_rules("keranjang 1")[0].video_path == 'videos/baru.mp4'
+
+
+def test_cache_disabled():
+    matcher = CommentMatcher(KEYWORDS, cache_size=0)
+    matcher.find_rules("keranjang 1")
+    matcher.find_rules("keranjang 1")
+    stats = matcher.cache_stats()
+    assert stats['size'] == 0 and stats['hits'] == 0 and stats['misses'] == 2
+
+
+def main():
+    tests = [test_lru_eviction_and_counters, test_normalized_keys_share_entry,
+             test_regex_rules_use_lowered_text_keys, test_cache_cleared_on_edits, test_cache_disabled]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
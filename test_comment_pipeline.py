@@ -0,0 +1,162 @@
+"""
+Test Comment Pipeline
+Komentar dari sumber push diproses segera, sumber poll lewat adapter, batch dibatasi max_batch
+"""
+import sys
+import threading
+import time
+
+from comment_detector import Comment, CommentDetector
+from comment_pipeline import CommentPipeline
+
+
+class PushDetector(CommentDetector):
+    push_source = True
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class PollDetector(CommentDetector):
+    def __init__(self, config):
+        super().__init__(config)
+        self.poll_interval = 0.05
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def get_new_comments(self):
+        with self.lock:
+            out, self.pending = self.pending, []
+        return out
+
+
+class Collector:
+    def __init__(self):
+        self.batches = []
+        self.arrived = {}
+        self.done = threading.Event()
+        self.expected = 0
+
+    def __call__(self, comments):
+        now = time.perf_counter()
+        self.batches.append(len(comments))
+        for c in comments:
+            self.arrived[c.text] = now
+        if len(self.arrived) >= self.expected:
+            self.done.set()
+
+
+def test_push_source_latency():
+    detector = PushDetector({})
+    collector = Collector()
+    collector.expected = 20
+    pipeline = CommentPipeline(detector, collector)
+    pipeline.start()
+    sent = {}
+    for i in range(20):
+        sent[f"keranjang {i}"] = time.perf_counter()
+        detector._push(Comment(f"user{i}", f"keranjang {i}"))
+        time.sleep(0.005)
+    assert collector.done.wait(2)
+    pipeline.stop()
+    assert not pipeline.running
+    worst = max(collector.arrived[t] - sent[t] for t in sent)
+    # Jauh di bawah interval polling 1 detik yang lama
+    assert worst < 0.2, worst
+
+
+def test_max_batch():
+    detector = PushDetector({})
+    for i in range(100):
+        detector._push(Comment("u", f"c{i}"))
+    collector = Collector()
+    collector.expected = 100
+    pipeline = CommentPipeline(detector, collector, max_batch=16)
+    pipeline.start()
+    assert collector.done.wait(2)
+    pipeline.stop()
+    assert max(collector.batches) <= 16 and sum(collector.batches) == 100
+    assert pipeline.comments == 100
+
+
+def test_poll_adapter_and_errors():
+    detector = PollDetector({})
+    collector = Collector()
+    collector.expected = 3
+    errors = []
+
+    def process(comments):
+        if any(c.text == 'boom' for c in comments):
+            raise ValueError('boom')
+        collector(comments)
+
+    pipeline = CommentPipeline(detector, process, on_error=errors.append)
+    pipeline.start()
+    with detector.lock:
+        detector.pending = [Comment('u', 'boom')]
+    time.sleep(0.2)
+    with detector.lock:
+        detector.pending = [Comment('u', f"keranjang {i}") for i in range(3)]
+    assert collector.done.wait(2)
+    pipeline.stop()
+    assert len(errors) == 1
+
+
+class BusyPollDetector(PollDetector):
+    """Setiap poll mengembalikan satu komentar baru (live yang ramai)"""
+    def __init__(self, config, catch_up_polls=0):
+        super().__init__(config)
+        self.poll_interval = 0.1
+        self.polls = 0
+        self.catch_up_polls = catch_up_polls
+
+    def get_new_comments(self):
+        self.polls += 1
+        return [Comment('u', f"keranjang {self.polls}")]
+
+    def catching_up(self):
+        return self.polls <= self.catch_up_polls
+
+
+def test_poll_adapter_respects_interval():
+    detector = BusyPollDetector({})
+    pipeline = CommentPipeline(detector, lambda comments: None)
+    pipeline.start()
+    time.sleep(0.55)
+    pipeline.stop()
+    # Poll yang menghasilkan komentar tetap menunggu poll_interval (bukan ribuan request/detik)
+    assert 5 <= detector.polls <= 7
+    # Selama sumber melaporkan catch-up, halaman berikutnya diambil tanpa jeda
+    detector = BusyPollDetector({}, catch_up_polls=50)
+    pipeline = CommentPipeline(detector, lambda comments: None)
+    pipeline.start()
+    time.sleep(0.3)
+    pipeline.stop()
+    assert 50 < detector.polls <= 54
+
+
+def main():
+    tests = [test_push_source_latency, test_max_batch, test_poll_adapter_and_errors,
+             test_poll_adapter_respects_interval]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Test Dedup Store
+Pastikan DedupStore menahan duplikat dalam TTL, membuang id lama dan tetap dalam batas memori
+"""
+import sys
+
+from dedup_store import BloomFilter, DedupStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_seen_and_contains():
+    store = DedupStore(ttl=60, max_items=100)
+    assert not store.seen("tiktok:1")
+    assert store.seen("tiktok:1")
+    assert "tiktok:1" in store
+    assert "tiktok:2" not in store
+    store.add("tiktok:2")
+    assert "tiktok:2" in store
+    assert len(store) == 2
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    store = DedupStore(ttl=60, max_items=1000, buckets=6, clock=clock)
+    store.add("a")
+    clock.now += 30
+    store.add("b")
+    assert "a" in store and "b" in store
+    clock.now += 35  # "a" sudah > ttl, "b" belum
+    assert "a" not in store
+    assert "b" in store
+    clock.now += 60
+    assert "b" not in store
+    assert len(store) == 0
+    assert store.stats()['evicted'] == 2
+
+
+def test_memory_cap():
+    clock = FakeClock()
+    store = DedupStore(ttl=3600, max_items=1000, buckets=4, clock=clock)
+    for i in range(10000):
+        store.add(f"user{i}:keranjang {i % 50}:{i}")
+    assert len(store) <= 1001
+    # Id terbaru tetap diingat
+    assert "user9999:keranjang 49:9999" in store
+    assert "user0:keranjang 0:0" not in store
+    stats = store.stats()
+    assert stats['mode'] == 'set' and stats['evicted'] >= 9000
+
+
+def test_bloom_mode():
+    clock = FakeClock()
+    store = DedupStore(ttl=600, max_items=20000, buckets=4, bloom=True, fp_rate=0.01, clock=clock)
+    keys = [f"msg{i}" for i in range(15000)]
+    for key in keys:
+        store.add(key)
+    # Tidak ada false negative
+    assert all(key in store for key in keys)
+    false_positives = sum(f"other{i}" in store for i in range(20000))
+    estimate = store.false_positive_rate()
+    assert estimate < 0.05
+    assert false_positives / 20000 < estimate * 2 + 0.005
+    stats = store.stats()
+    assert stats['mode'] == 'bloom' and stats['memory_bytes'] < 200000
+
+
+def test_bloom_filter_sizing():
+    bloom = BloomFilter(1000, 0.001)
+    for i in range(1000):
+        bloom.add(str(i))
+    assert all(str(i) in bloom for i in range(1000))
+    assert 0.0005 < bloom.false_positive_rate() < 0.002
+
+
+def test_from_config():
+    store = DedupStore.from_config({'ttl': 30, 'max_items': 10, 'bloom': True})
+    assert store.ttl == 30 and store.max_items == 10 and store.bloom
+    assert DedupStore.from_config(None).max_items == 200000
+
+
+def main():
+    tests = [test_seen_and_contains, test_ttl_expiry, test_memory_cap, test_bloom_mode,
+             test_bloom_filter_sizing, test_from_config]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
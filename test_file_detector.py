@@ -0,0 +1,140 @@
+"""
+Test File Comment Detector
+Tail comments.txt: baris baru, baris belum lengkap, truncate, rotasi dan checkpoint offset
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from comment_detector import FileCommentDetector
+
+
+def make_detector(folder, **source):
+    source.setdefault('tail_mode', 'poll')
+    config = {'comment_source': {'type': 'file', 'file_path': str(Path(folder) / 'comments.txt'),
+                                 'check_interval': 0.05, **source}}
+    return FileCommentDetector(config)
+
+
+def append(path, text):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(text)
+
+
+def texts(comments):
+    return [c.text for c in comments]
+
+
+def test_new_lines_and_partial_line():
+    with tempfile.TemporaryDirectory() as folder:
+        detector = make_detector(folder)
+        detector.PARTIAL_LINE_TIMEOUT = 0.1
+        append(detector.file_path, "[2024-11-09 10:30:00] lama: keranjang 9\n")
+        detector.start()
+        assert detector.get_new_comments() == []
+        append(detector.file_path, "buyer1: keranjang 1\nbuyer2: keran")
+        assert texts(detector.get_new_comments()) == ["keranjang 1"]
+        append(detector.file_path, "jang 2\n")
+        assert texts(detector.get_new_comments()) == ["keranjang 2"]
+        # Baris terakhir tanpa newline tetap diproses setelah PARTIAL_LINE_TIMEOUT
+        append(detector.file_path, "buyer3: keranjang 3")
+        assert detector.get_new_comments() == []
+        time.sleep(0.15)
+        assert texts(detector.get_new_comments()) == ["keranjang 3"]
+        detector.stop()
+
+
+def test_truncate_and_rotation():
+    with tempfile.TemporaryDirectory() as folder:
+        detector = make_detector(folder)
+        detector.start()
+        append(detector.file_path, "a: satu\nb: dua\n")
+        assert texts(detector.get_new_comments()) == ["satu", "dua"]
+        # Truncate lalu tulis ulang lebih pendek
+        with open(detector.file_path, 'w', encoding='utf-8') as f:
+            f.write("c: tiga\n")
+        assert texts(detector.get_new_comments()) == ["tiga"]
+        # Rotasi: baris terakhir file lama tetap terbaca, lalu file baru dari awal
+        append(detector.file_path, "d: empat\n")
+        if os.name != 'nt':  # Windows tidak mengizinkan rename selama handle terbuka
+            os.replace(detector.file_path, Path(folder) / 'comments.txt.1')
+            append(detector.file_path, "e: lima\n")
+            assert texts(detector.get_new_comments()) == ["empat", "lima"]
+        detector.stop()
+
+
+def test_checkpoint_resume():
+    with tempfile.TemporaryDirectory() as folder:
+        detector = make_detector(folder)
+        detector.start()
+        append(detector.file_path, "a: satu\nb: dua\n")
+        assert texts(detector.get_new_comments()) == ["satu", "dua"]
+        detector.stop()
+        assert detector.checkpoint_path.exists()
+        # Komentar yang masuk saat aplikasi mati dibaca setelah restart, tidak ada yang dobel
+        append(detector.file_path, "c: tiga\n")
+        restarted = make_detector(folder)
+        restarted.start()
+        assert texts(restarted.get_new_comments()) == ["tiga"]
+        restarted.stop()
+        # Tanpa checkpoint: mulai dari akhir file seperti sebelumnya
+        fresh = make_detector(folder, checkpoint_path=None)
+        fresh.start()
+        append(fresh.file_path, "d: empat\n")
+        assert texts(fresh.get_new_comments()) == ["empat"]
+        fresh.stop()
+
+
+def test_checkpoint_after_handoff():
+    with tempfile.TemporaryDirectory() as folder:
+        detector = make_detector(folder)
+        detector.CHECKPOINT_INTERVAL = 0
+        detector.start()
+        append(detector.file_path, "a: satu\n")
+        assert texts(detector.get_new_comments()) == ["satu"]
+        # Crash sebelum batch itu selesai diproses: baris dibaca ulang, bukan hilang
+        crashed = make_detector(folder)
+        crashed.start()
+        assert texts(crashed.get_new_comments()) == ["satu"]
+        crashed._close()
+        # Panggilan berikutnya menandai batch sebelumnya sudah diproses
+        assert detector.get_new_comments() == []
+        resumed = make_detector(folder)
+        resumed.start()
+        assert resumed.get_new_comments() == []
+        resumed._close()
+        detector.stop()
+
+
+def test_watch_mode_wakes_consumer():
+    with tempfile.TemporaryDirectory() as folder:
+        detector = make_detector(folder, tail_mode='watch')
+        detector.start()
+        append(detector.file_path, "a: keranjang 5\n")
+        deadline = time.time() + 2
+        comments = []
+        while not comments and time.time() < deadline:
+            detector.wait_for_comments(0.5)
+            comments = detector.get_new_comments()
+        assert texts(comments) == ["keranjang 5"]
+        detector.stop()
+
+
+def main():
+    tests = [test_new_lines_and_partial_line, test_truncate_and_rotation, test_checkpoint_resume,
+             test_checkpoint_after_handoff, test_watch_mode_wakes_consumer]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
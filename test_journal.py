@@ -0,0 +1,145 @@
+"""
+Test Journal
+Journal append-only: batch writer, rotasi segmen, index waktu jarang, toleransi crash dan replay
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from comment_detector import Comment, create_comment_detector
+from journal import CommentJournal, read_journal, read_lines, segments
+
+
+def comment(i, room=None, ts=None):
+    c = Comment(f"user{i}", f"Keranjang {i % 10}", created_at=ts)
+    c.room = room
+    return c
+
+
+def test_batched_writes_and_read_back():
+    with tempfile.TemporaryDirectory() as folder:
+        journal = CommentJournal(folder, flush_interval=0.05)
+        journal.start()
+        base = time.time() - 100
+        for i in range(5000):
+            journal.comment(comment(i, ts=base + i * 0.01), {'decision': 'no_match'})
+        journal.trigger(keyword='keranjang 1', video='videos/product_1.mp4', room=None, trigger_id=1)
+        journal.close()
+        stats = journal.stats()
+        assert stats['written'] == 5001 and stats['dropped'] == 0
+        # Banyak record per write()
+        assert stats['batches'] < 100
+        records = list(read_journal(folder))
+        assert len(records) == 5001
+        assert [r['seq'] for r in records] == list(range(1, 5002))
+        assert records[0] == {'kind': 'comment', 'ts': base, 'user': 'user0', 'text': 'Keranjang 0',
+                              'room': None, 'decision': 'no_match', 'seq': 1}
+        assert records[-1]['kind'] == 'trigger'
+        assert len(list(read_journal(folder, kinds=('trigger',)))) == 1
+
+
+def test_sparse_index_seek():
+    with tempfile.TemporaryDirectory() as folder:
+        journal = CommentJournal(folder, index_interval=1.0)
+        journal.start()
+        base = 1_700_000_000.0
+        for i in range(6000):
+            journal.comment(comment(i, ts=base + i * 0.01))
+        journal.close()
+        segment = segments(folder)[0]
+        index_lines = segment.with_suffix('.idx').read_text().splitlines()
+        assert 55 <= len(index_lines) <= 61
+        since = base + 45
+        raw = list(read_lines(folder, since))
+        # Mulai dari entry index terdekat, bukan dari awal segmen
+        assert len(raw) <= 1500 + 100
+        records = list(read_journal(folder, since))
+        assert len(records) == 1500 and records[0]['ts'] >= since
+
+
+def test_rotation_and_retention():
+    with tempfile.TemporaryDirectory() as folder:
+        journal = CommentJournal(folder, segment_seconds=0.05, flush_interval=0.01, max_segments=3)
+        journal.start()
+        for i in range(8):
+            journal.comment(comment(i))
+            time.sleep(0.07)
+        journal.close()
+        files = segments(folder)
+        assert journal.stats()['segments'] >= 6 and len(files) == 3
+        assert len(list(Path(folder).glob('*.idx'))) == 3
+        assert [r['user'] for r in read_journal(folder)] == ['user5', 'user6', 'user7']
+
+
+def test_crash_tail_and_new_segment():
+    with tempfile.TemporaryDirectory() as folder:
+        journal = CommentJournal(folder)
+        journal.start()
+        journal.comment(comment(1))
+        journal.close()
+        # Simulasi crash di tengah write
+        with open(segments(folder)[0], 'ab') as f:
+            f.write(b'{"kind":"comment","ts":1')
+        journal = CommentJournal(folder)
+        journal.start()
+        journal.comment(comment(2))
+        journal.close()
+        assert len(segments(folder)) == 2
+        assert [r['user'] for r in read_journal(folder)] == ['user1', 'user2']
+
+
+def test_never_blocks_when_full():
+    with tempfile.TemporaryDirectory() as folder:
+        journal = CommentJournal(folder, max_queue=10)
+        # Writer belum jalan: queue penuh, append tetap langsung kembali
+        started = time.perf_counter()
+        results = [journal.comment(comment(i)) for i in range(100)]
+        assert time.perf_counter() - started < 0.5
+        assert results.count(True) == 10 and journal.stats()['dropped'] == 90
+
+
+def test_replay_from_journal():
+    with tempfile.TemporaryDirectory() as folder:
+        journal = CommentJournal(folder)
+        journal.start()
+        base = time.time() - 3600
+        for i in range(20):
+            journal.comment(comment(i, room='tokoA' if i % 2 else None, ts=base + i), {'decision': 'no_match'})
+        journal.trigger(keyword='keranjang 1', video='x.mp4', room=None, trigger_id=1)
+        journal.close()
+        detector = create_comment_detector({'comment_source': {
+            'type': 'replay', 'replay_path': folder, 'speed': 0, 'start_at': base + 10}})
+        detector.start()
+        deadline = time.time() + 5
+        while not detector.finished and time.time() < deadline:
+            time.sleep(0.01)
+        detector.stop()
+        comments = detector.get_new_comments()
+        assert [c.username for c in comments] == [f"user{i}" for i in range(10, 20)]
+        assert comments[1].room == 'tokoA' and comments[0].raw_text == 'Keranjang 0'
+
+
+def test_from_config():
+    assert CommentJournal.from_config({'enabled': False}) is None
+    journal = CommentJournal.from_config({'path': 'logs/journal', 'segment_seconds': 600})
+    assert journal.path == Path('logs/journal') and journal.segment_seconds == 600
+
+
+def main():
+    tests = [test_batched_writes_and_read_back, test_sparse_index_seek, test_rotation_and_retention,
+             test_crash_tail_and_new_segment, test_never_blocks_when_full, test_replay_from_journal,
+             test_from_config]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
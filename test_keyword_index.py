@@ -0,0 +1,339 @@
+"""
+Test Keyword Index
+Pastikan KeywordIndex menghasilkan keyword yang sama dengan matching per-pattern lama
+"""
+import os
+import random
+import re
+import sys
+import time
+
+from keyword_index import (KeywordIndex, RegexProfiler, compile_keyword_pattern, normalize_text,
+                           regex_safety_issue, required_literals)
+
+
+def legacy_search(patterns, text):
+    """Perilaku lama: pattern.search untuk setiap keyword, urut sesuai config.
+
+    Keyword biasa dicocokkan dengan text ternormalisasi, keyword regex dengan text lowercase.
+    """
+    lowered = text.lower()
+    normalized = normalize_text(lowered)
+    return [keyword for keyword, pattern, plain in patterns
+            if pattern.search(normalized if plain else lowered)]
+
+
+def keywords_of(matches):
+    return [rule.keyword for rule in matches]
+
+
+def legacy_patterns(keywords_config):
+    patterns = []
+    for keyword, cfg in keywords_config.items():
+        plain = not cfg.get('is_regex') and re.fullmatch(r'\w+(?: +\w+)*', keyword.lower())
+        source = normalize_text(keyword) if plain else keyword
+        patterns.append((keyword, compile_keyword_pattern(source, cfg), bool(plain)))
+    return patterns
+
+
+def sample_keywords():
+    keywords = {f"keranjang {i}": {'video_path': f"videos/product_{i}.mp4"} for i in range(1, 21)}
+    keywords.update({
+        "krnjg 1": {'video_path': 'videos/product_1.mp4'},
+        "mp3": {'video_path': 'videos/mp3.mp4'},
+        "keranjang": {'video_path': 'videos/any.mp4'},
+        "kera njang": {'video_path': 'videos/split.mp4'},
+        "mau  beli": {'video_path': 'videos/beli.mp4'},
+        "checkout sekarang juga": {'video_path': 'videos/co.mp4'},
+        "promo.": {'video_path': 'videos/promo.mp4'},
+        "garansi": {'video_path': 'videos/garansi.mp4', 'is_regex': True},
+        r"size\s*(xl|l)\b": {'video_path': 'videos/size.mp4', 'is_regex': True},
+        "[broken": {'video_path': 'videos/broken.mp4', 'is_regex': True},
+    })
+    return keywords
+
+
+def test_known_comments():
+    keywords = sample_keywords()
+    index = KeywordIndex(keywords)
+    patterns = legacy_patterns(keywords)
+    cases = [
+        "keranjang 1",
+        "keranjang1",
+        "KERANJAAANG 1!!",
+        "ｋｅｒａｎｊａｎｇ　２",
+        "mp3",
+        "mau keranjang 2 dong",
+        "keranjang 10",
+        "keranjang 1 0",
+        "keranjang-1",
+        "keranjang\t\t3",
+        "xkeranjang 1",
+        "krnjg 1",
+        "keranjang",
+        "mau beli",
+        "maubeli",
+        "checkout sekarang  juga!",
+        "promo.",
+        "promox",
+        "ada garansinya?",
+        "size xl ya",
+        "[broken",
+        "halo kak 😍",
+        "",
+    ]
+    for text in cases:
+        assert keywords_of(index.search(text.lower())) == legacy_search(patterns, text), text
+
+
+def test_random_comments():
+    keywords = sample_keywords()
+    index = KeywordIndex(keywords)
+    patterns = legacy_patterns(keywords)
+    rng = random.Random(1234)
+    words = ["keranjang", "kera", "njang", "krnjg", "mau", "beli", "checkout", "sekarang",
+             "juga", "promo", "size", "xl", "garansi", "dong", "1", "2", "10", "20", "3"]
+    seps = [" ", "", "  ", "\t", "-", ".", "!", " 😍 "]
+    for _ in range(3000):
+        n = rng.randint(1, 6)
+        text = ''.join(rng.choice(words) + rng.choice(seps) for _ in range(n))
+        assert keywords_of(index.search(text.lower())) == legacy_search(patterns, text), text
+
+
+def test_config_order_preserved():
+    keywords = {
+        "keranjang 2": {'video_path': 'b.mp4'},
+        "keranjang": {'video_path': 'a.mp4'},
+        "2": {'video_path': 'c.mp4', 'is_regex': True},
+    }
+    index = KeywordIndex(keywords)
+    assert keywords_of(index.search("keranjang 2")) == ["keranjang 2", "keranjang", "2"]
+
+
+def test_slot_family():
+    keywords = {
+        "keranjang {n}": {
+            'aliases': ["Krnjg", "kr"],
+            'video_path': "videos/product_{n}.mp4",
+            'response_text': "Produk {n} siap 🎉",
+            'max': 100,
+            'videos': {"7": "videos/spesial.mp4"},
+        },
+    }
+    index = KeywordIndex(keywords)
+    [rule] = index.search("krnjg 2")
+    assert rule.keyword == "keranjang 2"
+    assert rule.config == {'video_path': "videos/product_2.mp4", 'response_text': "Produk 2 siap 🎉", 'slot': 2}
+    assert keywords_of(index.search("mau keranjang12 dong")) == ["keranjang 12"]
+    assert keywords_of(index.search("keranjaaang 5!!")) == ["keranjang 5"]
+    assert keywords_of(index.search("kr 3 sama keranjang 4")) == ["keranjang 3", "keranjang 4"]
+    assert index.search("keranjang 7")[0].video_path == "videos/spesial.mp4"
+    assert index.search("keranjang 101") == []
+    assert index.search("keranjang 0") == []
+    assert keywords_of(index.search("keranjang-3")) == ["keranjang 3"]
+    assert index.search("keranjang") == []
+
+
+def test_slot_family_unbounded():
+    index = KeywordIndex({"keranjang {n}": {'video_path': "videos/product_{n}.mp4"}})
+    [(_, family)] = index.families["keranjang"]
+    for n in range(1, 2001):
+        assert index.search(f"keranjang {n}")[0].config["slot"] == n
+    # Nomor dari penonton tidak menumpuk tanpa batas
+    assert len(family._slots) == family.CACHE_SIZE
+    assert index.search("keranjang 2000")[0] is index.search("keranjang 2000")[0]
+    # Deretan digit panjang diabaikan, bukan ValueError dari int()
+    assert index.search("keranjang " + "9" * 5000) == []
+    assert index.search("keranjang 1234567890") == []
+    assert keywords_of(index.search("keranjang 123456789")) == ["keranjang 123456789"]
+
+
+def test_rules_are_shared():
+    keywords = {
+        "keranjang {n}": {'video_path': "videos/product {n}.mp4", 'response_text': "Produk {n}"},
+        "cod": {'video_path': "videos/cod.mp4"},
+    }
+    index = KeywordIndex(keywords)
+    first = index.search("keranjang 3 cod")
+    second = index.search("mau keranjang 3 cod dong")
+    assert [rule.keyword for rule in first] == ["keranjang 3", "cod"]
+    # Rule yang sama dipakai ulang, bukan dibuat per komentar
+    assert all(a is b for a, b in zip(first, second))
+    rule = first[0]
+    assert rule.video_name == "product 3.mp4"
+    assert rule.video_url == "/video-absolute?path=videos/product%203.mp4"
+    assert rule.video_abspath == os.path.abspath("videos/product 3.mp4")
+    assert rule.response_text == "Produk 3"
+    assert first[1].response_text == ""
+
+
+def test_incremental_edits_match_rebuild():
+    rng = random.Random(99)
+    config = sample_keywords()
+    config["keranjang {n}"] = {'aliases': ["krnjg"], 'video_path': "videos/p_{n}.mp4", 'max': 50}
+    index = KeywordIndex(config)
+    texts = ["keranjang 1", "krnjg 7", "mau beli", "size xl", "keranjang 15 dong", "promo.", "ada garansi"]
+    for step in range(300):
+        keyword = rng.choice(list(config) + [f"keranjang {rng.randint(1, 40)}", "baru", "garansi"])
+        before = index
+        seen_before = [before.search(t) for t in texts]
+        action = rng.random()
+        if action < 0.4 and keyword in config:
+            del config[keyword]
+            index = index.without_keyword(keyword)
+        elif action < 0.7 and keyword in config:
+            # rename: hapus lama, tambah di akhir (sama seperti dict di web_app)
+            renamed = f"{keyword} x{step}" if not is_template(keyword) else keyword
+            cfg = dict(config.pop(keyword))
+            config[renamed] = cfg
+            index = index.without_keyword(keyword).with_keyword(renamed, cfg)
+        else:
+            cfg = {'video_path': f"videos/{step}.mp4", 'is_regex': rng.random() < 0.2}
+            config[keyword] = cfg
+            index = index.with_keyword(keyword, cfg)
+        rebuilt = KeywordIndex(config)
+        assert len(index) == len(config)
+        for text in texts:
+            assert index.search(text) == rebuilt.search(text), (step, text)
+        # Snapshot lama tidak berubah
+        assert [before.search(t) for t in texts] == seen_before
+
+
+def test_fuzzy_matching():
+    keywords = {
+        "keranjang {n}": {'aliases': ["krnjg"], 'video_path': "videos/p_{n}.mp4"},
+        "garansi resmi": {'video_path': "videos/garansi.mp4"},
+        "cod": {'video_path': "videos/cod.mp4"},
+    }
+    exact = KeywordIndex(keywords)
+    fuzzy = KeywordIndex(keywords, fuzzy={'enabled': True, 'max_distance': 1})
+    for text, expected in [
+        ("kranjang 3", ["keranjang 3"]),
+        ("keranjng 3", ["keranjang 3"]),
+        ("kernajang 3", ["keranjang 3"]),
+        ("krjg3", ["keranjang 3"]),
+        ("garnasi resmi", ["garansi resmi"]),
+        ("cid", []),              # kata pendek tidak dikoreksi
+        ("kerajinan 3", []),      # terlalu jauh
+        ("halo kak", []),
+    ]:
+        assert keywords_of(fuzzy.search(text)) == expected, text
+    assert exact.search("kranjang 3") == []
+    # Kosakata fuzzy ikut berubah saat keyword diedit
+    edited = fuzzy.with_keyword("ongkir gratis", {'video_path': "videos/ongkir.mp4"})
+    assert keywords_of(edited.search("ongkr gratis")) == ["ongkir gratis"]
+    assert keywords_of(edited.without_keyword("ongkir gratis").search("ongkr gratis")) == []
+
+
+def test_regex_guard():
+    for pattern in ["garansi", r"size\s*(xl|l)\b", r"keranjang\s*\d{1,3}", r"(\w+\s)+", r"(ya|tidak)+",
+                    r"(\d{1,3}\.){3}", r"(\d|,)+"]:
+        assert regex_safety_issue(pattern) is None, pattern
+    for pattern in [r"(a+)+", r"(\w+\s?)*$", r"(a|ab)*x", r"(.*)*", r"(?:x+x+)+y", r"(\w+)*", "[broken"]:
+        assert regex_safety_issue(pattern), pattern
+
+
+def test_regex_profiler_quarantine():
+    keywords = {
+        "garansi": {'video_path': 'videos/garansi.mp4', 'is_regex': True},
+        r"(a+)+$": {'video_path': 'videos/bad.mp4', 'is_regex': True},
+        "cod": {'video_path': 'videos/cod.mp4'},
+    }
+    profiler = RegexProfiler(budget_ms=50)
+    index = KeywordIndex(keywords, profiler=profiler)
+    # Pattern tidak aman dari config langsung dikarantina dan tidak pernah dievaluasi
+    assert list(profiler.quarantined) == [r"(a+)+$"]
+    assert keywords_of(index.search("a" * 40 + "! garansi cod")) == ["garansi", "cod"]
+    table = {row['keyword']: row for row in profiler.table()}
+    assert table["garansi"]['calls'] == 1 and not table["garansi"]['quarantined']
+    assert table[r"(a+)+$"]['quarantined'] and table[r"(a+)+$"]['calls'] == 0
+    # Tiga evaluasi berturut-turut di atas budget -> dikarantina
+    profiler.budget_ns = -1
+    for _ in range(3):
+        assert keywords_of(index.search("garansi")) == ["garansi"]
+    assert keywords_of(index.search("garansi")) == []
+    # Edit keyword melepas karantina
+    profiler.budget_ns = 50_000_000
+    index = index.with_keyword("garansi", {'video_path': 'videos/garansi2.mp4', 'is_regex': True})
+    assert keywords_of(index.search("garansi")) == ["garansi"]
+    index = index.without_keyword(r"(a+)+$")
+    assert r"(a+)+$" not in profiler.quarantined
+
+
+def test_regex_profiler_overruns_and_cooldown():
+    profiler = RegexProfiler(budget_ms=50, overruns=3, cooldown=0.05)
+    slow, fast = 80_000_000, 1_000_000
+    # Satu sampel lambat (mis. menunggu GIL) tidak mengkarantina; sampel cepat mereset hitungan
+    profiler.record("garansi", slow)
+    profiler.record("garansi", slow)
+    profiler.record("garansi", fast)
+    profiler.record("garansi", slow)
+    assert "garansi" not in profiler.quarantined
+    profiler.record("garansi", slow)
+    profiler.record("garansi", slow)
+    assert "garansi" in profiler.quarantined
+    row = profiler.table()[0]
+    assert row['quarantined'] and row['calls'] == 6 and row['release_in_s'] is not None
+    # Karantina karena lambat dilepas setelah cooldown
+    assert not profiler.release_due("garansi")
+    time.sleep(0.06)
+    assert profiler.release_due("garansi") and "garansi" not in profiler.quarantined
+    profiler.record("garansi", slow)
+    assert "garansi" not in profiler.quarantined
+    # Karantina guard statis tidak punya cooldown
+    profiler.check(r"(a+)+$")
+    time.sleep(0.06)
+    assert not profiler.release_due(r"(a+)+$") and r"(a+)+$" in profiler.quarantined
+
+
+def test_regex_prefilter():
+    assert required_literals(r"size\s*(xl|l)\b") == {"size"}
+    assert required_literals(r"(ongkir|ongkos) kirim") == {"ongkir kirim", "ongkos kirim"}
+    assert required_literals(r"(?:COD|bayar ditempat)") == {"cod", "bayar ditempat"}
+    assert required_literals(r"\d+") is None
+    keywords = {
+        r"size\s*(xl|l)\b": {'video_path': 'a.mp4', 'is_regex': True},
+        r"(ongkir|ongkos) kirim": {'video_path': 'b.mp4', 'is_regex': True},
+        r"(?:COD|bayar ditempat)": {'video_path': 'c.mp4', 'is_regex': True},
+        r"ready\s*stok?": {'video_path': 'd.mp4', 'is_regex': True},
+        r"\d{3,}": {'video_path': 'e.mp4', 'is_regex': True},
+        r"k(a|e)k": {'video_path': 'f.mp4', 'is_regex': True},
+        "promo.": {'video_path': 'g.mp4'},
+    }
+    index = KeywordIndex(keywords)
+    patterns = legacy_patterns(keywords)
+    rng = random.Random(7)
+    words = ["size", "SIZE", "ſize", "xl", "l", "ongkir", "ongkos", "kirim", "cod", "COD", "bayar",
+             "ditempat", "ready", "stok", "sto", "123", "kak", "kek", "promo", "halo", "😍", "K"]
+    for _ in range(3000):
+        text = ''.join(rng.choice(words) + rng.choice([" ", "", ".", "  "]) for _ in range(rng.randint(1, 5)))
+        assert keywords_of(index.search(text.lower())) == legacy_search(patterns, text), text
+    # Komentar tanpa literal wajib hanya mengevaluasi rule tanpa literal
+    assert [entry[0][1].keyword for entry in index.prefilter.candidates("halo kak")] == [r"\d{3,}", r"k(a|e)k"]
+    edited = index.without_keyword(r"\d{3,}").with_keyword("garansi", {'video_path': 'h.mp4', 'is_regex': True})
+    assert keywords_of(edited.search("ada garansi? 123")) == ["garansi"]
+    assert keywords_of(index.search("ada garansi? 123")) == [r"\d{3,}"]
+
+
+def is_template(keyword):
+    return '{n}' in keyword
+
+
+def main():
+    tests = [test_known_comments, test_random_comments, test_config_order_preserved, test_slot_family,
+             test_slot_family_unbounded, test_rules_are_shared, test_incremental_edits_match_rebuild,
+             test_fuzzy_matching, test_regex_guard, test_regex_profiler_quarantine,
+             test_regex_profiler_overruns_and_cooldown, test_regex_prefilter]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Test Latency
+Histogram per tahap dan alur trigger play_video -> laporan 'playing' dari player
+"""
+import sys
+import time
+
+from latency import STAGES, LatencyHistogram, LatencyTracker
+
+
+class FakeComment:
+    def __init__(self, received_ns, dedup_ns=None, source_lag=None):
+        self.received_ns = received_ns
+        self.dedup_ns = dedup_ns
+        self.source_lag = source_lag
+
+
+def test_histogram_percentiles():
+    hist = LatencyHistogram()
+    for ms in [1] * 90 + [40] * 9 + [700]:
+        hist.record(ms)
+    snap = hist.snapshot()
+    assert snap['count'] == 100
+    assert snap['p50_ms'] == 1
+    assert snap['p90_ms'] == 1
+    assert snap['p99_ms'] == 50  # bucket <=50 ms
+    assert snap['max_ms'] == 700
+    assert snap['buckets'] == {'<=1': 90, '<=50': 9, '<=1000': 1}
+    assert LatencyHistogram().snapshot()['p50_ms'] is None
+
+
+def test_comment_stages():
+    tracker = LatencyTracker()
+    ms = 1_000_000
+    comment = FakeComment(received_ns=0, dedup_ns=1 * ms, source_lag=0.25)
+    tracker.record_comment(comment, dispatched_ns=11 * ms, matched_ns=12 * ms)
+    stages = {s['stage']: s for s in tracker.snapshot()['stages']}
+    assert list(stages) == list(STAGES)
+    assert stages['source']['max_ms'] == 250
+    assert stages['dedup']['max_ms'] == 1
+    assert stages['queue']['max_ms'] == 10
+    assert stages['match']['max_ms'] == 1
+    # Main video sedang tidak diputar: tidak ada tahap match
+    tracker.record_comment(FakeComment(received_ns=0), dispatched_ns=5 * ms, matched_ns=None)
+    stages = {s['stage']: s for s in tracker.snapshot()['stages']}
+    assert stages['match']['count'] == 1 and stages['queue']['count'] == 2
+    assert stages['source']['count'] == 1
+
+
+def test_trigger_roundtrip():
+    tracker = LatencyTracker()
+    received = time.monotonic_ns()
+    trigger_id = tracker.begin_trigger(received, received)
+    queued_id = tracker.begin_trigger()
+    time.sleep(0.02)
+    assert tracker.player_started(trigger_id) >= 20
+    assert tracker.player_started(trigger_id) is None  # dilaporkan dua kali
+    assert tracker.player_started('bukan-id') is None
+    tracker.player_started(queued_id)
+    stages = {s['stage']: s for s in tracker.snapshot()['stages']}
+    assert stages['player']['count'] == 2
+    assert stages['total']['count'] == 1 and stages['total']['min_ms'] >= 20
+    assert stages['emit']['count'] == 1
+    assert tracker.snapshot()['pending_triggers'] == 0
+    tracker.reset()
+    assert all(s['count'] == 0 for s in tracker.snapshot()['stages'])
+
+
+def test_pending_bounded():
+    tracker = LatencyTracker()
+    ids = [tracker.begin_trigger() for _ in range(tracker.MAX_PENDING + 10)]
+    assert tracker.snapshot()['pending_triggers'] == tracker.MAX_PENDING
+    assert tracker.player_started(ids[0]) is None
+    assert tracker.player_started(ids[-1]) is not None
+
+
+def main():
+    tests = [test_histogram_percentiles, test_comment_stages, test_trigger_roundtrip, test_pending_bounded]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
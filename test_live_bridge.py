@@ -0,0 +1,84 @@
+"""
+Test Live Bridge Reader
+Frame batch dari node_bridge/tiktok_live_bridge.js: parsing, dedup, stderr terpisah dan backpressure
+"""
+import io
+import json
+import sys
+import threading
+import time
+
+from comment_detector import TikTokLiveConnectorDetector
+
+
+def make_detector(**bridge):
+    detector = TikTokLiveConnectorDetector({'comment_source': {'type': 'tiktok_live', 'live_username': 'toko',
+                                                               'bridge': bridge}})
+    detector.running = True
+    return detector
+
+
+def frame(items, **extra):
+    return (json.dumps({'type': 'comments', 'items': items, **extra}) + '\n').encode()
+
+
+def item(i, text=None, msg_id=None):
+    return {'comment': text if text is not None else f"keranjang {i}", 'msgId': msg_id or f"m{i}",
+            'user': {'uniqueId': f"user{i}", 'nickname': f"User {i}"}, 'timestamp': time.time() * 1000}
+
+
+def test_frames_are_parsed_in_bulk():
+    detector = make_detector()
+    stream = io.BytesIO(
+        frame([item(1), item(2), item(3, msg_id='m1'), item(4, text='  ')], dropped=7)
+        + b'{"type": "status", "status": "connected", "roomId": "42"}\n'
+        + (json.dumps({'type': 'comment', **item(5)}) + '\n').encode()
+        + b'not json\n\n'
+    )
+    detector._reader(stream)
+    comments = detector.get_new_comments()
+    assert [c.text for c in comments] == ["keranjang 1", "keranjang 2", "keranjang 5"]
+    assert comments[0].username == "User 1" and comments[0].source_lag is not None
+    stats = detector.source_stats()
+    assert stats['frames'] == 3 and stats['parse_errors'] == 1
+    assert stats['dropped_by_bridge'] == 7 and stats['status'] == 'connected'
+
+
+def test_stderr_kept_separate():
+    detector = make_detector()
+    detector._log_reader(io.BytesIO(b"Connected to @toko (room 42)\n\n"))
+    assert list(detector.bridge_log) == ["Connected to @toko (room 42)"]
+    assert detector.get_new_comments() == []
+
+
+def test_backpressure_pauses_reader():
+    detector = make_detector(high_water=10, low_water=2)
+    stream = io.BytesIO(b''.join(frame([item(f * 10 + i) for i in range(10)]) for f in range(5)))
+    reader = threading.Thread(target=detector._reader, args=(stream,), daemon=True)
+    reader.start()
+    time.sleep(0.2)
+    # Reader berhenti di high_water, sisa frame tetap di pipe (sisi bridge)
+    assert detector.queue.qsize() == 10 and detector.source_stats()['paused']
+    received = []
+    while reader.is_alive() or detector.queue.qsize():
+        received += detector._drain_queue(4)
+        time.sleep(0.01)
+    assert len(received) == 50 and len({c.text for c in received}) == 50
+    assert detector.source_stats()['pauses'] >= 4
+
+
+def main():
+    tests = [test_frames_are_parsed_in_bulk, test_stderr_kept_separate, test_backpressure_pauses_reader]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
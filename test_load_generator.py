@@ -0,0 +1,123 @@
+"""
+Test Load Generator
+tiktok_dummy mode load: laju kedatangan, rasio hit keyword, kardinalitas username dan laporan laju
+"""
+import sys
+import threading
+import time
+
+from comment_detector import CommentMatcher, LoadGeneratorDetector, create_comment_detector
+from comment_pipeline import CommentPipeline
+
+KEYWORDS = {
+    'keranjang {n}': {'aliases': ['krnjg'], 'video_path': 'videos/product_{n}.mp4', 'min': 1, 'max': 50},
+    'garansi': {'video_path': 'videos/garansi.mp4'},
+}
+
+
+def make_detector(**load):
+    return create_comment_detector({'comment_keywords': KEYWORDS,
+                                    'comment_source': {'type': 'tiktok_dummy', 'load': {'seed': 7, **load}}})
+
+
+def run_for(detector, seconds):
+    comments = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        comments.extend(detector.get_new_comments())
+        time.sleep(0.005)
+    return comments
+
+
+def test_steady_rate_and_mix():
+    detector = make_detector(rate=5000, process='steady', hit_ratio=0.25, usernames=50,
+                             typo_ratio=0, emoji_ratio=0)
+    assert isinstance(detector, LoadGeneratorDetector)
+    detector.start()
+    comments = run_for(detector, 0.5)
+    assert 2000 < len(comments) < 2700
+    assert len({c.username for c in comments}) <= 50
+    matcher = CommentMatcher(KEYWORDS)
+    ratio = sum(1 for c in comments if matcher.match(c)) / len(comments)
+    assert 0.2 < ratio < 0.3
+    stats = detector.source_stats()
+    assert stats['generated'] == len(comments) and stats['missed'] == 0
+    assert 4000 < stats['achieved_rate'] < 5500
+
+
+def test_typos_and_emoji():
+    detector = make_detector(rate=2000, hit_ratio=1.0, typo_ratio=0.5, emoji_ratio=1.0)
+    detector.start()
+    comments = run_for(detector, 0.2)
+    assert comments and all(not c.raw_text.isascii() for c in comments)
+    matcher = CommentMatcher(KEYWORDS)
+    missed = sum(1 for c in comments if not matcher.match(c))
+    # Sebagian typo tetap match berkat normalisasi, sebagian tidak
+    assert 0 < missed < len(comments)
+
+
+def test_burst_and_duration():
+    detector = make_detector(rate=500, process='burst', burst_rate=20000, burst_every=10,
+                             burst_duration=0.2, duration=0.4)
+    detector.start()
+    comments = run_for(detector, 0.6)
+    # ~0.2s burst @20k/s + ~0.2s @500/s, lalu berhenti setelah duration
+    assert 3000 < len(comments) < 5000
+    assert detector.get_new_comments() == []
+
+
+def test_slow_consumer_counts_missed():
+    detector = make_detector(rate=10000, max_lag=0.1)
+    detector.start()
+    time.sleep(0.5)
+    comments = detector.get_new_comments()
+    stats = detector.source_stats()
+    assert len(comments) < 2000 and stats['missed'] > 2500
+
+
+def test_saturates_pipeline():
+    detector = make_detector(rate=20000, tick=0.005)
+    got = [0]
+    done = threading.Event()
+
+    def process(batch):
+        got[0] += len(batch)
+        if got[0] >= 10000:
+            done.set()
+
+    pipeline = CommentPipeline(detector, process, max_batch=512)
+    detector.start()
+    pipeline.start()
+    assert done.wait(5)
+    pipeline.stop()
+    stats = detector.source_stats()
+    # Generator sendiri hanya memakai sebagian kecil waktu
+    assert stats['cost_us_per_comment'] < 50 and stats['generator_busy'] < 0.8
+
+
+def test_unbounded_slot_family():
+    detector = create_comment_detector({
+        'comment_keywords': {'keranjang {n}': {'video_path': 'videos/product_{n}.mp4', 'max': None}},
+        'comment_source': {'type': 'tiktok_dummy', 'load': {'seed': 7, 'rate': 1000, 'hit_ratio': 1.0,
+                                                            'typo_ratio': 0, 'emoji_ratio': 0}}})
+    detector.start()
+    comments = run_for(detector, 0.1)
+    assert comments and all(c.text.startswith('keranjang ') for c in comments)
+
+
+def main():
+    tests = [test_steady_rate_and_mix, test_typos_and_emoji, test_burst_and_duration,
+             test_slow_consumer_counts_missed, test_saturates_pipeline, test_unbounded_slot_family]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
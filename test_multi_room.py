@@ -0,0 +1,138 @@
+"""
+Test Multi Room
+Beberapa akun live dalam satu proses: tag room, stream gabungan, matcher/cooldown dan routing player per room
+"""
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+from comment_detector import Comment, MultiRoomDetector, create_comment_detector
+from comment_pipeline import CommentPipeline
+
+
+def file_room(folder, room):
+    return {'room': room, 'type': 'file', 'file_path': str(Path(folder) / f"{room}.txt"),
+            'tail_mode': 'poll', 'check_interval': 0.02, 'checkpoint_path': None}
+
+
+def append(path, text):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_rooms_are_tagged():
+    with tempfile.TemporaryDirectory() as folder:
+        config = {'comment_source': {'type': 'multi_room',
+                                     'rooms': [file_room(folder, 'tokoA'), file_room(folder, 'tokoB')]}}
+        detector = create_comment_detector(config)
+        assert isinstance(detector, MultiRoomDetector) and list(detector.children) == ['tokoA', 'tokoB']
+        detector.start()
+        append(Path(folder) / 'tokoA.txt', "a: keranjang 1\n")
+        append(Path(folder) / 'tokoB.txt', "b: keranjang 2\nc: keranjang 3\n")
+        comments = detector.get_new_comments()
+        assert [(c.room, c.text) for c in comments] == [
+            ('tokoA', 'keranjang 1'), ('tokoB', 'keranjang 2'), ('tokoB', 'keranjang 3')]
+        assert set(detector.source_stats()) == {'tokoA', 'tokoB'}
+        detector.stop()
+
+
+def test_merged_stream():
+    with tempfile.TemporaryDirectory() as folder:
+        rooms = [file_room(folder, f"room{i}") for i in range(4)]
+        detector = create_comment_detector({'comment_source': {'type': 'multi_room', 'rooms': rooms}})
+        detector.start()
+        got = []
+        done = threading.Event()
+
+        def process(batch):
+            got.extend((c.room, c.text) for c in batch)
+            if len(got) >= 8:
+                done.set()
+
+        pipeline = CommentPipeline(detector, process)
+        pipeline.start()
+        for i in range(4):
+            append(Path(folder) / f"room{i}.txt", f"u: keranjang {i}\nv: halo {i}\n")
+        assert done.wait(3)
+        pipeline.stop()
+        detector.stop()
+        assert sorted(got) == sorted([(f"room{i}", f"keranjang {i}") for i in range(4)]
+                                     + [(f"room{i}", f"halo {i}") for i in range(4)])
+
+
+def test_invalid_rooms():
+    with tempfile.TemporaryDirectory() as folder:
+        room = file_room(folder, 'a')
+        for rooms in ([], [room, dict(room)], [{'room': 'a', 'type': 'multi_room'}]):
+            try:
+                create_comment_detector({'comment_source': {'type': 'multi_room', 'rooms': rooms}})
+                assert False, f"expected ValueError for {rooms}"
+            except ValueError:
+                pass
+
+
+def test_web_app_routes_per_room():
+    import web_app
+    with tempfile.TemporaryDirectory() as folder:
+        videos = {}
+        for name in ('kaos', 'sepatu'):
+            videos[name] = Path(folder) / f"{name}.mp4"
+            videos[name].write_bytes(b'')
+        web_app.config = {
+            'comment_keywords': {'keranjang 1': {'video_path': str(videos['kaos'])}},
+            'comment_source': {'type': 'multi_room', 'rooms': [
+                {'room': 'tokoA', 'type': 'file'},
+                {'room': 'tokoB', 'type': 'file',
+                 'comment_keywords': {'keranjang 1': {'video_path': str(videos['sepatu'])}}},
+            ]},
+        }
+        web_app.matcher = None
+        web_app.reload_matcher()
+        web_app.promo_cooldowns.clear()
+        player_a = web_app.socketio.test_client(web_app.app, query_string='room=tokoA')
+        player_b = web_app.socketio.test_client(web_app.app, query_string='room=tokoB')
+        for client in (player_a, player_b):
+            client.get_received()
+
+        def played(client):
+            return [e['args'][0] for e in client.get_received() if e['name'] == 'play_video']
+
+        def comment(room, text):
+            c = Comment('buyer', text)
+            c.room = room
+            return c
+
+        web_app.process_comments([comment('tokoA', 'keranjang 1'), comment('tokoB', 'keranjang 1')])
+        a, b = played(player_a), played(player_b)
+        assert [p['video_name'] for p in a] == ['kaos.mp4'] and a[0]['room'] == 'tokoA'
+        assert [p['video_name'] for p in b] == ['sepatu.mp4']
+        # Room A sedang memutar promo; room B selesai lalu cooldown berlaku per room
+        with web_app.state_lock:
+            assert web_app.app_state['rooms']['tokoA']['main_video_playing'] is False
+            web_app.app_state['rooms']['tokoB']['main_video_playing'] = True
+        web_app.process_comments([comment('tokoB', 'keranjang 1')])
+        assert played(player_b) == []
+        assert ('tokoA', str(videos['kaos'])) in web_app.promo_cooldowns
+        player_a.disconnect()
+        player_b.disconnect()
+        web_app.app_state['rooms'] = {}
+        web_app.room_matchers.clear()
+        web_app.matcher = None
+
+
+def main():
+    tests = [test_rooms_are_tagged, test_merged_stream, test_invalid_rooms, test_web_app_routes_per_room]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
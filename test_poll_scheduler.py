@@ -0,0 +1,105 @@
+"""
+Test Poll Scheduler
+Interval polling menyesuaikan laju komentar, has_more, periode sepi dan error/throttle
+"""
+import sys
+
+from poll_scheduler import AdaptivePollScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_polls(scheduler, clock, counts, has_more=False):
+    for count in counts:
+        clock.now += scheduler.interval
+        scheduler.observe(count, has_more)
+    return scheduler.interval
+
+
+def test_defaults_from_base_interval():
+    scheduler = AdaptivePollScheduler(2.0)
+    assert scheduler.interval == 2.0
+    assert scheduler.min_interval == 0.5 and scheduler.max_interval == 10.0
+    scheduler = AdaptivePollScheduler.from_config({'min_interval': 1, 'max_interval': 4}, 2.0)
+    assert (scheduler.min_interval, scheduler.max_interval) == (1, 4)
+
+
+def test_burst_shrinks_interval():
+    clock = FakeClock()
+    scheduler = AdaptivePollScheduler(2.0, target_batch=5, clock=clock)
+    scheduler.observe(0)
+    # ~20 komentar/detik: interval turun ke min_interval
+    interval = run_polls(scheduler, clock, [40] * 10)
+    assert interval == 0.5
+    assert 'comments/s' in scheduler.reason and scheduler.rate > 10
+    # has_more selalu langsung ke minimum
+    scheduler = AdaptivePollScheduler(2.0, clock=clock)
+    scheduler.observe(1, has_more=True)
+    assert scheduler.interval == 0.5 and scheduler.reason == 'backlog (has_more)'
+
+
+def test_first_poll_with_comments():
+    clock = FakeClock()
+    scheduler = AdaptivePollScheduler(2.0, target_batch=5, clock=clock)
+    # Poll pertama langsung berisi komentar: laju diambil dari sampel itu, interval tidak melebar
+    assert scheduler.observe(1) == 2.0
+    assert scheduler.rate == 0.5 and scheduler.reason == "0.50 comments/s"
+    scheduler = AdaptivePollScheduler(2.0, target_batch=5, clock=clock)
+    assert scheduler.observe(40) == 0.5
+
+
+def test_idle_grows_to_max():
+    clock = FakeClock()
+    scheduler = AdaptivePollScheduler(2.0, clock=clock)
+    scheduler.observe(0)
+    interval = run_polls(scheduler, clock, [0] * 20)
+    assert interval == 10.0 and scheduler.reason == 'idle'
+    # Komentar datang lagi: interval kembali turun
+    run_polls(scheduler, clock, [20, 20, 20])
+    assert scheduler.interval < 10.0
+
+
+def test_errors_and_throttle_back_off():
+    clock = FakeClock()
+    scheduler = AdaptivePollScheduler(2.0, clock=clock)
+    assert scheduler.on_error() == 4.0 and scheduler.reason == 'error x1'
+    assert scheduler.on_error() == 8.0
+    assert scheduler.on_error() == 10.0
+    # Retry-After lebih lama dari max_interval tetap dihormati
+    assert scheduler.on_error(throttled=True, retry_after=30) == 30
+    assert scheduler.reason == 'throttled' and scheduler.errors == 4
+    scheduler.observe(3)
+    assert scheduler.errors == 0
+
+
+def test_disabled_keeps_fixed_interval():
+    clock = FakeClock()
+    scheduler = AdaptivePollScheduler(2.0, enabled=False, clock=clock)
+    run_polls(scheduler, clock, [50] * 5)
+    scheduler.on_error()
+    assert scheduler.interval == 2.0
+    assert scheduler.snapshot()['enabled'] is False
+
+
+def main():
+    tests = [test_defaults_from_base_interval, test_burst_shrinks_interval, test_first_poll_with_comments,
+             test_idle_grows_to_max, test_errors_and_throttle_back_off, test_disabled_keeps_fixed_interval]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Test Replay
+Putar ulang sesi rekaman (format teks & NDJSON bridge/journal) real-time, dipercepat dan secepatnya
+"""
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from comment_detector import ReplayCommentDetector, create_comment_detector
+from comment_pipeline import CommentPipeline
+
+
+def make_detector(path, **source):
+    return create_comment_detector({'comment_source': {'type': 'replay', 'replay_path': str(path), **source}})
+
+
+def wait_finished(detector, timeout=5.0):
+    deadline = time.time() + timeout
+    while not detector.finished and time.time() < deadline:
+        time.sleep(0.005)
+    assert detector.finished, "replay did not finish"
+
+
+def test_text_session_accelerated():
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / 'session.txt'
+        path.write_text("# rekaman\n"
+                        "[2024-11-09 10:30:00] buyer123: keranjang 1\n"
+                        "[2024-11-09 10:30:01] buyer456: keranjang 3\n"
+                        "[2024-11-09 10:30:01] buyer456: keranjang 3\n"
+                        "baris rusak\n"
+                        "[2024-11-09 10:30:02] shopper789: mau keranjang 2 dong\n", encoding='utf-8')
+        detector = make_detector(path, speed=10)
+        assert isinstance(detector, ReplayCommentDetector)
+        started = time.monotonic()
+        detector.start()
+        time.sleep(0.05)
+        assert [c.text for c in detector.get_new_comments()] == ['keranjang 1']
+        wait_finished(detector)
+        elapsed = time.monotonic() - started
+        detector.stop()
+        # 2 detik sesi pada 10x
+        assert 0.18 < elapsed < 1.0
+        assert [c.text for c in detector.get_new_comments()] == ['keranjang 3', 'mau keranjang 2 dong']
+        stats = detector.source_stats()
+        assert stats['records'] == 4 and stats['duplicates'] == 1 and stats['skipped'] == 1
+        assert stats['emitted'] == 3 and stats['position_s'] == 2.0
+
+
+def test_ndjson_frames_and_journal():
+    now = time.time() * 1000
+    lines = [
+        {'type': 'status', 'status': 'connected'},
+        {'type': 'comments', 'items': [
+            {'comment': 'keranjang 1', 'msgId': 'a', 'user': {'nickname': 'A'}, 'timestamp': now},
+            {'comment': 'keranjang 1', 'msgId': 'a', 'user': {'nickname': 'A'}, 'timestamp': now},
+        ]},
+        {'type': 'comment', 'comment': 'keranjang 2', 'msgId': 'b', 'user': {'uniqueId': 'b'}, 'timestamp': now + 3600e3},
+        {'kind': 'comment', 'ts': now / 1000 + 3601, 'user': 'c', 'text': 'keranjang 3', 'id': 'c', 'room': 'tokoB'},
+        {'kind': 'trigger', 'ts': now / 1000 + 3601, 'video': 'x.mp4'},
+        {'type': 'heartbeat'},
+    ]
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / 'session.ndjson'
+        path.write_text('\n'.join(json.dumps(line) for line in lines) + '\n{broken\n', encoding='utf-8')
+        # Jeda 1 jam dipotong max_gap
+        detector = make_detector(path, speed=20, max_gap=0.5)
+        detector.start()
+        wait_finished(detector)
+        detector.stop()
+        comments = detector.get_new_comments()
+        assert [(c.username, c.text, c.room) for c in comments] == [
+            ('A', 'keranjang 1', None), ('b', 'keranjang 2', None), ('c', 'keranjang 3', 'tokoB')]
+        stats = detector.source_stats()
+        assert stats['duplicates'] == 1 and stats['skipped'] == 1 and stats['position_s'] == 1.0
+
+
+def test_as_fast_as_possible_through_pipeline():
+    total = 20000
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / 'flash_sale.ndjson'
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(total):
+                # 3 jam sesi asli
+                f.write(json.dumps({'comment': f"keranjang {i % 100}", 'msgId': str(i),
+                                    'user': {'nickname': f"u{i % 500}"}, 'timestamp': 1.7e12 + i * 540}) + '\n')
+        detector = make_detector(path, speed=0, max_pending=1000, loop=True)
+        got = []
+        done = threading.Event()
+
+        def process(batch):
+            got.extend(batch)
+            if len(got) >= total * 2:
+                done.set()
+
+        pipeline = CommentPipeline(detector, process, max_batch=256)
+        detector.start()
+        pipeline.start()
+        assert done.wait(30)
+        pipeline.stop()
+        detector.stop()
+        stats = detector.source_stats()
+        # Dua putaran (loop) tidak saling dedup
+        assert stats['passes'] >= 2 and stats['emitted'] >= total * 2
+        assert stats['rate'] > 5000 and stats['achieved_speed'] > 100
+
+
+def test_missing_file():
+    try:
+        make_detector('/nonexistent/session.ndjson')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def main():
+    tests = [test_text_session_accelerated, test_ndjson_frames_and_journal,
+             test_as_fast_as_possible_through_pipeline, test_missing_file]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
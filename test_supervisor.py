@@ -0,0 +1,206 @@
+"""
+Test Supervisor
+Restart otomatis detector push yang mati: backoff, dedup tetap utuh dan time-to-recover tercatat
+"""
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from comment_detector import Comment, CommentDetector, TikTokLiveConnectorDetector
+from supervisor import DetectorSupervisor
+
+
+class FlakyDetector(CommentDetector):
+    """Detector push palsu: bisa 'dimatikan' dan gagal start beberapa kali"""
+    push_source = True
+    supervised = True
+
+    def __init__(self, fail_starts=0):
+        super().__init__({'comment_source': {'type': 'fake'}})
+        self.fail_starts = fail_starts
+        self.starts = 0
+        self.alive = False
+
+    def start(self):
+        self.starts += 1
+        if self.fail_starts:
+            self.fail_starts -= 1
+            raise RuntimeError("connect refused")
+        self.alive = True
+        self._touch()
+
+    def stop(self):
+        self.alive = False
+
+    def health(self):
+        return None if self.alive else "connection lost"
+
+    def receive(self, msg_id, text):
+        c = Comment('buyer', text)
+        if not self._is_duplicate(c, msg_id):
+            self._push(c)
+
+
+def test_restart_keeps_dedup():
+    detector = FlakyDetector()
+    detector.start()
+    detector.receive('m1', 'keranjang 1')
+    events = []
+    supervisor = DetectorSupervisor({'source': detector}, backoff_initial=0.01,
+                                    on_event=lambda message, level: events.append(level))
+    supervisor.check()
+    assert supervisor.stats()['source']['status'] == 'up'
+    detector.alive = False
+    supervisor.check()
+    assert detector.starts == 2 and supervisor.stats()['source']['status'] == 'recovering'
+    supervisor.check()
+    stats = supervisor.stats()['source']
+    assert stats['status'] == 'up' and stats['restarts'] == 1 and stats['outages'] == 1
+    assert stats['time_to_recover']['count'] == 1 and stats['last_recovery_s'] < 1
+    # Pesan yang dikirim ulang sumber setelah reconnect tetap dianggap duplikat
+    detector.receive('m1', 'keranjang 1')
+    detector.receive('m2', 'keranjang 2')
+    assert [c.text for c in detector.get_new_comments()] == ['keranjang 1', 'keranjang 2']
+    assert events == ['warning', 'success']
+
+
+def test_backoff_on_failed_restarts():
+    detector = FlakyDetector(fail_starts=3)
+    supervisor = DetectorSupervisor({'source': detector}, backoff_initial=0.05, backoff_factor=2, jitter=0)
+    supervisor.check()
+    stats = supervisor.stats()['source']
+    assert detector.starts == 1 and stats['failed_restarts'] == 1
+    # Masih dalam jeda backoff: tidak ada percobaan baru
+    supervisor.check()
+    assert detector.starts == 1
+    time.sleep(0.06)
+    supervisor.check()
+    assert detector.starts == 2
+    time.sleep(0.06)
+    supervisor.check()
+    assert detector.starts == 2  # jeda kedua 0.1s
+    time.sleep(0.05)
+    supervisor.check()
+    time.sleep(0.21)
+    supervisor.check()
+    supervisor.check()
+    stats = supervisor.stats()['source']
+    assert detector.starts == 4 and stats['status'] == 'up' and stats['failed_restarts'] == 3
+    assert stats['last_recovery_s'] >= 0.3
+
+
+def test_thread_recovers_quickly():
+    detector = FlakyDetector()
+    detector.start()
+    supervisor = DetectorSupervisor({'source': detector}, check_interval=5)
+    supervisor.start()
+    time.sleep(0.05)
+    detector.alive = False
+    # Sumber memberi tahu supervisor sendiri, tidak perlu menunggu check_interval
+    detector._failed()
+    deadline = time.time() + 2
+    while supervisor.stats()['source']['restarts'] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    supervisor.stop()
+    assert detector.starts == 2 and detector.on_failure is None
+
+
+def test_targets_for():
+    detector = FlakyDetector()
+    assert DetectorSupervisor.targets_for(detector) == {'source': detector}
+    assert DetectorSupervisor.targets_for(CommentDetector({'comment_source': {}})) == {}
+
+
+FAKE_BRIDGE = """
+const frames = [
+  {type: 'status', status: 'connected', roomId: '1'},
+  {type: 'comments', items: [{comment: 'keranjang 1', msgId: 'm1', user: {nickname: 'A'}, timestamp: Date.now()}]},
+  {type: 'heartbeat', pending: 0},
+];
+process.stdout.write(frames.map(f => JSON.stringify(f)).join('\\n') + '\\n');
+setTimeout(() => process.exit(1), 150);
+"""
+
+
+def test_bridge_process_restarted():
+    if shutil.which('node') is None:
+        print("  (node not installed, skipped)")
+        return
+    with tempfile.TemporaryDirectory() as folder:
+        script = Path(folder) / 'bridge.js'
+        script.write_text(FAKE_BRIDGE, encoding='utf-8')
+        detector = TikTokLiveConnectorDetector({'comment_source': {
+            'type': 'tiktok_live', 'live_username': 'toko', 'bridge_path': str(script)}})
+        detector.start()
+        supervisor = DetectorSupervisor({'source': detector}, check_interval=0.05, backoff_initial=0.05)
+        supervisor.start()
+        deadline = time.time() + 5
+        while supervisor.stats()['source']['restarts'] < 2 and time.time() < deadline:
+            time.sleep(0.02)
+        supervisor.stop()
+        detector.stop()
+        stats = supervisor.stats()['source']
+        assert stats['restarts'] >= 2 and stats['time_to_recover']['count'] >= 1
+        # Setiap proses baru mengirim ulang m1, hanya sekali yang lolos
+        assert [c.text for c in detector.get_new_comments()] == ['keranjang 1']
+
+
+SLOW_CONNECT_BRIDGE = """
+const write = f => process.stdout.write(JSON.stringify(f) + '\\n');
+// Resolve room lambat: belum ada heartbeat sebelum 'connected'
+setTimeout(() => { write({type: 'status', status: 'connected', roomId: '1'}); write({type: 'heartbeat'}); }, 400);
+setTimeout(() => {}, 10000);
+"""
+
+
+def test_bridge_slow_connect_is_healthy():
+    if shutil.which('node') is None:
+        print("  (node not installed, skipped)")
+        return
+    with tempfile.TemporaryDirectory() as folder:
+        script = Path(folder) / 'bridge.js'
+        script.write_text(SLOW_CONNECT_BRIDGE, encoding='utf-8')
+        detector = TikTokLiveConnectorDetector({'comment_source': {
+            'type': 'tiktok_live', 'live_username': 'toko', 'bridge_path': str(script),
+            'bridge': {'heartbeat_timeout': 0.15, 'connect_timeout': 2}}})
+        detector.start()
+        threads = [detector._reader_thread, detector._log_thread]
+        try:
+            # Lewat heartbeat_timeout tapi masih dalam connect_timeout
+            time.sleep(0.3)
+            assert detector.health() is None
+            deadline = time.time() + 3
+            while detector._connected_at is None and time.time() < deadline:
+                time.sleep(0.01)
+            assert detector.health() is None
+            # Setelah connected, heartbeat yang berhenti dilaporkan
+            time.sleep(0.3)
+            assert 'no heartbeat' in (detector.health() or '')
+            detector.connect_timeout = 0.1
+            detector._connected_at = None
+            assert 'not connected' in (detector.health() or '')
+        finally:
+            detector.stop()
+        # stop() menunggu reader stdout/stderr lama selesai
+        assert not any(thread.is_alive() for thread in threads)
+        assert detector._reader_thread is None
+
+
+def main():
+    tests = [test_restart_keeps_dedup, test_backoff_on_failed_restarts, test_thread_recovers_quickly,
+             test_targets_for, test_bridge_process_restarted, test_bridge_slow_connect_is_healthy]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
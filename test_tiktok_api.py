@@ -0,0 +1,349 @@
+"""
+Test TikTok API Client
+Server HTTP lokal pengganti Research API: keep-alive, gzip, throttling (429 + Retry-After),
+error 5xx, respon lambat, header rate limit dan catch-up paginasi TikTokCommentDetector
+"""
+import gzip
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from comment_detector import TikTokCommentDetector
+from tiktok_api import TikTokAPIError, TikTokResearchClient
+
+
+class StandIn:
+    """Research API palsu; script berisi respon berurutan (status, headers, delay detik).
+
+    Jika items diisi, respon berupa halaman items[cursor:cursor + max_count] dengan batas cursor 1000.
+    Seperti endpoint asli, body hanya boleh berisi video_id, max_count dan cursor (selain itu 400).
+    """
+    FIELDS = {'video_id', 'max_count', 'cursor'}
+
+    def __init__(self):
+        self.script = []
+        self.items = None
+        self.requests = []
+        self.connections = set()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                stand_in.connections.add(self.client_address)
+                stand_in.requests.append({'headers': dict(self.headers), 'body': body, 'path': self.path})
+                status, headers, delay = stand_in.script.pop(0) if stand_in.script else (200, {}, 0)
+                if delay:
+                    time.sleep(delay)
+                cursor = body.get('cursor', 0)
+                if set(body) - StandIn.FIELDS:
+                    status = 400
+                if stand_in.items is not None:
+                    if cursor >= 1000:
+                        status = 400
+                    page = stand_in.items[cursor:cursor + body.get('max_count', 10)]
+                    data = {'comments': page, 'cursor': cursor + len(page),
+                            'has_more': cursor + len(page) < len(stand_in.items)}
+                else:
+                    data = {'comments': [{'id': cursor + 1, 'text': 'keranjang 1'}],
+                            'cursor': cursor + 1, 'has_more': True}
+                payload = json.dumps({'data': data, 'error': {'code': 'ok'}}).encode() \
+                    if status == 200 else b'{"error": {"code": "rate_limit_exceeded"}}'
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    payload = gzip.compress(payload)
+                    headers = {**headers, 'Content-Encoding': 'gzip'}
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                try:
+                    self.wfile.write(payload)
+                except OSError:
+                    pass  # client sudah timeout
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v2/research/video/comment/list/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class RecordingSleep:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, seconds):
+        self.calls.append(seconds)
+        time.sleep(seconds)
+
+
+def make_client(stand_in, **kwargs):
+    kwargs.setdefault('backoff_base', 0.01)
+    kwargs.setdefault('sleep', RecordingSleep())
+    return TikTokResearchClient(stand_in.url, **kwargs)
+
+
+def test_keep_alive_and_gzip():
+    stand_in = StandIn()
+    client = make_client(stand_in)
+    try:
+        for cursor in range(3):
+            page = client.fetch_video_comments('token', 123, 'id,text', max_count=10, cursor=cursor)
+            assert page['cursor'] == cursor + 1 and page['has_more']
+            assert page['comments'][0]['text'] == 'keranjang 1'
+        # Satu koneksi TCP dipakai ulang untuk semua poll
+        assert len(stand_in.connections) == 1
+        first = stand_in.requests[0]
+        assert 'gzip' in first['headers']['Accept-Encoding']
+        assert first['headers']['Authorization'] == 'Bearer token'
+        assert first['path'].endswith('?fields=id%2Ctext')
+        stats = client.stats()
+        assert stats['calls'] == 3 and stats['requests'] == 3 and stats['retries'] == 0
+        assert stats['latency']['count'] == 3
+    finally:
+        client.close()
+        stand_in.close()
+
+
+def test_retry_after_and_server_errors():
+    stand_in = StandIn()
+    stand_in.script = [(429, {'Retry-After': '0.2'}, 0), (503, {}, 0)]
+    client = make_client(stand_in)
+    try:
+        page = client.fetch_video_comments('token', 123, 'id,text')
+        assert page['comments']
+        stats = client.stats()
+        assert stats['requests'] == 3 and stats['retries'] == 2 and stats['throttled'] == 1
+        # Tunggu sesuai Retry-After, lalu backoff kecil untuk 503
+        assert 0.15 <= client.sleep.calls[0] <= 0.2
+        assert len(client.sleep.calls) == 2 and client.sleep.calls[1] <= 0.02
+    finally:
+        client.close()
+        stand_in.close()
+
+
+def test_gives_up_and_non_retryable():
+    stand_in = StandIn()
+    stand_in.script = [(500, {}, 0)] * 3 + [(400, {}, 0)]
+    client = make_client(stand_in, max_retries=2)
+    try:
+        try:
+            client.fetch_video_comments('token', 123, 'id,text')
+            assert False, "expected TikTokAPIError"
+        except TikTokAPIError as e:
+            assert 'HTTP 500' in str(e)
+        assert client.stats()['requests'] == 3
+        # 400 tidak diulang
+        try:
+            client.fetch_video_comments('token', 123, 'id,text')
+            assert False, "expected TikTokAPIError"
+        except TikTokAPIError as e:
+            assert 'HTTP 400' in str(e)
+        stats = client.stats()
+        assert stats['requests'] == 4 and stats['errors'] == 2
+    finally:
+        client.close()
+        stand_in.close()
+
+
+def test_slow_response_is_retried():
+    stand_in = StandIn()
+    stand_in.script = [(200, {}, 0.5)]
+    client = make_client(stand_in, timeout=0.2)
+    try:
+        page = client.fetch_video_comments('token', 123, 'id,text')
+        assert page['comments']
+        stats = client.stats()
+        assert stats['retries'] == 1 and stats['requests'] == 2
+        assert stats['latency']['max_ms'] >= 200
+    finally:
+        client.close()
+        stand_in.close()
+
+
+def test_rate_limit_headers():
+    stand_in = StandIn()
+    stand_in.script = [(200, {'X-RateLimit-Limit': '100', 'X-RateLimit-Remaining': '0',
+                              'X-RateLimit-Reset': '0.3'}, 0)]
+    client = make_client(stand_in)
+    try:
+        client.fetch_video_comments('token', 123, 'id,text')
+        assert client.stats()['rate_limit']['remaining'] == 0
+        # Kuota habis: request berikutnya menunggu reset
+        started = time.monotonic()
+        client.fetch_video_comments('token', 123, 'id,text')
+        assert time.monotonic() - started >= 0.25
+        # Reset terlalu lama: gagal cepat tanpa request ke server
+        stand_in.script = [(200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(time.time() + 600)}, 0)]
+        client.fetch_video_comments('token', 123, 'id,text')
+        requests_before = client.stats()['requests']
+        try:
+            client.fetch_video_comments('token', 123, 'id,text')
+            assert False, "expected TikTokAPIError"
+        except TikTokAPIError as e:
+            assert 'Rate limited' in str(e)
+        assert client.stats()['requests'] == requests_before
+    finally:
+        client.close()
+        stand_in.close()
+
+
+def make_detector(stand_in, **catch_up):
+    source = {'type': 'tiktok', 'api_base': stand_in.url, 'access_token': 'token', 'video_id': 123,
+              'max_count': 10, 'poll_interval': 0.05, 'catch_up': catch_up}
+    return TikTokCommentDetector({'comment_source': source})
+
+
+def backlog(count, start=0, age=600):
+    created = time.time() - age
+    return [{'id': start + i, 'text': f"keranjang {i % 7}", 'create_time': created + i} for i in range(count)]
+
+
+def test_catch_up_drains_backlog():
+    stand_in = StandIn()
+    stand_in.items = backlog(95)
+    detector = make_detector(stand_in, max_pages=20)
+    detector.start()
+    try:
+        first = detector.get_new_comments()
+        assert len(first) == 10 and detector.has_more
+        assert detector.lag_seconds > 500
+        comments = list(first)
+        while detector.has_more:
+            detector.wait_for_comments(1.0)
+            comments.extend(detector.get_new_comments())
+        assert len(comments) == 95 and len({c.username for c in comments}) == 95
+        stats = detector.source_stats()
+        assert stats['pages'] == 10 and stats['prefetched'] == 9 and stats['cycles'] == 1
+        assert stats['lag_seconds'] == 0 and stats['cursor'] == 95
+    finally:
+        detector.stop()
+        stand_in.close()
+
+
+def test_catch_up_budget():
+    stand_in = StandIn()
+    stand_in.items = backlog(95)
+    detector = make_detector(stand_in, max_pages=3)
+    detector.start()
+    try:
+        total = 0
+        for _ in range(3):
+            total += len(detector.get_new_comments())
+        assert total == 30
+        stats = detector.source_stats()
+        assert stats['budget_stops'] == 1 and stats['cursor'] == 30 and stats['has_more']
+        # Siklus berikutnya menunggu poll_interval lagi
+        started = time.monotonic()
+        detector.wait_for_comments(0.1)
+        assert time.monotonic() - started >= 0.09
+    finally:
+        detector.stop()
+        stand_in.close()
+
+
+def ids(comments):
+    return [int(c.username.split(':')[1]) for c in comments]
+
+
+def test_cursor_ceiling_oldest_first():
+    stand_in = StandIn()
+    stand_in.items = backlog(1005, age=2000)
+    detector = make_detector(stand_in, max_pages=200, prefetch=False)
+    detector.max_count = 100
+    detector.start()
+    try:
+        delivered = []
+        for _ in range(20):
+            delivered.extend(ids(detector.get_new_comments()))
+            if not detector.catching_up():
+                break
+        # Komentar setelah cursor 1000 tidak terjangkau endpoint: berhenti dan laporkan lag
+        assert delivered == list(range(1000))
+        stats = detector.source_stats()
+        assert stats['ceiling_hits'] == 1 and stats['windowed'] and stats['has_more']
+        assert stats['cursor'] == 0 and stats['lag_seconds'] > 0
+        assert all(r['body']['cursor'] < 1000 and set(r['body']) == StandIn.FIELDS for r in stand_in.requests)
+        # Siklus berikutnya hanya membaca ulang halaman pertama, tidak ada yang terkirim dua kali,
+        # juga setelah dedup melupakannya (TTL habis)
+        requests_before = len(stand_in.requests)
+        assert detector.get_new_comments() == []
+        detector.processed_comments.clear()
+        assert detector.get_new_comments() == []
+        assert len(stand_in.requests) == requests_before + 2 and detector.cursor == 0
+    finally:
+        detector.stop()
+        stand_in.close()
+
+
+def test_cursor_ceiling_newest_first():
+    stand_in = StandIn()
+    # Urutan baru -> lama: setelah mulai lagi dari cursor 0 komentar baru ada di halaman pertama
+    stand_in.items = list(reversed(backlog(1005, age=2000)))
+    detector = make_detector(stand_in, max_pages=200, prefetch=False)
+    detector.max_count = 100
+    detector.start()
+    try:
+        delivered = []
+        for _ in range(20):
+            delivered.extend(ids(detector.get_new_comments()))
+            if not detector.catching_up():
+                break
+        assert len(delivered) == 1000 and detector.source_stats()['ceiling_hits'] == 1
+        newest = stand_in.items[0]['create_time']
+        fresh = [{'id': 5000 + i, 'text': 'keranjang 1', 'create_time': newest + 1 + i} for i in range(5)]
+        stand_in.items = list(reversed(fresh)) + stand_in.items
+        assert sorted(ids(detector.get_new_comments())) == list(range(5000, 5005))
+        # Halaman berikutnya seluruhnya lama: siklus selesai dan kembali ke cursor 0
+        assert detector.get_new_comments() == []
+        assert not detector.catching_up() and detector.cursor == 0
+        assert detector.get_new_comments() == []
+    finally:
+        detector.stop()
+        stand_in.close()
+
+
+def test_unknown_fields_rejected():
+    stand_in = StandIn()
+    client = TikTokResearchClient(api_base=stand_in.url, max_retries=0)
+    try:
+        # Stand-in menolak field di luar video_id/max_count/cursor; client tidak pernah mengirimnya
+        client.fetch_video_comments('token', 123, 'id,text', cursor=5)
+        assert set(stand_in.requests[-1]['body']) == StandIn.FIELDS
+        response = client.session.post(stand_in.url, json={'video_id': 1, 'cursor': 0, 'start_time': 1})
+        assert response.status_code == 400
+    finally:
+        client.close()
+        stand_in.close()
+
+
+def main():
+    tests = [test_keep_alive_and_gzip, test_retry_after_and_server_errors, test_gives_up_and_non_retryable,
+             test_slow_response_is_retried, test_rate_limit_headers, test_catch_up_drains_backlog,
+             test_catch_up_budget, test_cursor_ceiling_oldest_first, test_cursor_ceiling_newest_first,
+             test_unknown_fields_rejected]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✓ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"  ✗ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
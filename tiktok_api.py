@@ -1,16 +1,29 @@
 import os
 import time
 import json
-from typing import Dict, Any, List, Optional
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, List, Optional, Callable
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from latency import LatencyHistogram
 
 
 API_BASE = "https://open.tiktokapis.com/v2/research/video/comment/list/"
 
+# Statuses worth retrying: throttling and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
 
 class TikTokAPIError(Exception):
-    pass
+    """API/network failure; status is the HTTP status (if any), retry_after the advised wait in seconds"""
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
 
 
 def _get_token(config_source: Dict) -> str:
@@ -25,6 +38,202 @@ def _get_token(config_source: Dict) -> str:
     raise TikTokAPIError("Missing TikTok access token. Set 'access_token' or 'token_env'.")
 
 
+def _header_seconds(value: Optional[str], now: float) -> Optional[float]:
+    """Retry-After / X-RateLimit-Reset -> seconds from now (delta seconds, epoch or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+        except (TypeError, ValueError):
+            return None
+    # Large values are epoch seconds, anything else is a delta
+    return max(0.0, number - now) if number > 1e9 else max(0.0, number)
+
+
+class TikTokResearchClient:
+    """Research API client built on one requests.Session (keep-alive, pooled connections, gzip).
+
+    Network errors, timeouts, 429 and 5xx responses are retried with jittered exponential
+    backoff. Retry-After and X-RateLimit-* headers are honoured: once the quota is used up the
+    next request waits for the reset, or fails fast when that wait is longer than max_wait.
+    """
+    def __init__(self, api_base: str = API_BASE, timeout: float = 20, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0, max_wait: float = 60.0,
+                 pool_size: int = 4, sleep: Callable[[float], None] = time.sleep):
+        self.api_base = api_base
+        self.timeout = float(timeout)
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.max_wait = float(max_wait)
+        self.sleep = sleep
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, int(pool_size)), max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive',
+        })
+        self._lock = threading.Lock()
+        # Epoch seconds before which no request may be sent (Retry-After / exhausted quota)
+        self._blocked_until = 0.0
+        self.rate_limit: Dict[str, Optional[float]] = {'limit': None, 'remaining': None, 'reset_in': None}
+        self.latency = LatencyHistogram()
+        self.counters = {'calls': 0, 'requests': 0, 'retries': 0, 'throttled': 0, 'errors': 0,
+                         'waited_s': 0.0}
+        self.last_status: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, config_source: Dict, timeout: float = 20) -> "TikTokResearchClient":
+        """Build a client from comment_source (api_base + http_settings)"""
+        settings = config_source.get('http_settings') or {}
+        kwargs = {k: settings[k] for k in ('max_retries', 'backoff_base', 'backoff_max', 'max_wait', 'pool_size')
+                  if k in settings}
+        return cls(config_source.get('api_base') or API_BASE, timeout=settings.get('timeout', timeout), **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform between 0 and base * 2^attempt, capped at backoff_max"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _wait_turn(self):
+        """Sleep while the server asked us to back off or the rate-limit quota is exhausted"""
+        with self._lock:
+            wait = self._blocked_until - time.time()
+        if wait <= 0:
+            return
+        if wait > self.max_wait:
+            raise TikTokAPIError(f"Rate limited, retry in {wait:.0f}s", status=429, retry_after=wait)
+        self._count('waited_s', wait)
+        self.sleep(wait)
+
+    def _count(self, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _block_for(self, seconds: float):
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.time() + seconds)
+
+    def _read_rate_limit(self, resp) -> Optional[float]:
+        """Remember rate-limit headers; return Retry-After in seconds if present"""
+        headers = resp.headers
+        now = time.time()
+        limit = headers.get('X-RateLimit-Limit') or headers.get('RateLimit-Limit')
+        remaining = headers.get('X-RateLimit-Remaining') or headers.get('RateLimit-Remaining')
+        reset_in = _header_seconds(headers.get('X-RateLimit-Reset') or headers.get('RateLimit-Reset'), now)
+        try:
+            self.rate_limit = {
+                'limit': float(limit) if limit is not None else None,
+                'remaining': float(remaining) if remaining is not None else None,
+                'reset_in': reset_in,
+            }
+        except ValueError:
+            pass
+        if self.rate_limit['remaining'] is not None and self.rate_limit['remaining'] <= 0 and reset_in:
+            self._block_for(reset_in)
+        retry_after = _header_seconds(headers.get('Retry-After'), now)
+        if retry_after is not None:
+            self._block_for(retry_after)
+        return retry_after
+
+    def post(self, token: str, params: Dict, body: Dict):
+        """POST to api_base with retries; return the 200 response or raise TikTokAPIError"""
+        self._count('calls')
+        attempt = 0
+        while True:
+            self._wait_turn()
+            self._count('requests')
+            started = time.perf_counter()
+            error = None
+            try:
+                resp = self.session.post(self.api_base, params=params, json=body, timeout=self.timeout,
+                                         headers={'Authorization': f"Bearer {token}"})
+            except requests.RequestException as e:
+                resp = None
+                error = f"Network error: {e}"
+            with self._lock:
+                self.latency.record((time.perf_counter() - started) * 1000)
+            retry_after = None
+            if resp is not None:
+                self.last_status = resp.status_code
+                retry_after = self._read_rate_limit(resp)
+                if resp.status_code == 200:
+                    return resp
+                if resp.status_code == 429:
+                    self._count('throttled')
+                error = f"HTTP {resp.status_code}: {resp.text}"
+                if resp.status_code not in RETRY_STATUSES:
+                    self._count('errors')
+                    raise TikTokAPIError(error, status=resp.status_code)
+            if attempt >= self.max_retries:
+                self._count('errors')
+                raise TikTokAPIError(error, status=resp.status_code if resp is not None else None,
+                                     retry_after=retry_after)
+            # Retry-After was already scheduled by _read_rate_limit, otherwise back off with jitter
+            if retry_after is None:
+                self._block_for(self._backoff(attempt))
+            attempt += 1
+            self._count('retries')
+
+    def fetch_video_comments(self, token: str, video_id: int, fields: str, max_count: int = 10,
+                             cursor: int = 0) -> Dict[str, Any]:
+        """Fetch one page: dict with 'comments', 'cursor' and 'has_more'"""
+        body = {
+            "video_id": int(video_id),
+            "max_count": int(max_count),
+            "cursor": int(cursor),
+        }
+        resp = self.post(token, {"fields": fields}, body)
+        try:
+            data = resp.json()
+        except ValueError:
+            raise TikTokAPIError("Invalid JSON response from TikTok API")
+
+        err = data.get("error", {})
+        if err and err.get("code") not in (None, "ok"):
+            raise TikTokAPIError(f"API error: {err.get('code')} - {err.get('message')}")
+
+        payload = data.get("data", {})
+        comments = payload.get("comments", [])
+        return {
+            "comments": comments,
+            "cursor": payload.get("cursor", 0),
+            "has_more": bool(payload.get("has_more", False)),
+        }
+
+    def stats(self) -> Dict:
+        """Per-request latency (ms), retry/throttle counters and the last rate-limit state"""
+        with self._lock:
+            latency = self.latency.snapshot()
+            blocked = max(0.0, self._blocked_until - time.time())
+            counters = dict(self.counters)
+        return {**counters, 'latency': latency, 'last_status': self.last_status,
+                'rate_limit': dict(self.rate_limit), 'blocked_for_s': round(blocked, 3)}
+
+
+_clients: Dict[tuple, TikTokResearchClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(config_source: Dict, timeout: float = 20) -> TikTokResearchClient:
+    """Shared client per (api_base, http_settings) so connections are reused across polls"""
+    key = (config_source.get('api_base') or API_BASE,
+           json.dumps(config_source.get('http_settings') or {}, sort_keys=True), timeout)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = TikTokResearchClient.from_config(config_source, timeout)
+        return client
+
+
 def fetch_video_comments(
     config_source: Dict,
     video_id: int,
@@ -39,39 +248,5 @@ def fetch_video_comments(
     Returns a dict with keys: 'comments' (list), 'cursor' (int), 'has_more' (bool)
     """
     token = _get_token(config_source)
-
-    params = {"fields": fields}
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-    }
-    body = {
-        "video_id": int(video_id),
-        "max_count": int(max_count),
-        "cursor": int(cursor),
-    }
-
-    try:
-        resp = requests.post(API_BASE, params=params, headers=headers, json=body, timeout=timeout)
-    except requests.RequestException as e:
-        raise TikTokAPIError(f"Network error: {e}")
-
-    if resp.status_code != 200:
-        raise TikTokAPIError(f"HTTP {resp.status_code}: {resp.text}")
-
-    try:
-        data = resp.json()
-    except json.JSONDecodeError:
-        raise TikTokAPIError("Invalid JSON response from TikTok API")
-
-    err = data.get("error", {})
-    if err and err.get("code") not in (None, "ok"):
-        raise TikTokAPIError(f"API error: {err.get('code')} - {err.get('message')}")
-
-    payload = data.get("data", {})
-    comments = payload.get("comments", [])
-    return {
-        "comments": comments,
-        "cursor": payload.get("cursor", 0),
-        "has_more": bool(payload.get("has_more", False)),
-    }
+    return get_client(config_source, timeout).fetch_video_comments(
+        token, video_id, fields, max_count=max_count, cursor=cursor)
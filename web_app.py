@@ -6,12 +6,19 @@ import os
 import json
 import time
 from pathlib import Path
-from threading import Thread, Lock
+from threading import Lock
 from flask import Flask, render_template, jsonify, request, send_from_directory, redirect
 import requests
 from werkzeug.utils import secure_filename
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room
 from comment_detector import create_comment_detector, CommentMatcher
+from comment_broadcast import CommentBroadcaster
+from comment_pipeline import CommentPipeline
+from activity_log import ActivityLog
+from keyword_index import regex_safety_issue
+from journal import CommentJournal
+from latency import LatencyTracker
+from supervisor import DetectorSupervisor
 from datetime import datetime
 
 app = Flask(__name__)
@@ -22,9 +29,15 @@ socketio = SocketIO(app, cors_allowed_origins="*", max_http_buffer_size=500*1024
 # Global state
 detector = None
 matcher = None
+# Matchers for multi_room rooms that define their own comment_keywords (others use `matcher`)
+room_matchers = {}
 config = {}
 monitoring = False
-monitoring_thread = None
+pipeline = None
+# Restarts push sources (bridge / Socket.IO / TikTokLive) that die while monitoring
+supervisor = None
+# Append-only record of every comment, match decision and trigger (see journal.py)
+journal = None
 state_lock = Lock()
 
 # App state
@@ -35,11 +48,18 @@ app_state = {
     'promo_queue': [],
     'total_comments_processed': 0,
     'total_videos_played': 0,
-    'activity_log': []
+    # Per-room player state for multi_room sources (same keys as the top-level player state)
+    'rooms': {}
 }
 
-# Cooldown map: video_path -> last trigger timestamp
+# Cooldown map: (room, video_path) -> last trigger timestamp
 promo_cooldowns = {}
+# Comments reach players as one 'comments' event per time window instead of one frame each
+broadcaster = CommentBroadcaster(lambda event, data, to: socketio.emit(event, data, to=to))
+# Activity log ring buffer; log_update goes out in batches, repeats are summarized
+activity_log = ActivityLog(lambda event, data: socketio.emit(event, data))
+# Per-stage trigger latency (comment receipt -> player 'playing'), see /api/latency
+latency = LatencyTracker()
 
 def load_config():
     """Load configuration"""
@@ -53,122 +73,171 @@ def save_config():
     with open('config.json', 'w', encoding='utf-8') as f:
         json.dump(config, f, indent=2, ensure_ascii=False)
 
-def add_log(message, level='info'):
-    """Add log message to activity log"""
+def build_matcher(keywords=None):
+    """Create matcher from current config (or the given keyword set)"""
+    settings = config.get('matcher_settings', {})
+    if keywords is None:
+        keywords = config.get('comment_keywords', {})
+    new_matcher = CommentMatcher(keywords,
+                                 cache_size=int(settings.get('cache_size', 1024)),
+                                 fuzzy=settings.get('fuzzy'),
+                                 regex=settings.get('regex'))
+    new_matcher.profiler.on_quarantine = lambda keyword, reason: add_log(
+        f"🚫 Regex quarantined: '{keyword}' ({reason})", "error")
+    return new_matcher
+
+def reload_matcher():
+    """Rebuild matcher after keyword changes; index and cache are swapped atomically"""
+    global matcher
+    if matcher is None:
+        matcher = build_matcher()
+    else:
+        matcher.reload(config.get('comment_keywords', {}))
+    source = config.get('comment_source', {})
+    rooms = source.get('rooms', []) if source.get('type') == 'multi_room' else []
+    own = {str(r.get('room') or r.get('live_username')): r['comment_keywords'] for r in rooms if r.get('comment_keywords')}
+    for room in list(room_matchers):
+        if room not in own:
+            del room_matchers[room]
+    for room, keywords in own.items():
+        if room in room_matchers:
+            room_matchers[room].reload(keywords)
+        else:
+            room_matchers[room] = build_matcher(keywords)
+
+def matcher_for(room):
+    """Matcher for a room (rooms without their own keywords share the global matcher)"""
+    return room_matchers.get(room, matcher)
+
+def room_state(room):
+    """Player state dict for a room; the top-level app_state for single-source monitoring.
+
+    Caller must hold state_lock.
+    """
+    if room is None:
+        return app_state
+    return app_state['rooms'].setdefault(room, {
+        'main_video_playing': True,
+        'current_promo': None,
+        'promo_queue': [],
+    })
+
+def room_channel(room):
+    """Socket.IO room of the players for a live room (None = broadcast to every client)"""
+    return f"live:{room}" if room else None
+
+def add_log(message, level='info', key=None):
+    """Add log message to activity log; messages sharing a key are summarized while they repeat"""
+    activity_log.start()
+    activity_log.add(message, level, key)
+
+def status_snapshot():
+    """app_state plus the current activity log (newest first) for clients"""
     with state_lock:
-        timestamp = time.strftime('%H:%M:%S')
-        app_state['activity_log'].insert(0, {
-            'time': timestamp,
-            'message': message,
-            'level': level
+        status = dict(app_state)
+    status['activity_log'] = activity_log.snapshot()
+    return status
+
+def process_comment(comment):
+    """Broadcast one comment and trigger its promo if it matches; return the match decision"""
+    dispatched_ns = time.monotonic_ns()
+    room = comment.room
+    channel = room_channel(room)
+    prefix = f"[{room}] " if room else ""
+    # Queue the comment for the next batched broadcast to the players of its room
+    # 'ts' is epoch seconds; players format it only when displaying
+    broadcaster.add({
+        'username': comment.username,
+        'text': comment.text,
+        'ts': comment.created_at
+    }, room)
+
+    # Only attempt promo triggers when main video is playing
+    with state_lock:
+        if not room_state(room).get('main_video_playing', True):
+            latency.record_comment(comment, dispatched_ns, None)
+            return {'decision': 'busy'}
+
+    # Find all matching rules (shared, read-only; no per-hit config copies)
+    matches = matcher_for(room).find_rules(comment)
+    latency.record_comment(comment, dispatched_ns, time.monotonic_ns())
+
+    if not matches:
+        add_log(f"⚠ {prefix}No match for: '{comment.text}'", "warning", key=f"⚠ {prefix}No match")
+        return {'decision': 'no_match'}
+
+    add_log(f"📝 {prefix}Comment: '{comment.text}'", "info", key=f"📝 {prefix}Comment")
+    # Deduplicate by video_path and apply cooldown
+    now_ts = time.time()
+    seen = set()
+    promo_items = []
+    for rule in matches:
+        vp = rule.video_path
+        if vp in seen:
+            continue
+        seen.add(vp)
+        if not vp or not os.path.exists(rule.video_abspath):
+            add_log(f"✗ Video not found: {vp}", "error", key=f"✗ Video not found: {vp}")
+            continue
+        last_ts = promo_cooldowns.get((room, vp), 0)
+        if last_ts and (now_ts - last_ts) < 60:
+            add_log(f"⏱ {prefix}Cooldown active for {rule.video_name} ({int(60 - (now_ts - last_ts))}s left)",
+                    "warning", key=f"⏱ {prefix}Cooldown active for {rule.video_name}")
+            continue
+        promo_items.append({
+            'keyword': rule.keyword,
+            'video_name': rule.video_name,
+            'video_path': vp,
+            'video_url': rule.video_url,
+            'comment': comment.text,
+            'room': room
         })
-        # Keep last 50 logs
-        app_state['activity_log'] = app_state['activity_log'][:50]
-    
-    # Emit to all connected clients
-    socketio.emit('log_update', {
-        'time': timestamp,
-        'message': message,
-        'level': level
-    })
 
-def monitoring_loop():
-    """Background monitoring loop"""
-    from urllib.parse import quote
-    global monitoring
-    
-    add_log("📡 Monitoring started", "success")
-    
-    while monitoring:
-        try:
-            with state_lock:
-                main_playing = app_state.get('main_video_playing', True)
-            # Always pull new comments to broadcast
-            comments = detector.get_new_comments()
-            for comment in comments:
-                # Broadcast comment to clients (mobile/player)
-                socketio.emit('comment', {
-                    'username': getattr(comment, 'username', ''),
-                    'text': getattr(comment, 'text', ''),
-                    'timestamp': getattr(comment, 'timestamp', '')
-                })
-
-                # Only attempt promo triggers when main video is playing
-                if not main_playing:
-                    continue
-
-                # Find all matching keywords
-                matches = []
-                try:
-                    matches = matcher.find_all_matches(comment.text)
-                except Exception:
-                    # Fallback to single match if API not available
-                    k, cfg = matcher.find_match(comment.text)
-                    if k and cfg:
-                        matches = [(k, cfg)]
-
-                if not matches:
-                    add_log(f"⚠ No match for: '{comment.text}'", "warning")
-                    continue
-
-                add_log(f"📝 Comment: '{comment.text}'", "info")
-                # Deduplicate by video_path and apply cooldown
-                now_ts = time.time()
-                seen = set()
-                promo_items = []
-                for keyword, cfg in matches:
-                    vp = cfg.get('video_path')
-                    if not vp or not Path(vp).exists():
-                        add_log(f"✗ Video not found: {vp}", "error")
-                        continue
-                    if vp in seen:
-                        continue
-                    seen.add(vp)
-                    last_ts = promo_cooldowns.get(vp, 0)
-                    if last_ts and (now_ts - last_ts) < 60:
-                        add_log(f"⏱ Cooldown active for {Path(vp).name} ({int(60 - (now_ts - last_ts))}s left)", "warning")
-                        continue
-                    promo_items.append({
-                        'keyword': keyword,
-                        'video_name': Path(vp).name,
-                        'video_path': vp,
-                        'comment': comment.text
-                    })
-
-                if not promo_items:
-                    add_log("⚠ No eligible promos (cooldown or missing)", "warning")
-                    continue
-
-                # Play the first eligible, queue the rest
-                first = promo_items[0]
-                promo_cooldowns[first['video_path']] = now_ts
-                with state_lock:
-                    app_state['promo_queue'].extend(promo_items[1:])
-                    app_state['current_promo'] = first
-                    app_state['total_videos_played'] += 1
-                    app_state['total_comments_processed'] += 1
-                    app_state['main_video_playing'] = False
+    if not promo_items:
+        add_log(f"⚠ {prefix}No eligible promos (cooldown or missing)", "warning",
+                key=f"⚠ {prefix}No eligible promos")
+        return {'decision': 'no_eligible', 'keywords': [rule.keyword for rule in matches]}
 
-                add_log(f"🎯 Matched: '{first['keyword']}'", "success")
-                add_log(f"▶ Playing: {first['video_name']}", "info")
+    # Play the first eligible, queue the rest
+    first = promo_items[0]
+    promo_cooldowns[(room, first['video_path'])] = now_ts
+    with state_lock:
+        state = room_state(room)
+        state['promo_queue'].extend(promo_items[1:])
+        state['current_promo'] = first
+        state['main_video_playing'] = False
+        app_state['total_videos_played'] += 1
+        app_state['total_comments_processed'] += 1
 
-                video_url = f"/video-absolute?path={quote(first['video_path'])}"
-                socketio.emit('play_video', {
-                    'keyword': first['keyword'],
-                    'video_name': first['video_name'],
-                    'video_url': video_url,
-                    'comment': first['comment'],
-                    'type': 'promo'
-                })
-
-            # Scan every second regardless
-            time.sleep(1.0)
-            
+    add_log(f"🎯 {prefix}Matched: '{first['keyword']}'", "success")
+    add_log(f"▶ {prefix}Playing: {first['video_name']}", "info")
+
+    # Player echoes this back in 'player_playing' once the video actually starts
+    trigger_id = latency.begin_trigger(comment.received_ns, dispatched_ns)
+    socketio.emit('play_video', {
+        'keyword': first['keyword'],
+        'video_name': first['video_name'],
+        'video_url': first['video_url'],
+        'comment': first['comment'],
+        'type': 'promo',
+        'room': room,
+        'trigger_id': trigger_id
+    }, to=channel)
+    if journal is not None:
+        journal.trigger(room=room, keyword=first['keyword'], video=first['video_path'],
+                        user=comment.username, trigger_id=trigger_id, queued=len(promo_items) - 1)
+    return {'decision': 'triggered', 'keyword': first['keyword']}
+
+def process_comments(comments):
+    """Process one batch from the comment pipeline"""
+    for comment in comments:
+        try:
+            decision = process_comment(comment)
         except Exception as e:
+            decision = {'decision': 'error', 'error': str(e)}
             add_log(f"✗ Error: {str(e)}", "error")
-            time.sleep(1)
-    
-    add_log("Monitoring stopped", "warning")
+        if journal is not None:
+            journal.comment(comment, decision)
 
 # ============ ROUTES ============
 
@@ -196,9 +265,51 @@ def mobile():
 
 @app.route('/api/status')
 def get_status():
-    """Get current status"""
-    with state_lock:
-        return jsonify(app_state)
+    """Get current status (plus the adaptive poll interval of poll-based sources)"""
+    status = status_snapshot()
+    scheduler = getattr(detector, 'scheduler', None)
+    status['poll_scheduler'] = scheduler.snapshot() if scheduler is not None else None
+    return jsonify(status)
+
+@app.route('/api/matcher/stats')
+def get_matcher_stats():
+    """Get keyword matcher statistics (cache hit/miss, regex cost table)"""
+    if matcher is None:
+        return jsonify({'cache': None, 'keywords': 0, 'version': 0, 'regex': []})
+    index = matcher.index
+    fuzzy = None
+    if index.fuzzy is not None:
+        fuzzy = {'words': len(index.fuzzy.words), 'budget_exceeded': index.fuzzy.budget_exceeded}
+    return jsonify({'cache': matcher.cache_stats(), 'keywords': len(index), 'version': index.version,
+                    'fuzzy': fuzzy, 'regex': matcher.profiler.table()})
+
+@app.route('/api/detector/stats')
+def get_detector_stats():
+    """Get dedup store statistics, HTTP client metrics for API sources, supervisor restarts and log counters"""
+    if detector is None:
+        return jsonify({'dedup': None, 'http': None, 'source': None, 'supervisor': None,
+                        'journal': journal.stats() if journal is not None else None,
+                        'broadcast': broadcaster.stats(),
+                        'activity_log': activity_log.stats()})
+    client = getattr(detector, 'client', None)
+    return jsonify({'dedup': detector.processed_comments.stats(),
+                    'http': client.stats() if hasattr(client, 'stats') else None,
+                    'source': detector.source_stats(),
+                    'supervisor': supervisor.stats() if supervisor is not None else None,
+                    'journal': journal.stats() if journal is not None else None,
+                    'broadcast': broadcaster.stats(),
+                    'activity_log': activity_log.stats()})
+
+@app.route('/api/latency')
+def get_latency():
+    """Get trigger latency histograms per stage (source, dedup, queue, match, emit, player)"""
+    return jsonify(latency.snapshot())
+
+@app.route('/api/latency/reset', methods=['POST'])
+def reset_latency():
+    """Clear latency histograms"""
+    latency.reset()
+    return jsonify({'success': True, 'message': 'Latency stats reset'})
 
 @app.route('/api/config')
 def get_config():
@@ -226,7 +337,8 @@ def get_config():
             'video_url': video_url,
             'video_name': Path(video_path).name if video_path else '',
             'response_text': data.get('response_text', ''),
-            'is_regex': data.get('is_regex', False)
+            'is_regex': data.get('is_regex', False),
+            'aliases': data.get('aliases', [])
         })
     
     return jsonify({
@@ -295,6 +407,11 @@ def add_keyword():
     if keyword in config.get('comment_keywords', {}):
         return jsonify({'success': False, 'message': 'Keyword already exists'}), 400
     
+    if is_regex:
+        issue = regex_safety_issue(keyword)
+        if issue:
+            return jsonify({'success': False, 'message': f'Unsafe regex: {issue}'}), 400
+    
     try:
         if 'comment_keywords' not in config:
             config['comment_keywords'] = {}
@@ -304,12 +421,14 @@ def add_keyword():
             'response_text': response_text or f"Terima kasih! {keyword} akan kami proses segera 🎉",
             'is_regex': is_regex
         }
+        if data.get('aliases'):
+            config['comment_keywords'][keyword]['aliases'] = [a.strip() for a in data['aliases'] if a.strip()]
         
         save_config()
         
-        # Reload matcher
-        global matcher
-        matcher = CommentMatcher(config.get('comment_keywords', {}))
+        # Update matcher index incrementally (swapped atomically)
+        if matcher is not None:
+            matcher.add_keyword(keyword, config['comment_keywords'][keyword])
         
         add_log(f"✓ Added keyword: '{keyword}'", "success")
         return jsonify({'success': True, 'message': 'Keyword added'})
@@ -330,10 +449,18 @@ def update_keyword():
     if not old_keyword or not new_keyword:
         return jsonify({'success': False, 'message': 'Keywords required'}), 400
     
+    if is_regex:
+        issue = regex_safety_issue(new_keyword)
+        if issue:
+            return jsonify({'success': False, 'message': f'Unsafe regex: {issue}'}), 400
+    
     try:
         if old_keyword not in config.get('comment_keywords', {}):
             return jsonify({'success': False, 'message': 'Keyword not found'}), 404
         
+        # Keep extra fields such as slot template aliases/min/max
+        updated = dict(config['comment_keywords'][old_keyword])
+        
         # If keyword changed, delete old and create new
         if old_keyword != new_keyword:
             if new_keyword in config['comment_keywords']:
@@ -341,17 +468,20 @@ def update_keyword():
             
             del config['comment_keywords'][old_keyword]
         
-        config['comment_keywords'][new_keyword] = {
+        updated.update({
             'video_path': video_path,
             'response_text': response_text,
             'is_regex': is_regex
-        }
+        })
+        if 'aliases' in data:
+            updated['aliases'] = [a.strip() for a in data.get('aliases') or [] if a.strip()]
+        config['comment_keywords'][new_keyword] = updated
         
         save_config()
         
-        # Reload matcher
-        global matcher
-        matcher = CommentMatcher(config.get('comment_keywords', {}))
+        # Update matcher index incrementally (swapped atomically)
+        if matcher is not None:
+            matcher.update_keyword(old_keyword, new_keyword, updated)
         
         add_log(f"✓ Updated keyword: '{new_keyword}'", "success")
         return jsonify({'success': True, 'message': 'Keyword updated'})
@@ -375,9 +505,9 @@ def delete_keyword():
         del config['comment_keywords'][keyword]
         save_config()
         
-        # Reload matcher
-        global matcher
-        matcher = CommentMatcher(config.get('comment_keywords', {}))
+        # Update matcher index incrementally (swapped atomically)
+        if matcher is not None:
+            matcher.remove_keyword(keyword)
         
         add_log(f"✓ Deleted keyword: '{keyword}'", "success")
         return jsonify({'success': True, 'message': 'Keyword deleted'})
@@ -388,7 +518,7 @@ def delete_keyword():
 @app.route('/api/start-monitoring', methods=['POST'])
 def start_monitoring():
     """Start monitoring comments"""
-    global monitoring, monitoring_thread, detector, matcher
+    global monitoring, pipeline, detector, supervisor, journal
     
     if monitoring:
         return jsonify({'success': False, 'message': 'Already monitoring'})
@@ -396,18 +526,39 @@ def start_monitoring():
     try:
         # Initialize detector and matcher according to source type
         detector = create_comment_detector(config)
+        source = config.get('comment_source', {})
+        targets = DetectorSupervisor.targets_for(detector)
+        if source.get('supervisor', {}).get('enabled', True) is False:
+            targets = {}
         try:
             detector.start()
-        except Exception:
-            pass
-        matcher = CommentMatcher(config.get('comment_keywords', {}))
+        except Exception as e:
+            # Without a supervisor nobody would retry, so fail loudly
+            if not targets:
+                raise
+            add_log(f"⚠ Comment source failed to start, retrying: {str(e)}", "warning")
+        if targets:
+            supervisor = DetectorSupervisor.from_config(source.get('supervisor'), targets, on_event=add_log)
+            supervisor.start()
+        reload_matcher()
+        journal = CommentJournal.from_config(config.get('journal'))
+        if journal is not None:
+            journal.start()
+        broadcast = config.get('comment_broadcast', {})
+        broadcaster.configure(**{k: broadcast[k] for k in ('interval', 'max_batch', 'client_cap') if k in broadcast})
+        broadcaster.start()
         
         monitoring = True
         with state_lock:
             app_state['monitoring'] = True
+            app_state['rooms'] = {}
         
-        monitoring_thread = Thread(target=monitoring_loop, daemon=True)
-        monitoring_thread.start()
+        # Comments are processed as soon as the source delivers them (push) or the poll adapter reads them
+        max_batch = config.get('comment_source', {}).get('max_batch', 64)
+        pipeline = CommentPipeline(detector, process_comments, max_batch=max_batch,
+                                   on_error=lambda e: add_log(f"✗ Error: {str(e)}", "error"))
+        add_log("📡 Monitoring started", "success")
+        pipeline.start()
         
         return jsonify({'success': True, 'message': 'Monitoring started'})
         
@@ -418,11 +569,28 @@ def start_monitoring():
 @app.route('/api/stop-monitoring', methods=['POST'])
 def stop_monitoring():
     """Stop monitoring comments"""
-    global monitoring
+    global monitoring, pipeline, supervisor, journal
     
     monitoring = False
     with state_lock:
         app_state['monitoring'] = False
+    if supervisor is not None:
+        supervisor.stop()
+        supervisor = None
+    if pipeline is not None:
+        pipeline.stop()
+        pipeline = None
+    if detector is not None:
+        try:
+            detector.stop()
+        except Exception:
+            pass
+    broadcaster.stop()
+    if journal is not None:
+        # Flushes whatever the writer thread still has queued
+        journal.close()
+        journal = None
+    add_log("Monitoring stopped", "warning")
     
     return jsonify({'success': True, 'message': 'Monitoring stopped'})
 
@@ -587,11 +755,7 @@ def update_platform():
         
         # Restart monitoring if active
         if app_state.get('monitoring'):
-            socketio.emit('log_update', {
-                'timestamp': datetime.now().isoformat(),
-                'message': '🔄 Restarting monitoring with new platform config...',
-                'level': 'info'
-            })
+            add_log('🔄 Restarting monitoring with new platform config...', 'info')
             # Note: actual restart would happen in comment_detector
         
         return jsonify({
@@ -856,38 +1020,66 @@ def serve_video_absolute():
 
 @socketio.on('connect')
 def handle_connect():
-    """Handle client connection"""
-    emit('status_update', app_state)
+    """Handle client connection; players of a multi_room live join its Socket.IO room.
+
+    ?comments=<n> caps the comments this client gets per broadcast batch (0 = none).
+    """
+    room = request.args.get('room') or None
+    if room:
+        join_room(room_channel(room))
+    try:
+        cap = int(request.args['comments']) if request.args.get('comments') else None
+    except ValueError:
+        cap = None
+    if broadcaster.subscribe(request.sid, room, cap):
+        join_room(broadcaster.room_for(room))
+    emit('status_update', status_snapshot())
     add_log("👤 Client connected", "info")
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnect"""
+    broadcaster.unsubscribe(request.sid)
     add_log("👤 Client disconnected", "info")
 
+@socketio.on('player_playing')
+def handle_player_playing(data):
+    """Player reports that a triggered video actually started playing"""
+    latency.player_started((data or {}).get('trigger_id'))
+
 @socketio.on('video_ended')
 def handle_video_ended(data):
     """Handle video ended event from player"""
     video_type = data.get('type', 'promo')
+    room = data.get('room') or None
+    channel = room_channel(room)
+    prefix = f"[{room}] " if room else ""
     
     if video_type == 'promo':
         # If there is a queued promo, play next; otherwise return to main
         from urllib.parse import quote
         next_item = None
         with state_lock:
-            if app_state['promo_queue']:
-                next_item = app_state['promo_queue'].pop(0)
-                app_state['current_promo'] = next_item
+            state = room_state(room)
+            if state['promo_queue']:
+                next_item = state['promo_queue'].pop(0)
+                state['current_promo'] = next_item
         if next_item:
-            add_log(f"⏭ Next promo: {next_item['video_name']}", "info")
-            video_url = f"/video-absolute?path={quote(next_item['video_path'])}"
+            add_log(f"⏭ {prefix}Next promo: {next_item['video_name']}", "info")
+            video_url = next_item.get('video_url') or f"/video-absolute?path={quote(next_item['video_path'])}"
+            trigger_id = latency.begin_trigger()
             socketio.emit('play_video', {
                 'keyword': next_item.get('keyword'),
                 'video_name': next_item['video_name'],
                 'video_url': video_url,
                 'comment': next_item.get('comment', ''),
-                'type': 'promo'
-            })
+                'type': 'promo',
+                'room': room,
+                'trigger_id': trigger_id
+            }, to=channel)
+            if journal is not None:
+                journal.trigger(room=room, keyword=next_item.get('keyword'), video=next_item['video_path'],
+                                trigger_id=trigger_id, source='queue')
         else:
             # Return to main video
             main_video = config.get('obs_settings', {}).get('main_video_path', '')
@@ -895,16 +1087,18 @@ def handle_video_ended(data):
                 time.sleep(1)  # Small delay
                 
                 with state_lock:
-                    app_state['main_video_playing'] = True
-                    app_state['current_promo'] = None
+                    state = room_state(room)
+                    state['main_video_playing'] = True
+                    state['current_promo'] = None
                 
                 socketio.emit('play_video', {
                     'video_name': Path(main_video).name,
                     'video_url': f'/video-absolute?path={quote(main_video)}',
-                    'type': 'main'
-                })
+                    'type': 'main',
+                    'room': room
+                }, to=channel)
                 
-                add_log("⏮ Auto-returned to main video", "info")
+                add_log(f"⏮ {prefix}Auto-returned to main video", "info")
 
 def run_server(host='0.0.0.0', port=5000):
     """Run the web server"""
@@ -916,6 +1110,8 @@ def run_server(host='0.0.0.0', port=5000):
     
     # Load config
     config = load_config()
+    settings = config.get('activity_log', {})
+    activity_log.configure(**{k: settings[k] for k in ('size', 'interval', 'aggregate_window') if k in settings})
     print(f"✓ Configuration loaded")
     
     print(f"\n📱 Access URLs:")